@@ -1,5 +1,7 @@
 import os
 import sys
+import pickle
+import multiprocessing
 from tkinter import *
 from PIL import Image
 from tqdm import tqdm
@@ -81,9 +83,149 @@ def newton_method(f, c, coef, max_iter, eps):
 
     return None, None
 
-def draw(f, size, name, x_min=-2.0, x_max=2., y_min=-2.0, y_max=2.0, eps=1e-6, max_iter=40):
+def newton_grid(f, c, coef, max_iter, eps):
+    '''This function is the vectorized version of newton_method. It runs Newton's method on a whole
+    complex array of starting points at once, evaluating f and its derivative for all of them with a
+    single batched AD.Variable per iteration. Converged points are dropped from the active set. It returns
+    the array of roots (nan where the method did not converge) and the array of iteration counts.'''
+    ad = AD.Diff()
+    c = np.asarray(c, dtype=complex)
+    shape = c.shape
+    c = c.ravel()
+    roots = np.full(c.shape, np.nan, dtype=complex)
+    n_converge = np.full(c.shape, -1)
+    active = np.arange(c.size)
+
+    with np.errstate(all='ignore'):
+        for i in range(max_iter):
+            if active.size == 0:
+                break
+            x = AD.Variable(c, name='x')
+            t = ad.auto_diff(function = f, eval_point = [x])
+            c2 = c - coef * t.val / t.der['x']
+
+            converged = np.abs(c2 - c) < eps
+            roots[active[converged]] = c2[converged]
+            n_converge[active[converged]] = i
+            active, c = active[~converged], c2[~converged]
+
+    return roots.reshape(shape), n_converge.reshape(shape)
+
+def cluster_roots(roots, tol=1e-4, distinct=None):
+    '''This function groups the roots found by newton_grid. Scanning the roots in order, each one is
+    given the index of the first distinct root lying within tol of it, or starts a new distinct root,
+    exactly as the caching loop of draw_pixelwise does. Passing the distinct roots found so far continues
+    the scan, so clustering consecutive tiles one after the other gives the same result as clustering the
+    whole image. It returns the list of distinct roots and the array of indices (-1 where there is no root).'''
+    flat = roots.ravel()
+    labels = np.full(flat.shape, -1)
+    unassigned = np.flatnonzero(~np.isnan(flat) & (flat != 0))
+    distinct = [] if distinct is None else distinct
+    for ind, r in enumerate(distinct):
+        close = np.abs(flat[unassigned] - r) < tol
+        labels[unassigned[close]] = ind
+        unassigned = unassigned[~close]
+    while unassigned.size:
+        r = flat[unassigned[0]]
+        close = np.abs(flat[unassigned] - r) < tol
+        labels[unassigned[close]] = len(distinct)
+        distinct.append(complex(r))
+        unassigned = unassigned[~close]
+    return distinct, labels.reshape(roots.shape)
+
+def colorize(labels, n_converge, max_iter):
+    '''This function returns the RGB array (indexed by x, y) given the root indices and the iteration
+    counts. The colors come from a lookup table built with the color function.'''
+    rgb = np.zeros(labels.shape + (3,), dtype=np.uint8)
+    n_roots = labels.max(initial=-1) + 1
+    if n_roots == 0:
+        return rgb
+    table = np.array([[color(ind, level) for level in range(max_iter)] for ind in range(n_roots)])
+    table = np.clip(table, 0, 255).astype(np.uint8)
+    found = labels >= 0
+    rgb[found] = table[labels[found], n_converge[found]]
+    return rgb
+
+def grid(size, x_min, x_max, y_min, y_max, start=0, stop=None):
+    '''This function returns the complex starting points of the image, indexed by x, y. Only the
+    columns x in range(start, stop) are returned.'''
+    xs = np.arange(size)[start:stop]
+    c = np.empty((xs.size, size), dtype=complex)
+    c.real = (x_min + xs * (x_max - x_min) / (size - 1))[:, None]
+    c.imag = (y_min + np.arange(size) * (y_max - y_min) / (size - 1))[None, :]
+    return c
+
+_tile_function = None
+
+def _init_tile_worker(f):
+    '''This function stores the function of interest in a worker process of draw.'''
+    global _tile_function
+    _tile_function = f
+
+def _solve_tile(args):
+    '''This function runs newton_grid on the columns of one tile in a worker process of draw.'''
+    size, x_min, x_max, y_min, y_max, start, stop, eps, max_iter = args
+    c = grid(size, x_min, x_max, y_min, y_max, start, stop)
+    return newton_grid(_tile_function, c, 1, max_iter, eps)
+
+def pool_context(f):
+    '''This function returns the multiprocessing context in which the workers of solve_tiles can run f, or None
+    if there is none. Where the platform supports it the workers are forked, so f may be a lambda, except on macOS
+    where forking a process which has loaded Tk and matplotlib is unsafe; otherwise f must be picklable.'''
+    if sys.platform != 'darwin' and 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    try:
+        pickle.dumps(f)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return None
+    return multiprocessing.get_context()
+
+def solve_tiles(f, size, x_min, x_max, y_min, y_max, eps, max_iter, workers, tiles_per_worker=4, context=None):
+    '''This function splits the image into bands of columns and runs newton_grid on them in a pool of
+    worker processes, started in context (by default pool_context(f)). The tiles are yielded in order as
+    (roots, n_converge).'''
+    context = context or pool_context(f)
+    if context is None:
+        raise ValueError('The function cannot be sent to worker processes, use workers=1')
+    bounds = np.linspace(0, size, min(size, workers * tiles_per_worker) + 1).astype(int)
+    tasks = [(size, x_min, x_max, y_min, y_max, start, stop, eps, max_iter)
+             for start, stop in zip(bounds[:-1], bounds[1:])]
+    with context.Pool(workers, initializer=_init_tile_worker, initargs=(f,)) as pool:
+        for tile in pool.imap(_solve_tile, tasks):
+            yield tile
+
+def draw(f, size, name, x_min=-2.0, x_max=2., y_min=-2.0, y_max=2.0, eps=1e-6, max_iter=40, vectorized=True,
+         workers=1):
     '''This function generates the image of Newton's Fractal given the file name, file Size and the
-    function of interest.'''
+    function of interest. By default the whole pixel grid is iterated at once as a complex array, which
+    gives the same image as the pixel by pixel loop of draw_pixelwise (used when vectorized is False).
+    With workers > 1 the image is split into tiles solved by a pool of processes; the roots of the tiles
+    are then merged in scan order, so the colors are the same as with a single process. If f cannot be
+    sent to worker processes (see pool_context), a single process is used.'''
+    if not vectorized:
+        return draw_pixelwise(f, size, name, x_min, x_max, y_min, y_max, eps, max_iter)
+    print ('Solving for roots using Newton\'s method')
+
+    context = pool_context(f) if workers > 1 else None
+    if context is not None:
+        roots, labels, n_converge = [], [], []
+        for tile_roots, tile_n_converge in solve_tiles(f, size, x_min, x_max, y_min, y_max, eps, max_iter, workers,
+                                                       context=context):
+            roots, tile_labels = cluster_roots(tile_roots, distinct=roots)
+            labels.append(tile_labels)
+            n_converge.append(tile_n_converge)
+        labels, n_converge = np.concatenate(labels), np.concatenate(n_converge)
+    else:
+        roots, n_converge = newton_grid(f, grid(size, x_min, x_max, y_min, y_max), 1, max_iter, eps)
+        roots, labels = cluster_roots(roots)
+    rgb = colorize(labels, n_converge, max_iter)
+
+    print(roots)
+    Image.fromarray(rgb.transpose(1, 0, 2), "RGB").save(name, "PNG")
+
+def draw_pixelwise(f, size, name, x_min=-2.0, x_max=2., y_min=-2.0, y_max=2.0, eps=1e-6, max_iter=40):
+    '''This function generates the image of Newton's Fractal pixel by pixel, calling newton_method for
+    each of them.'''
     roots = []
     img = Image.new("RGB", (size, size))
     print ('Solving for roots using Newton\'s method')
@@ -188,7 +330,7 @@ def run_command(entry_1, entry_2, entry_3):
     img_name = entry_3.get()
 
     g = lambda x: eval(equation)
-    draw(g, img_size, img_name)
+    draw(g, img_size, img_name, workers=os.cpu_count() or 1)
 
 def image_command(entry_3):
     '''This function is called when the "Show" button is clicked. This function simply shows the image
@@ -1,6 +1,27 @@
+"""Elementary functions of Variables, which also accept plain numbers.
+
+Values may be real or complex (Python complex numbers or complex128 arrays). With complex values the partials
+are the complex (holomorphic) derivatives and the multivalued functions take the principal branches of NumPy:
+	log, logk, sqrt, and x**y for a non integer y: cut along the negative real axis, where the value is
+		the limit from above (e.g. log(-1) = pi*1j).
+	arcsin, arccos: cuts along (-inf, -1) and (1, inf) on the real axis.
+	arctan: cuts along (-inf*1j, -1j) and (1j, inf*1j) on the imaginary axis.
+The derivatives are those of the principal branch, which do not exist on the cuts themselves.
+abs is the exception: |z| is not holomorphic, so abs of a complex Variable raises a TypeError.
+Real values stay real: out of the domain of a function (e.g. log(-1) or arcsin(2)) the value is nan,
+as in NumPy, so pass a complex value to get the principal value instead.
+
+EXAMPLES
+>>> t = log(Variable(-1 + 0j, name='x'))
+>>> print(t.val, t.der['x'])
+3.141592653589793j (-1+0j)
+"""
 import numpy as np
-from VayDiff.VayDiff import Variable
-from collections import defaultdict
+from VayDiff.VayDiff import Variable, _apply, _apply2
+
+# abs is left out of the star import, which would shadow the builtin abs.
+__all__ = ['log', 'logk', 'exp', 'sqrt', 'sin', 'cos', 'tan', 'arcsin', 'arccos', 'arctan', 'sinh', 'cosh', 'tanh',
+		   'arcsinh', 'arccosh', 'arctanh', 'log1p', 'expm1', 'erf', 'logistic', 'maximum', 'minimum']
 
 def log(x):
 	"""Return the result of log.
@@ -18,16 +39,7 @@ def log(x):
 	>>> print(t.val, t.der['x'])
 	0.0 1.0
  	"""
-	try:
-		val = np.log(x.val)
-		ders = defaultdict(float)
-		sec_ders = defaultdict(float)
-		for key in x.der:
-			ders[key] += x.der[key]/x.val
-			sec_ders[key] += (x.val*x.sec_der[key] - (x.der[key])**2)/x.val**2
-		return Variable(val, ders, sec_ders)
-	except AttributeError:
-		return np.log(x)
+	return _apply('log', x)
 
 def logk(x, base=None):
 	"""Return the result of log to the base defined by the user.
@@ -47,19 +59,9 @@ def logk(x, base=None):
 	>>> print(t.val, t.der['x'])
 	0.0 1.0
  	"""
-	try:
-		val = np.log(x.val)/np.log(base)
-		ders = defaultdict(float)
-		sec_ders = defaultdict(float)
-		for key in x.der:
-			ders[key] += x.der[key]/x.val * (1/np.log(base))
-			sec_ders[key] += (x.val*x.sec_der[key] - (x.der[key])**2)/(np.log(base) * x.val**2)
-		return Variable(val, ders, sec_ders)
-	except AttributeError:
-		try:
-			return np.log(x)/np.log(base)
-		except AttributeError:
-			return log(x)
+	if base is None:
+		return log(x)
+	return log(x)/np.log(base)
 
 def exp(x):
 	"""Return the result of exp.
@@ -77,16 +79,7 @@ def exp(x):
 	>>> print(t.val, t.der['x'])
 	1.0 1.0
  	"""
-	try:
-		val = np.exp(x.val)
-		ders = defaultdict(float)
-		sec_ders = defaultdict(float)
-		for key in x.der:
-			ders[key] += x.der[key] * val
-			sec_ders[key] = val * (x.sec_der[key] + (x.der[key])**2)
-		return Variable(val, ders, sec_ders)
-	except AttributeError:
-		return np.exp(x)
+	return _apply('exp', x)
 
 def sqrt(x):
 	"""Return the square root.
@@ -104,16 +97,7 @@ def sqrt(x):
 	>>> print(t.val, t.der['x'])
 	2.0 0.25
  	"""
-	try:
-		val = np.sqrt(x.val)
-		ders = defaultdict(float)
-		sec_ders = defaultdict(float)
-		for key in x.der:
-			ders[key] += 0.5 * (x.val ** (-0.5)) * (x.der[key])
-			sec_ders[key] += (2*x.val*x.sec_der[key] - (x.der[key])**2)/(4*x.val**1.5)
-		return Variable(val, ders, sec_ders)
-	except AttributeError:
-		return np.sqrt(x)
+	return _apply('sqrt', x)
 
 def sin(x):
 	"""Return the sine.
@@ -131,16 +115,7 @@ def sin(x):
 	>>> print(t.val, t.der['x'])
 	0.0 1.0
  	"""
-	try:
-		val = np.sin(x.val)
-		ders = defaultdict(float)
-		sec_ders = defaultdict(float)
-		for key in x.der:
-			ders[key] += np.cos(x.val) * (x.der[key])
-			sec_ders[key] += x.sec_der[key]*np.cos(x.val)-(x.der[key]**2)*(np.sin(x.val))
-		return Variable(val, ders, sec_ders)
-	except AttributeError:
-		return np.sin(x)
+	return _apply('sin', x)
 
 def cos(x):
 	"""Return the cosine.
@@ -158,16 +133,7 @@ def cos(x):
 	>>> print(t.val, t.der['x'])
 	1.0 0.0
  	"""
-	try:
-		val = np.cos(x.val)
-		ders = defaultdict(float)
-		sec_ders = defaultdict(float)
-		for key in x.der:
-			ders[key] += -np.sin(x.val) * (x.der[key])
-			sec_ders[key] += -x.sec_der[key]*np.sin(x.val)+(x.der[key]**2)*(-np.cos(x.val))
-		return Variable(val, ders, sec_ders)
-	except AttributeError:
-		return np.cos(x)
+	return _apply('cos', x)
 
 def tan(x):
 	"""Return the tangent.
@@ -185,16 +151,7 @@ def tan(x):
 	>>> print(t.val, t.der['x'])
 	0.0 1.0
  	"""
-	try:
-		val = np.tan(x.val)
-		ders = defaultdict(float)
-		sec_ders = defaultdict(float)
-		for key in x.der:
-			ders[key] += 1/(np.cos(x.val)**2) * (x.der[key])
-			sec_ders[key] += 1/(np.cos(x.val)**2) * (x.sec_der[key] + 2*(x.der[key]**2)*val)
-		return Variable(val, ders, sec_ders)
-	except AttributeError:
-		return np.tan(x)
+	return _apply('tan', x)
 
 def arcsin(x):
 	"""Return the inverse sine or the arcsin.
@@ -212,16 +169,7 @@ def arcsin(x):
 	>>> print(t.val, t.der['x'])
 	0.0 1.0
  	"""
-	try:
-		val = np.arcsin(x.val)
-		ders = defaultdict(float)
-		sec_ders = defaultdict(float)
-		for key in x.der:
-			ders[key] += 1/((1 - x.val**2)**0.5) * (x.der[key])
-			sec_ders[key] += (x.val*x.der[key]**2-x.sec_der[key]*(x.val**2-1))/((1-x.val**2)**1.5)
-		return Variable(val, ders, sec_ders)
-	except AttributeError:
-		return np.arcsin(x)
+	return _apply('arcsin', x)
 
 def arccos(x):
 	"""Return the inverse cosine or the arccos.
@@ -239,17 +187,7 @@ def arccos(x):
 	>>> print(t.val, t.der['x'])
 	1.5707963267948966 -1.0
  	"""
-	try:
-		val = np.arccos(x.val)
-		ders = defaultdict(float)
-		sec_ders = defaultdict(float)
-		for key in x.der:
-			ders[key] += -1/((1 - x.val**2)**0.5) * (x.der[key])
-			sec_ders[key] += -(x.val**2*(-x.sec_der[key]) + x.sec_der[key] + x.val*x.der[key]**2)/ \
-							 ((1-x.val**2)**1.5)
-		return Variable(val, ders, sec_ders)
-	except AttributeError:
-		return np.arccos(x)
+	return _apply('arccos', x)
 
 def arctan(x):
 	"""Return the inverse tangent or the arctan.
@@ -267,16 +205,7 @@ def arctan(x):
 	>>> print(t.val, t.der['x'])
 	0.0 1.0
  	"""
-	try:
-		val = np.arctan(x.val)
-		ders = defaultdict(float)
-		sec_ders = defaultdict(float)
-		for key in x.der:
-			ders[key] += 1/(1 + x.val**2) * (x.der[key])
-			sec_ders[key] += ((x.val**2+1)*x.sec_der[key]-2*x.val*x.der[key]**2)/(x.val**2+1)**2
-		return Variable(val, ders, sec_ders)
-	except AttributeError:
-		return np.arctan(x)
+	return _apply('arctan', x)
 
 def sinh(x):
 	"""The hyperbolic sine or the sinh
@@ -294,16 +223,7 @@ def sinh(x):
 	>>> print(t.val, t.der['x'])
 	0.0 1.0
 	"""
-	try:
-		val = np.sinh(x.val)
-		ders = defaultdict(float)
-		sec_ders = defaultdict(float)
-		for key in x.der:
-			ders[key] += np.cosh(x.val) * (x.der[key])
-			sec_ders[key] += x.sec_der[key]*np.cosh(x.val) + x.der[key]**2*np.sinh(x.val)
-		return Variable(val, ders, sec_ders)
-	except AttributeError:
-		return np.sinh(x)
+	return _apply('sinh', x)
 
 def cosh(x):
 	"""The hyperbolic cosine or the cosh
@@ -321,16 +241,7 @@ def cosh(x):
 	>>> print(t.val, t.der['x'])
 	1.0 0.0
 	"""
-	try:
-		val = np.cosh(x.val)
-		ders = defaultdict(float)
-		sec_ders = defaultdict(float)
-		for key in x.der:
-			ders[key] += np.sinh(x.val) * (x.der[key])
-			sec_ders[key] += x.sec_der[key]*np.sinh(x.val) + x.der[key]**2*np.cosh(x.val)
-		return Variable(val, ders, sec_ders)
-	except AttributeError:
-		return np.cosh(x)
+	return _apply('cosh', x)
 
 def tanh(x):
 	"""The hyperbolic tangent or the tanh
@@ -348,28 +259,188 @@ def tanh(x):
 	>>> print(t.val, t.der['x'])
 	0.0 1.0
 	"""
-	try:
-		val = np.tanh(x.val)
-		ders = defaultdict(float)
-		sec_ders = defaultdict(float)
-		for key in x.der:
-			ders[key] += (1/(np.cosh(x.val))**2) * (x.der[key])
-			sec_ders[key] += (1/(np.cosh(x.val))**2) * (x.sec_der[key] -2*(x.der[key]**2)*np.tanh(x.val))
-		return Variable(val, ders, sec_ders)
-	except AttributeError:
-		return np.tanh(x)
+	return _apply('tanh', x)
 
 def arcsinh(x):
-	"""The hyperbolic arcsin or the arcsinh"""
-	raise NotImplementedError
+	"""The hyperbolic arcsin or the arcsinh
+
+	INPUTS
+		x (Variable object or real number)
+
+	RETURNS
+		if x is a Variable, then return a Variable with val and der.
+		if x is a real number, then return the value of np.arcsinh(x).
+
+	EXAMPLES
+	>>> x = Variable(0, name='x')
+	>>> t = arcsinh(x)
+	>>> print(t.val, t.der['x'])
+	0.0 1.0
+	"""
+	return _apply('arcsinh', x)
 
 def arccosh(x):
-	"""The hyperbolic arccos or the arccosh"""
-	raise NotImplementedError
+	"""The hyperbolic arccos or the arccosh
+
+	INPUTS
+		x (Variable object or real number)
+
+	RETURNS
+		if x is a Variable, then return a Variable with val and der.
+		if x is a real number, then return the value of np.arccosh(x).
+
+	EXAMPLES
+	>>> x = Variable(2, name='x')
+	>>> t = arccosh(x)
+	>>> print(t.val, t.der['x'])
+	1.3169578969248168 0.5773502691896258
+	"""
+	return _apply('arccosh', x)
 
 def arctanh(x):
-	"""The hyperbolic arctan or the arctanh"""
-	raise NotImplementedError
+	"""The hyperbolic arctan or the arctanh
+
+	INPUTS
+		x (Variable object or real number)
+
+	RETURNS
+		if x is a Variable, then return a Variable with val and der.
+		if x is a real number, then return the value of np.arctanh(x).
+
+	EXAMPLES
+	>>> x = Variable(0, name='x')
+	>>> t = arctanh(x)
+	>>> print(t.val, t.der['x'])
+	0.0 1.0
+	"""
+	return _apply('arctanh', x)
+
+def log1p(x):
+	"""Return log(1 + x), accurate for small x.
+
+	INPUTS
+		x (Variable object or real number)
+
+	RETURNS
+		if x is a Variable, then return a Variable with val and der.
+		if x is a real number, then return the value of np.log1p(x).
+
+	EXAMPLES
+	>>> x = Variable(0, name='x')
+	>>> t = log1p(x)
+	>>> print(t.val, t.der['x'])
+	0.0 1.0
+	"""
+	return _apply('log1p', x)
+
+def expm1(x):
+	"""Return exp(x) - 1, accurate for small x.
+
+	INPUTS
+		x (Variable object or real number)
+
+	RETURNS
+		if x is a Variable, then return a Variable with val and der.
+		if x is a real number, then return the value of np.expm1(x).
+
+	EXAMPLES
+	>>> x = Variable(0, name='x')
+	>>> t = expm1(x)
+	>>> print(t.val, t.der['x'])
+	0.0 1.0
+	"""
+	return _apply('expm1', x)
+
+def erf(x):
+	"""The error function or the erf
+
+	INPUTS
+		x (Variable object or real number)
+
+	RETURNS
+		if x is a Variable, then return a Variable with val and der.
+		if x is a real number, then return the value of erf(x), computed with scipy.special.erf when SciPy is installed.
+
+	EXAMPLES
+	>>> x = Variable(0, name='x')
+	>>> t = erf(x)
+	>>> print(t.val, t.der['x'])
+	0.0 1.1283791670955126
+	"""
+	return _apply('erf', x)
+
+def logistic(x):
+	"""The logistic sigmoid 1/(1 + exp(-x)), computed without overflow
+
+	INPUTS
+		x (Variable object or real number)
+
+	RETURNS
+		if x is a Variable, then return a Variable with val and der.
+		if x is a real number, then return the value of 1/(1 + np.exp(-x)).
+
+	EXAMPLES
+	>>> x = Variable(0, name='x')
+	>>> t = logistic(x)
+	>>> print(t.val, t.der['x'])
+	0.5 0.25
+	"""
+	return _apply('logistic', x)
+
+def abs(x):
+	"""The absolute value. The derivative at 0 is taken to be 0. It is not exported by from VayDiff.BasicMath import *,
+	which would shadow the builtin abs, and it has no complex derivative (a complex Variable raises a TypeError).
+
+	INPUTS
+		x (Variable object or real number)
+
+	RETURNS
+		if x is a Variable, then return a Variable with val and der.
+		if x is a real number, then return the value of np.abs(x).
+
+	EXAMPLES
+	>>> x = Variable(-2.0, name='x')
+	>>> t = abs(x)
+	>>> print(t.val, t.der['x'])
+	2.0 -1.0
+	"""
+	return _apply('abs', x)
+
+def maximum(x, y):
+	"""The larger of x and y. At a tie the partials are those of x.
+
+	INPUTS
+		x, y (Variable objects or real numbers)
+
+	RETURNS
+		if x or y is a Variable, then return a Variable with val and der.
+		if x and y are real numbers, then return the value of np.maximum(x, y).
+
+	EXAMPLES
+	>>> x = Variable(1.0, name='x')
+	>>> t = maximum(x, 2*x - 2)
+	>>> print(t.val, t.der['x'])
+	1.0 1.0
+	"""
+	return _apply2('maximum', x, y)
+
+def minimum(x, y):
+	"""The smaller of x and y. At a tie the partials are those of x.
+
+	INPUTS
+		x, y (Variable objects or real numbers)
+
+	RETURNS
+		if x or y is a Variable, then return a Variable with val and der.
+		if x and y are real numbers, then return the value of np.minimum(x, y).
+
+	EXAMPLES
+	>>> x = Variable(3.0, name='x')
+	>>> t = minimum(x, 2*x - 2)
+	>>> print(t.val, t.der['x'])
+	3.0 1.0
+	"""
+	return _apply2('minimum', x, y)
 
 if __name__ == '__main__':
 	"""This part runs the doctest"""
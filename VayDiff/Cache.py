@@ -0,0 +1,72 @@
+import numpy as np
+from collections import OrderedDict, namedtuple
+from collections.abc import Mapping
+from VayDiff.Dense import DenseDer
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+def freeze(value):
+	"""Return a hashable snapshot of a value, a number, a NumPy array or the partials (a mapping, DenseDer,
+	DenseHessian or SparseDer), such that two inputs give equal snapshots only if they are equal and of the
+	same type (e.g. 2 and 2.0, or -1.0 and -1+0j, give different snapshots)."""
+	if isinstance(value, np.ndarray):
+		return ('array', value.shape, value.dtype.str, value.tobytes())
+	if isinstance(value, DenseDer):
+		return (type(value), tuple(value.index.names), freeze(getattr(value, 'rows', None)), freeze(value.array))
+	if isinstance(value, Mapping):
+		# Sorted by type and repr, since keys of different types (e.g. 'x' and 0) do not compare.
+		keys = sorted(value, key=lambda key: (type(key).__name__, repr(key)))
+		return (type(value), tuple((key, freeze(value[key])) for key in keys))
+	return (type(value), value)
+
+class LRUCache:
+	"""
+	This class defines a bounded mapping which keeps the maxsize most recently used entries,
+	and counts the hits and misses of its lookups.
+	"""
+	def __init__(self, maxsize=128):
+		"""The constructor for LRUCache Class.
+
+		Args:
+			maxsize (positive integer): The number of entries kept. The least recently used one is dropped beyond it.
+		"""
+		if maxsize < 1:
+			raise ValueError('The size of a cache must be positive')
+		self.maxsize = maxsize
+		self.hits = 0
+		self.misses = 0
+		self._entries = OrderedDict()
+
+	def get(self, key, compute):
+		"""Return the entry of key, or store and return compute() if there is none.
+
+		EXAMPLES
+		>>> cache = LRUCache(2)
+		>>> cache.get('a', lambda: 1), cache.get('a', lambda: 2), cache.get('b', lambda: 3)
+		(1, 1, 3)
+		>>> cache.info()
+		CacheInfo(hits=1, misses=2, maxsize=2, currsize=2)
+		"""
+		try:
+			value = self._entries[key]
+		except KeyError:
+			self.misses += 1
+			value = self._entries[key] = compute()
+			if len(self._entries) > self.maxsize:
+				self._entries.popitem(last=False)
+			return value
+		self.hits += 1
+		self._entries.move_to_end(key)
+		return value
+
+	def info(self):
+		"""Return the statistics of the cache, like functools.lru_cache."""
+		return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+	def clear(self):
+		"""Drop all the entries and reset the statistics."""
+		self._entries.clear()
+		self.hits = self.misses = 0
+
+	def __len__(self):
+		return len(self._entries)
@@ -0,0 +1,250 @@
+import numpy as np
+from collections.abc import Mapping
+
+class Index:
+	"""
+	This class registers the names of the seed variables once and assigns each of them a fixed position.
+	Variables seeded into an Index carry their derivatives as dense NumPy vectors laid out in this order,
+	so that every operator updates all partials with one vectorized expression.
+	"""
+	def __init__(self, names):
+		"""The constructor for Index Class.
+
+		Args:
+			names (list of strings): The names of the seed variables, in the order of the derivative vectors.
+		"""
+		self.names = list(names)
+		self.positions = {name: i for i, name in enumerate(self.names)}
+		if len(self.positions) != len(self.names):
+			raise ValueError('Variable names registered in an Index must be unique')
+
+	def __len__(self):
+		"""Return the number of registered variables."""
+		return len(self.names)
+
+	def seed(self, name, der=1.0):
+		"""Return the dense derivative vector of the seed variable called name.
+
+		INPUTS
+			self (Index object)
+			name (string): the name of a registered variable.
+			der (real number): the value of the derivative with respect to itself. Default is 1.
+
+		RETURNS
+			A DenseDer holding der at the position of name and zeros elsewhere. If der is an array,
+			the vector has shape (p,) + der.shape.
+
+		EXAMPLES
+		>>> idx = Index(['x', 'y'])
+		>>> d = idx.seed('y')
+		>>> print(d['x'], d['y'])
+		0.0 1.0
+		"""
+		array = np.zeros((len(self.names),) + np.shape(der), dtype=np.result_type(der, float))
+		array[self.positions[name]] = der
+		return DenseDer(self, array)
+
+class DenseDer(Mapping):
+	"""
+	This class is a thin read-only view of a dense derivative vector.
+	It keeps the dictionary interface of the default storage, so t.der['x'] returns the partial with respect to x.
+	"""
+	__slots__ = ('index', 'array')
+	leading = 1
+
+	def __init__(self, index, array):
+		"""The constructor for DenseDer Class.
+
+		Args:
+			index (Index object): The registry which gives the position of each variable.
+			array (NumPy array): The partials, one entry per registered variable.
+		"""
+		self.index = index
+		self.array = array
+
+	def __getitem__(self, name):
+		"""Return the partial with respect to name. Like a defaultdict(float), unknown names give 0.0."""
+		try:
+			return self.array[self.index.positions[name]]
+		except KeyError:
+			return 0.0
+
+	def __contains__(self, name):
+		return name in self.index.positions
+
+	def __iter__(self):
+		return iter(self.index.names)
+
+	def __len__(self):
+		return len(self.index.names)
+
+	def __repr__(self):
+		return 'DenseDer({})'.format(dict(self.items()))
+
+	@property
+	def batch_ndim(self):
+		"""Return the number of batch axes after the variable axes."""
+		return self.array.ndim - self.leading
+
+	def aligned(self, ndim):
+		"""Return the array with axes inserted after the variable axes so that it has ndim batch axes.
+		This lines up the batch axes of partials for NumPy broadcasting against values with ndim dimensions."""
+		missing = ndim - self.batch_ndim
+		if missing > 0:
+			lead = self.leading
+			return self.array.reshape(self.array.shape[:lead] + (1,) * missing + self.array.shape[lead:])
+		return self.array
+
+	def new(self, array):
+		"""Return a partials view of the same class over the same index holding array."""
+		return type(self)(self.index, array)
+
+	@staticmethod
+	def outer(a, b):
+		"""Return the second order term built from the first order partials a and b.
+		A DenseDer only stores the diagonal of the Hessian, so this is the elementwise product."""
+		return a * b
+
+	@classmethod
+	def from_mapping(cls, index, mapping):
+		"""Return the partials view of this class over index holding the partials found in mapping.
+
+		INPUTS
+			index (Index object)
+			mapping (dictionary or DenseDer): partials keyed by variable name.
+
+		RETURNS
+			A DenseDer (raises a ValueError if mapping refers to a name which is not registered in index).
+		"""
+		if type(mapping) is cls and (mapping.index is index or mapping.index.names == index.names):
+			return mapping
+		shape = np.broadcast_shapes(*[np.shape(mapping[key]) for key in mapping])
+		dtype = complex if any(np.iscomplexobj(mapping[key]) for key in mapping) else float
+		array = np.zeros((len(index.names),) * cls.leading + shape, dtype=dtype)
+		for key in mapping:
+			try:
+				i = index.positions[key]
+			except KeyError:
+				raise ValueError('Variable {} is not registered in the Index'.format(key))
+			array[(i,) * cls.leading] = mapping[key]
+		return cls(index, array)
+
+class DenseHessian(DenseDer):
+	"""
+	This class is a thin read-only view of a dense Hessian matrix, used as the second order partials of a Variable
+	when the cross partials are needed. t.sec_der['x'] still returns d2f/dx2 and t.sec_der['x', 'y'] returns d2f/dxdy.
+	"""
+	__slots__ = ()
+	leading = 2
+
+	def __getitem__(self, name):
+		"""Return the second partial with respect to name, or to both names of a pair. Unknown names give 0.0."""
+		try:
+			if isinstance(name, tuple):
+				i, j = (self.index.positions[n] for n in name)
+			else:
+				i = j = self.index.positions[name]
+			return self.array[i, j]
+		except KeyError:
+			return 0.0
+
+	def __repr__(self):
+		return 'DenseHessian({})'.format(self.array)
+
+	@staticmethod
+	def outer(a, b):
+		"""Return the outer product of the first order partials a and b (over the variable axis)."""
+		return a[:, None] * b[None, :]
+
+class SparseDer(DenseDer):
+	"""
+	This class is a thin read-only view of a sparse derivative vector. Only the partials with respect to the variables
+	at rows (sorted positions in the Index) are stored, so the size of each intermediate result depends on the number
+	of variables it actually depends on, not on the number of registered variables. The first and second order
+	partials of a Variable share their rows, and so do most results with the rows of their operands. The arrays cost
+	a fixed overhead per result, so this storage is not smaller than dictionaries for results depending on a few
+	variables (see benchmarks/memory.py).
+	"""
+	__slots__ = ('rows',)
+
+	def __init__(self, index, rows, array):
+		"""The constructor for SparseDer Class.
+
+		Args:
+			index (Index object): The registry which gives the position of each variable.
+			rows (NumPy array of ints): The sorted positions of the stored partials.
+			array (NumPy array): The partials, one entry per position in rows.
+		"""
+		self.index = index
+		self.rows = rows
+		self.array = array
+
+	def __getitem__(self, name):
+		"""Return the partial with respect to name. Like a defaultdict(float), unknown names give 0.0."""
+		try:
+			i = self.index.positions[name]
+		except KeyError:
+			return 0.0
+		k = np.searchsorted(self.rows, i)
+		if k < len(self.rows) and self.rows[k] == i:
+			return self.array[k]
+		return 0.0
+
+	def __contains__(self, name):
+		i = self.index.positions.get(name)
+		return i is not None and i in self.rows
+
+	def __iter__(self):
+		names = self.index.names
+		return (names[i] for i in self.rows)
+
+	def __len__(self):
+		return len(self.rows)
+
+	def __repr__(self):
+		return 'SparseDer({})'.format(dict(self.items()))
+
+	def new(self, array):
+		"""Return a partials view over the same index and rows holding array."""
+		return SparseDer(self.index, self.rows, array)
+
+	def scatter(self, rows, ndim):
+		"""Return the array laid out on rows, which must contain self.rows, with ndim batch axes.
+		The partials with respect to the variables which are not in self.rows are zero."""
+		array = self.aligned(ndim)
+		if rows is self.rows:
+			return array
+		out = np.zeros((len(rows),) + array.shape[1:], dtype=array.dtype)
+		out[np.searchsorted(rows, self.rows)] = array
+		return out
+
+	@classmethod
+	def seed(cls, index, name, der=1.0, sec_der=0.0):
+		"""Return the first and second order partials of the seed variable called name, sharing their rows.
+
+		EXAMPLES
+		>>> d, s = SparseDer.seed(Index(['x', 'y']), 'y')
+		>>> print(d['y'], s['y'], d['x'], len(d))
+		1.0 0.0 0.0 1
+		"""
+		rows = np.array([index.positions[name]])
+		shape = (1,) + np.shape(der)
+		return (cls(index, rows, np.full(shape, der, dtype=np.result_type(der, float))),
+				cls(index, rows, np.full(shape, sec_der, dtype=np.result_type(sec_der, float))))
+
+	@classmethod
+	def from_mapping(cls, index, mapping):
+		"""Return the sparse partials over index holding the partials found in mapping (a dictionary or a
+		DenseDer). Raise a ValueError if mapping refers to a name which is not registered in index."""
+		if type(mapping) is cls and (mapping.index is index or mapping.index.names == index.names):
+			return mapping
+		try:
+			rows = sorted((index.positions[key], key) for key in mapping)
+		except KeyError as e:
+			raise ValueError('Variable {} is not registered in the Index'.format(e.args[0]))
+		shape = np.broadcast_shapes(*[np.shape(mapping[key]) for key in mapping])
+		dtype = complex if any(np.iscomplexobj(mapping[key]) for key in mapping) else float
+		array = np.zeros((len(rows),) + shape, dtype=dtype)
+		for k, (i, key) in enumerate(rows):
+			array[k] = mapping[key]
+		return cls(index, np.array([i for i, key in rows], dtype=int), array)
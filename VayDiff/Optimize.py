@@ -0,0 +1,286 @@
+import numpy as np
+from VayDiff.Reverse import Tape, Node
+
+class OptimizeResult:
+	"""
+	This class holds the outcome of a minimization: the solution x, the value fun and the gradient grad of the
+	function at x, the number of iterations nit, of function evaluations nfev, of gradient sweeps ngev and of
+	Hessian-vector products nhev, whether the gradient tolerance was reached (success) and why it stopped (message).
+	"""
+	def __init__(self, x, fun, grad, nit, nfev, ngev, nhev, success, message):
+		"""The constructor for OptimizeResult Class."""
+		self.x = x
+		self.fun = fun
+		self.grad = grad
+		self.nit = nit
+		self.nfev = nfev
+		self.ngev = ngev
+		self.nhev = nhev
+		self.success = success
+		self.message = message
+
+	def __repr__(self):
+		return 'OptimizeResult(fun={}, nit={}, nfev={}, ngev={}, nhev={}, success={}, message={!r})'.format(
+			self.fun, self.nit, self.nfev, self.ngev, self.nhev, self.success, self.message)
+
+class _Point:
+	"""An evaluation of the function: x, its value and the Tape it was recorded on."""
+	__slots__ = ('x', 'value', 'tape', 'inputs', 'output')
+
+	def __init__(self, x, value, tape, inputs, output):
+		self.x = x
+		self.value = value
+		self.tape = tape
+		self.inputs = inputs
+		self.output = output
+
+class _Objective:
+	"""
+	This class evaluates a scalar function of n variables in reverse mode and counts the evaluations.
+	Each evaluation is recorded on a Tape, so the gradient at an accepted point costs one backward sweep
+	and the Hessian-vector products of Newton's method reuse the same tape.
+	"""
+	def __init__(self, function):
+		self.function = function
+		self.nfev = 0
+		self.ngev = 0
+		self.nhev = 0
+
+	def record(self, x):
+		"""Return the _Point of the function at x."""
+		self.nfev += 1
+		tape = Tape()
+		inputs = [tape.variable(v) for v in x.tolist()]
+		output = self.function(*inputs)
+		value = float(output.val if isinstance(output, Node) else output)
+		return _Point(x, value, tape, inputs, output)
+
+	def gradient(self, point):
+		"""Return the gradient of the function at point."""
+		self.ngev += 1
+		if not isinstance(point.output, Node):
+			return np.zeros(len(point.x))
+		return point.tape.gradient(point.output, point.inputs)
+
+	def hvp(self, point, v):
+		"""Return the product of the Hessian of the function at point with v."""
+		self.nhev += 1
+		if not isinstance(point.output, Node):
+			return np.zeros(len(point.x))
+		return point.tape.hvp(point.output, point.inputs, v)[1]
+
+def _start(x0):
+	"""Return x0, a list of real numbers or of Variable objects, as a NumPy array."""
+	return np.array([getattr(v, 'val', v) for v in x0], dtype=float)
+
+def _line_search(objective, point, grad, direction, c1=1e-4, c2=0.9, max_steps=50):
+	"""Return a point along direction from point, and its gradient, which satisfies the weak Wolfe conditions:
+	the function decreases enough and its slope increases enough, which keeps the quasi-Newton updates positive
+	definite. The step starts at 1 and is doubled or bisected until both hold. If they never do, the last point
+	which decreased the function enough is returned, or (None, None) if there is none."""
+	slope = grad @ direction
+	low, high, step = 0.0, np.inf, 1.0
+	accepted = (None, None)
+	with np.errstate(all='ignore'):
+		for _ in range(max_steps):
+			trial = objective.record(point.x + step * direction)
+			if not trial.value <= point.value + c1 * step * slope:
+				high = step
+			else:
+				trial_grad = objective.gradient(trial)
+				accepted = (trial, trial_grad)
+				if trial_grad @ direction >= c2 * slope:
+					break
+				low = step
+			step = 2.0 * low if high == np.inf else 0.5 * (low + high)
+	return accepted
+
+def _minimize(objective, x0, tol, maxiter, direction, update=None, ftol=1e-15):
+	"""Run the descent loop shared by the minimizers. direction(point, grad) returns the search direction,
+	update(s, y) is called with the step and the change of the gradient after each iteration.
+	The loop also stops when the relative decrease of the function falls below ftol, i.e. to the rounding errors."""
+	point = objective.record(_start(x0))
+	grad = objective.gradient(point)
+	message = 'Maximum number of iterations reached'
+	nit = 0
+	while nit < maxiter:
+		if np.max(np.abs(grad), initial=0.0) <= tol:
+			message = 'Gradient tolerance reached'
+			break
+		d = direction(point, grad)
+		if grad @ d >= 0:
+			d = -grad
+		trial, new_grad = _line_search(objective, point, grad, d)
+		if trial is None:
+			message = 'The line search failed to decrease the function'
+			break
+		if point.value - trial.value <= ftol * max(abs(point.value), abs(trial.value), 1.0):
+			point, grad = trial, new_grad
+			nit += 1
+			message = 'The function stopped decreasing'
+			break
+		if update is not None:
+			update(trial.x - point.x, new_grad - grad)
+		point, grad = trial, new_grad
+		nit += 1
+	success = np.max(np.abs(grad), initial=0.0) <= tol
+	if success:
+		message = 'Gradient tolerance reached'
+	return OptimizeResult(point.x, point.value, grad, nit, objective.nfev, objective.ngev, objective.nhev,
+						  bool(success), message)
+
+def newton(function, x0, tol=1e-6, maxiter=100):
+	"""Minimize a scalar function with Newton's method. Each Newton system is solved by conjugate gradients
+	with Hessian-vector products taken on the tape of the current point, so the Hessian is never formed and the
+	memory grows linearly with the number of variables (truncated Newton, or Newton-CG). A direction of negative
+	curvature stops the conjugate gradients early.
+
+	INPUTS
+		function: a scalar function of n variables defined by user, which may use every function in BasicMath
+		x0 (list of real numbers or Variable objects): the starting point.
+		tol (real number): the iterations stop when every partial of the gradient is at most tol in absolute value.
+		maxiter (integer): the maximum number of iterations.
+
+	RETURNS
+		An OptimizeResult.
+
+	EXAMPLES
+	>>> r = newton(lambda x,y: (x-1)**2 + 10*(y-x**2)**2, [-1.0, 2.0])
+	>>> r.success, np.round(r.x, 6)
+	(True, array([1., 1.]))
+	"""
+	objective = _Objective(function)
+
+	def direction(point, grad):
+		norm = np.sqrt(grad @ grad)
+		tolerance = min(0.5, np.sqrt(norm)) * norm
+		d = np.zeros_like(grad)
+		r = -grad
+		p = r.copy()
+		rr = r @ r
+		for _ in range(len(grad)):
+			Hp = objective.hvp(point, p)
+			curvature = p @ Hp
+			if curvature <= 0:
+				return d if d.any() else -grad
+			alpha = rr / curvature
+			d += alpha * p
+			r -= alpha * Hp
+			rr_new = r @ r
+			if np.sqrt(rr_new) <= tolerance:
+				break
+			p *= rr_new / rr
+			p += r
+			rr = rr_new
+		return d
+
+	return _minimize(objective, x0, tol, maxiter, direction)
+
+def bfgs(function, x0, tol=1e-6, maxiter=None):
+	"""Minimize a scalar function with the BFGS quasi-Newton method. The approximation of the inverse Hessian,
+	a dense n by n matrix, is updated in place, so this suits up to a few thousand variables; use lbfgs beyond.
+
+	INPUTS
+		function: a scalar function of n variables defined by user, which may use every function in BasicMath
+		x0 (list of real numbers or Variable objects): the starting point.
+		tol (real number): the iterations stop when every partial of the gradient is at most tol in absolute value.
+		maxiter (integer): the maximum number of iterations. The default is 200 times the number of variables.
+
+	RETURNS
+		An OptimizeResult.
+
+	EXAMPLES
+	>>> r = bfgs(lambda x,y: (x-1)**2 + 10*(y-x**2)**2, [-1.0, 2.0])
+	>>> r.success, np.round(r.x, 4)
+	(True, array([1., 1.]))
+	"""
+	n = len(x0)
+	H = np.eye(n)
+	work = np.empty((n, n))
+	first = [True]
+
+	def update(s, y):
+		sy = s @ y
+		if sy <= 1e-12 * np.sqrt((s @ s) * (y @ y)):
+			return
+		if first[0]:
+			H[np.diag_indices(n)] = sy / (y @ y)
+			first[0] = False
+		rho = 1.0 / sy
+		Hy = H @ y
+		np.outer(Hy, s, out=work)
+		H[...] -= rho * work
+		H[...] -= rho * work.T
+		np.outer(s, s, out=work)
+		H[...] += (rho * rho * (y @ Hy) + rho) * work
+
+	return _minimize(_Objective(function), x0, tol, maxiter or 200 * n, lambda point, grad: -(H @ grad), update)
+
+def lbfgs(function, x0, memory=10, tol=1e-6, maxiter=None):
+	"""Minimize a scalar function with the limited memory BFGS method. Only the last memory steps and changes
+	of the gradient are kept, in preallocated memory by n buffers, so the cost per iteration and the storage grow
+	linearly with the number of variables.
+
+	INPUTS
+		function: a scalar function of n variables defined by user, which may use every function in BasicMath
+		x0 (list of real numbers or Variable objects): the starting point.
+		memory (integer): the number of corrections kept.
+		tol (real number): the iterations stop when every partial of the gradient is at most tol in absolute value.
+		maxiter (integer): the maximum number of iterations. The default is 200 times the number of variables.
+
+	RETURNS
+		An OptimizeResult.
+
+	EXAMPLES
+	>>> r = lbfgs(lambda x,y: (x-1)**2 + 10*(y-x**2)**2, [-1.0, 2.0])
+	>>> r.success, np.round(r.x, 4)
+	(True, array([1., 1.]))
+	"""
+	n = len(x0)
+	S = np.zeros((memory, n))
+	Y = np.zeros((memory, n))
+	rho = np.zeros(memory)
+	alpha = np.zeros(memory)
+	state = {'count': 0, 'gamma': 1.0}
+
+	def update(s, y):
+		sy = s @ y
+		if sy <= 1e-12 * np.sqrt((s @ s) * (y @ y)):
+			return
+		k = state['count'] % memory
+		S[k], Y[k], rho[k] = s, y, 1.0 / sy
+		state['gamma'] = sy / (y @ y)
+		state['count'] += 1
+
+	def direction(point, grad):
+		count = state['count']
+		order = [k % memory for k in range(count - 1, max(count - memory, 0) - 1, -1)]
+		q = -grad
+		for k in order:
+			alpha[k] = rho[k] * (S[k] @ q)
+			q -= alpha[k] * Y[k]
+		q *= state['gamma']
+		for k in reversed(order):
+			q += (alpha[k] - rho[k] * (Y[k] @ q)) * S[k]
+		return q
+
+	return _minimize(_Objective(function), x0, tol, maxiter or 200 * n, direction, update)
+
+METHODS = {'newton': newton, 'bfgs': bfgs, 'lbfgs': lbfgs}
+
+def minimize(function, x0, method='lbfgs', **options):
+	"""Minimize a scalar function of n variables with the given method, 'newton', 'bfgs' or 'lbfgs'.
+	The gradients are computed in reverse mode on a Tape, so their cost does not grow with n.
+	The options are passed to the method.
+
+	EXAMPLES
+	>>> from VayDiff import BasicMath as bm
+	>>> r = minimize(lambda x,y: bm.exp(x) - x + (y-2)**2, [1.0, 0.0], method='newton')
+	>>> np.round(r.x, 6), r.nit < 10
+	(array([0., 2.]), True)
+	"""
+	try:
+		method = METHODS[method]
+	except KeyError:
+		raise ValueError('Unknown method {!r}, expected one of {}'.format(method, sorted(METHODS)))
+	return method(function, x0, **options)
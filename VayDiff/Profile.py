@@ -0,0 +1,146 @@
+import sys
+import time
+import functools
+from collections.abc import Mapping
+from contextlib import contextmanager
+from VayDiff import BasicMath
+from VayDiff.VayDiff import Variable
+from VayDiff.Rules import UFUNCS
+
+OPERATORS = ('__add__', '__radd__', '__iadd__', '__sub__', '__rsub__', '__isub__', '__mul__', '__rmul__',
+			 '__truediv__', '__rtruediv__', '__pow__', '__rpow__', '__matmul__', '__rmatmul__', '__neg__', '__pos__')
+
+class OperatorStats:
+	"""
+	This class holds the counters of one operator: the number of calls, the number of partials read from the
+	operands (the derivative keys merged), the total wall time in seconds, which includes the operators it calls
+	(e.g. __radd__ calls __add__), and the largest number of partials of a result.
+	"""
+	__slots__ = ('calls', 'merges', 'seconds', 'max_keys')
+
+	def __init__(self):
+		"""The constructor for OperatorStats Class."""
+		self.calls = 0
+		self.merges = 0
+		self.seconds = 0.0
+		self.max_keys = 0
+
+	def __repr__(self):
+		return 'OperatorStats(calls={}, merges={}, seconds={:.6f}, max_keys={})'.format(
+			self.calls, self.merges, self.seconds, self.max_keys)
+
+def _keys(x):
+	"""Return the number of partials stored by x, or 0 if x is not a Variable with partials."""
+	der = getattr(x, 'der', None)
+	return len(der) if isinstance(der, Mapping) else 0
+
+def _counted_ufuncs(array_ufunc, wrappers):
+	"""Return Variable.__array_ufunc__ calling the instrumented BasicMath function of the same name (in wrappers)
+	for the NumPy ufuncs which have one, so that np.sin(x) is counted like BasicMath.sin(x)."""
+	def counted(x, ufunc, method, *inputs, **kwargs):
+		function = wrappers.get(UFUNCS.get(ufunc.__name__, ufunc.__name__))
+		if function is not None and method == '__call__' and not kwargs:
+			return function(*inputs)
+		return array_ufunc(x, ufunc, method, *inputs, **kwargs)
+	return counted
+
+class Profiler:
+	"""
+	This class counts the calls of the Variable operators and of the BasicMath functions (also when they are called
+	as NumPy ufuncs, e.g. np.sin(x)) while it is started.
+	Starting it replaces them by instrumented wrappers (also where the BasicMath functions were imported by name,
+	e.g. with from VayDiff.BasicMath import *), and stopping it puts the originals back, so nothing is measured
+	and nothing costs anything outside of it.
+	"""
+	def __init__(self):
+		"""The constructor for Profiler Class."""
+		self.stats = {}
+		self._patches = []
+
+	def _wrap(self, name, function):
+		"""Return the instrumented version of function, counting into self.stats[name]."""
+		stats = self.stats.setdefault(name, OperatorStats())
+		clock = time.perf_counter
+
+		@functools.wraps(function)
+		def wrapper(*args, **kwargs):
+			start = clock()
+			result = function(*args, **kwargs)
+			stats.seconds += clock() - start
+			stats.calls += 1
+			stats.merges += sum(_keys(x) for x in args)
+			size = _keys(result)
+			if size > stats.max_keys:
+				stats.max_keys = size
+			return result
+		return wrapper
+
+	def _patch(self, owner, name, value):
+		self._patches.append((owner, name, getattr(owner, name)))
+		setattr(owner, name, value)
+
+	def start(self):
+		"""Install the instrumented operators and functions."""
+		if self._patches:
+			raise RuntimeError('The profiler is already started')
+		for name in OPERATORS:
+			self._patch(Variable, name, self._wrap(name, Variable.__dict__[name]))
+		functions = {name: f for name, f in vars(BasicMath).items()
+					 if callable(f) and getattr(f, '__module__', None) == BasicMath.__name__ and not name.startswith('_')}
+		wrappers = {}
+		for name, function in functions.items():
+			wrapper = wrappers[name] = self._wrap(name, function)
+			for module in list(sys.modules.values()):
+				if getattr(module, '__dict__', {}).get(name) is function:
+					self._patch(module, name, wrapper)
+		self._patch(Variable, '__array_ufunc__', _counted_ufuncs(Variable.__dict__['__array_ufunc__'], wrappers))
+
+	def stop(self):
+		"""Restore the original operators and functions."""
+		while self._patches:
+			owner, name, value = self._patches.pop()
+			setattr(owner, name, value)
+
+	def report(self):
+		"""Return a table of the operators which were called, the slowest first.
+
+		EXAMPLES
+		>>> from VayDiff.VayDiff import Variable
+		>>> with profile() as p:
+		...     t = BasicMath.sin(Variable(1, name='x') * Variable(2, name='y'))
+		>>> print(p.report().splitlines()[0])
+		operator          calls     merges   max keys    total ms     us/call
+		>>> p.stats['__mul__'].calls, p.stats['__mul__'].merges, p.stats['sin'].max_keys
+		(1, 2, 2)
+		"""
+		lines = ['{:<14} {:>8} {:>10} {:>10} {:>11} {:>11}'.format(
+			'operator', 'calls', 'merges', 'max keys', 'total ms', 'us/call')]
+		for name, s in sorted(self.stats.items(), key=lambda item: -item[1].seconds):
+			if s.calls:
+				lines.append('{:<14} {:>8} {:>10} {:>10} {:>11.3f} {:>11.3f}'.format(
+					name, s.calls, s.merges, s.max_keys, s.seconds * 1e3, s.seconds / s.calls * 1e6))
+		return '\n'.join(lines)
+
+	def max_keys(self):
+		"""Return the largest number of partials of a result seen by any operator."""
+		return max([s.max_keys for s in self.stats.values()], default=0)
+
+@contextmanager
+def profile():
+	"""Count the calls, the merged derivative keys and the wall time of every Variable operator and BasicMath
+	function called inside the with block. The Profiler is returned by the with statement.
+
+	EXAMPLES
+	>>> from VayDiff.VayDiff import Variable
+	>>> x = Variable(2, name='x')
+	>>> with profile() as p:
+	...     t = x**2 + BasicMath.exp(x)
+	>>> sorted(name for name, s in p.stats.items() if s.calls)
+	['__add__', '__pow__', 'exp']
+	"""
+	profiler = Profiler()
+	profiler.start()
+	try:
+		yield profiler
+	finally:
+		profiler.stop()
@@ -0,0 +1,68 @@
+from collections import defaultdict
+from VayDiff.VayDiff import Variable, _copy, _accumulate
+from VayDiff.Reverse import Node
+
+def _reduce(terms, weights, start):
+	"""Return start + sum of weights[i]*terms[i] (weights None stands for all ones) in a single pass over the terms:
+	one Variable accumulating all the partials, one node of the Tape for reverse mode Nodes, and the chain of
+	operators for the traced Symbols and Taylor series, whose cost does not grow with the number of partials."""
+	terms = list(terms)
+	if weights is not None:
+		weights = list(weights)
+		if len(weights) != len(terms):
+			raise ValueError('Expected one weight per term, got {} for {}'.format(len(weights), len(terms)))
+	pairs = list(zip([1] * len(terms) if weights is None else weights, terms))
+	nodes = [(w, t) for w, t in pairs if isinstance(t, Node)]
+	if nodes:
+		val = start
+		for w, t in pairs:
+			val = val + w * getattr(t, 'val', t)
+		return nodes[0][1].tape.record(val, tuple(t for w, t in nodes), tuple(w for w, t in nodes))
+	if isinstance(start, Variable) or any(isinstance(t, Variable) for t in terms):
+		# The partials are added into a buffer of their own, which no other Variable can see.
+		acc = _copy(start) if isinstance(start, Variable) else Variable(start, defaultdict(float), defaultdict(float))
+		acc._owned = True
+		return _accumulate(acc, terms, weights)
+	total = start
+	for w, t in pairs:
+		total = total + (t if weights is None else w * t)
+	return total
+
+def sum(terms, start=0):
+	"""Return the sum of terms plus start. Unlike the builtin sum, which creates a Variable per term and merges
+	the partials accumulated so far at each step, the partials of all the terms are added into a single buffer,
+	so the cost is linear in the total number of partials.
+
+	INPUTS
+		terms (iterable of Variable objects, Nodes or numbers): the terms to add. They may use any storage of
+			the partials (dictionaries, dense or sparse), or be the Nodes of a Tape (one node is recorded).
+		start (Variable object or number): the value to add the terms to. Default is 0.
+
+	RETURNS
+		The sum (Variable), or a Node for Nodes, or a number if no term is a Variable.
+
+	EXAMPLES
+	>>> xs = [Variable(k, name='x{}'.format(k)) for k in range(4)]
+	>>> t = sum(x * x for x in xs)
+	>>> print(t.val, t.der['x3'], t.sec_der['x3'])
+	14 6.0 2.0
+	"""
+	return _reduce(terms, None, start)
+
+def dot(weights, terms):
+	"""Return the weighted sum of terms, sum of weights[i]*terms[i], accumulated in one buffer like sum.
+
+	INPUTS
+		weights (iterable of numbers): one weight per term.
+		terms (iterable of Variable objects, Nodes or numbers): the terms, as in sum.
+
+	RETURNS
+		The weighted sum (Variable), or a Node for Nodes, or a number if no term is a Variable.
+
+	EXAMPLES
+	>>> x, y = Variable(1, name='x'), Variable(2, name='y')
+	>>> t = dot([3, -1], [x * y, y])
+	>>> print(t.val, t.der['x'], t.der['y'])
+	4 6.0 2.0
+	"""
+	return _reduce(terms, weights, 0)
@@ -0,0 +1,220 @@
+import numpy as np
+
+def _array(values):
+	"""Return the list values as a float NumPy array, or a complex one if some of them are complex."""
+	array = np.array(values)
+	return array if array.dtype.kind in 'fc' else array.astype(float)
+
+class Tape:
+	"""
+	This class records every operation of a reverse mode evaluation.
+	Each entry holds the positions of the operands on the tape and the local partial derivatives
+	of the result with respect to them, so one backward sweep gives the gradient with respect to all inputs.
+	Non-linear operations also record their local second order partials, which Tape.hvp uses to compute
+	Hessian-vector products.
+	"""
+	def __init__(self):
+		"""The constructor for Tape Class."""
+		self.parents = []
+		self.partials = []
+		self.curvatures = []
+
+	def __len__(self):
+		"""Return the number of recorded nodes."""
+		return len(self.parents)
+
+	def variable(self, val):
+		"""Return a new input Node with value val."""
+		return self.record(val, (), ())
+
+	def record(self, val, parents, partials, curvature=None):
+		"""Append an operation to the tape and return its result as a Node.
+
+		INPUTS
+			self (Tape object)
+			val (real number): the value of the result.
+			parents (tuple of Node objects): the operands.
+			partials (tuple of real numbers): the local partial derivative with respect to each operand.
+			curvature (tuple of tuples of real numbers): the local second order partial derivatives with respect
+				to each pair of operands. The default None stands for a linear operation.
+
+		RETURNS
+			The Node holding val.
+		"""
+		self.parents.append(tuple(p.index for p in parents))
+		self.partials.append(partials)
+		self.curvatures.append(curvature)
+		return Node(val, self, len(self.parents) - 1)
+
+	def gradient(self, output, inputs):
+		"""Back-propagate the adjoints from output in one sweep over the tape.
+
+		INPUTS
+			self (Tape object)
+			output (Node object): the node to differentiate.
+			inputs (list of Node objects): the nodes to differentiate with respect to.
+
+		RETURNS
+			The partials of output with respect to each of inputs, as a NumPy array.
+
+		EXAMPLES
+		>>> tape = Tape()
+		>>> x, y = tape.variable(3.0), tape.variable(5.0)
+		>>> tape.gradient(x * y + x, [x, y])
+		array([6., 3.])
+		"""
+		adjoints = [0.0] * (output.index + 1)
+		adjoints[output.index] = 1.0
+		parents, partials = self.parents, self.partials
+		for i in range(output.index, -1, -1):
+			adjoint = adjoints[i]
+			if adjoint:
+				for p, w in zip(parents[i], partials[i]):
+					adjoints[p] += adjoint * w
+		return _array([adjoints[n.index] if n.index <= output.index else 0.0 for n in inputs])
+
+	def hvp(self, output, inputs, v):
+		"""Return the product of the Hessian of output with the vector v, in forward-over-reverse mode.
+		A forward sweep propagates the directional derivatives along v, then a backward sweep propagates
+		the adjoints together with their directional derivatives. The cost is a small multiple of the
+		cost of the tape and no storage depends on the number of inputs.
+
+		INPUTS
+			self (Tape object)
+			output (Node object): the node to differentiate.
+			inputs (list of Node objects): the nodes to differentiate with respect to.
+			v (list of real numbers): the direction, one entry per node of inputs.
+
+		RETURNS
+			The tuple (gradient, Hessian-vector product), as NumPy arrays.
+
+		EXAMPLES
+		>>> tape = Tape()
+		>>> x, y = tape.variable(3.0), tape.variable(5.0)
+		>>> tape.hvp(x**2 * y, [x, y], [1.0, 0.0])
+		(array([30.,  9.]), array([10.,  6.]))
+		"""
+		n = output.index + 1
+		parents, partials, curvatures = self.parents, self.partials, self.curvatures
+		dots = [0.0] * n
+		for node, direction in zip(inputs, v):
+			if node.index < n:
+				dots[node.index] += direction
+		for i in range(n):
+			if parents[i]:
+				dots[i] = sum(w * dots[p] for p, w in zip(parents[i], partials[i]))
+
+		adjoints = [0.0] * n
+		adjoint_dots = [0.0] * n
+		adjoints[output.index] = 1.0
+		for i in range(output.index, -1, -1):
+			adjoint, adjoint_dot = adjoints[i], adjoint_dots[i]
+			if not (adjoint or adjoint_dot):
+				continue
+			curvature = curvatures[i]
+			for k, (p, w) in enumerate(zip(parents[i], partials[i])):
+				adjoints[p] += adjoint * w
+				adjoint_dots[p] += adjoint_dot * w
+				if curvature is not None:
+					adjoint_dots[p] += adjoint * sum(c * dots[q] for c, q in zip(curvature[k], parents[i]))
+		collect = lambda values: _array([values[n.index] if n.index < len(values) else 0.0 for n in inputs])
+		return collect(adjoints), collect(adjoint_dots)
+
+class Node:
+	"""
+	This class defines a value recorded on a Tape for reverse mode differentiation.
+	Only the value and the position on the tape are stored, the derivatives are computed by Tape.gradient.
+	"""
+	__slots__ = ('val', 'tape', 'index')
+
+	def __init__(self, val, tape, index):
+		"""The constructor for Node Class.
+
+		Args:
+			val (real number): The value of the node.
+			tape (Tape object): The tape on which the node is recorded.
+			index (int): The position of the node on the tape.
+		"""
+		self.val = val
+		self.tape = tape
+		self.index = index
+
+	def chain(self, val, der, sec_der=None):
+		"""Record f(self) given val = f(self.val), der = f'(self.val) and sec_der = f''(self.val).
+		Used by the BasicMath functions."""
+		return self.tape.record(val, (self,), (der,), None if sec_der is None else ((sec_der,),))
+
+	def __add__(self, other):
+		"""Return self + other as a Node."""
+		try:
+			return self.tape.record(self.val + other.val, (self, other), (1.0, 1.0))
+		except AttributeError:
+			return self.tape.record(self.val + other, (self,), (1.0,))
+
+	def __radd__(self, other):
+		"""Return other + self as a Node."""
+		return self + other
+
+	def __sub__(self, other):
+		"""Return self - other as a Node."""
+		try:
+			return self.tape.record(self.val - other.val, (self, other), (1.0, -1.0))
+		except AttributeError:
+			return self.tape.record(self.val - other, (self,), (1.0,))
+
+	def __rsub__(self, other):
+		"""Return other - self as a Node."""
+		return self.tape.record(other - self.val, (self,), (-1.0,))
+
+	def __mul__(self, other):
+		"""Return self * other as a Node."""
+		try:
+			return self.tape.record(self.val * other.val, (self, other), (other.val, self.val), ((0.0, 1.0), (1.0, 0.0)))
+		except AttributeError:
+			return self.tape.record(self.val * other, (self,), (other,))
+
+	def __rmul__(self, other):
+		"""Return other * self as a Node."""
+		return self * other
+
+	def __truediv__(self, other):
+		"""Return self / other as a Node."""
+		try:
+			val = self.val / other.val
+		except AttributeError:
+			return self.tape.record(self.val / other, (self,), (1 / other,))
+		y = other.val
+		return self.tape.record(val, (self, other), (1 / y, -val / y), ((0.0, -1 / y**2), (-1 / y**2, 2 * val / y**2)))
+
+	def __rtruediv__(self, other):
+		"""Return other / self as a Node."""
+		val = other / self.val
+		return self.tape.record(val, (self,), (-val / self.val,), ((2 * val / self.val**2,),))
+
+	def __pow__(self, other):
+		"""Return self ** other as a Node."""
+		try:
+			x, y = self.val, other.val
+		except AttributeError:
+			x = self.val
+			return self.tape.record(x ** other, (self,), (other * x ** (other - 1),),
+									((other * (other - 1) * x ** (other - 2),),))
+		val = x ** y
+		log_x = np.log(x)
+		gxy = x ** (y - 1) * (1 + y * log_x)
+		return self.tape.record(val, (self, other), (y * x ** (y - 1), val * log_x),
+								((y * (y - 1) * x ** (y - 2), gxy), (gxy, val * log_x**2)))
+
+	def __rpow__(self, other):
+		"""Return other ** self as a Node."""
+		val = other ** self.val
+		log_other = np.log(other)
+		return self.tape.record(val, (self,), (val * log_other,), ((val * log_other**2,),))
+
+	def __neg__(self):
+		"""Return -self as a Node."""
+		return self.tape.record(-self.val, (self,), (-1.0,))
+
+	def __pos__(self):
+		"""Return +self, which is self."""
+		return self
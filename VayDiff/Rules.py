@@ -0,0 +1,98 @@
+"""The registry of the elementary functions: each one is declared once, by its chain rule, and every mode of
+differentiation is derived from it. BasicMath applies the compiled KERNELS to Variables and Nodes, Trace
+generates the code of a Plan from the templates and folds the constants with the kernels, and the traced and
+Taylor series arguments are dispatched by name.
+"""
+import math
+import numpy as np
+
+# Chain rule of every elementary operation, as Python expressions in the operands {a} and {b} and the result {v}.
+# A unary rule gives (value, f', f''), where f'' may refer to the already computed f' as {d1}.
+# A binary rule gives (value, gx, gy, gxx, gxy, gyy), None stands for zero.
+UNARY = {
+	'negative': ('-{a}', '(-1.0)', None),
+	'square': ('{a}*{a}', '2*{a}', '2.0'),
+	'sin': ('sin({a})', 'cos({a})', '-{v}'),
+	'cos': ('cos({a})', '-sin({a})', '-{v}'),
+	'tan': ('tan({a})', '1/cos({a})**2', '2*{v}*{d1}'),
+	'exp': ('exp({a})', '{v}', '{v}'),
+	'expm1': ('expm1({a})', 'exp({a})', '{d1}'),
+	'log': ('log({a})', '1/{a}', '-{d1}*{d1}'),
+	'log1p': ('log1p({a})', '1/(1 + {a})', '-{d1}*{d1}'),
+	'sqrt': ('sqrt({a})', '0.5/{v}', '-0.25/({a}*{v})'),
+	'arcsin': ('arcsin({a})', '1/sqrt(1 - {a}*{a})', '{a}*{d1}**3'),
+	'arccos': ('arccos({a})', '-1/sqrt(1 - {a}*{a})', '{a}*{d1}**3'),
+	'arctan': ('arctan({a})', '1/(1 + {a}*{a})', '-2*{a}*{d1}*{d1}'),
+	'sinh': ('sinh({a})', 'cosh({a})', '{v}'),
+	'cosh': ('cosh({a})', 'sinh({a})', '{v}'),
+	'tanh': ('tanh({a})', '1 - {v}*{v}', '-2*{v}*{d1}'),
+	'arcsinh': ('arcsinh({a})', '1/sqrt(1 + {a}*{a})', '-{a}*{d1}**3'),
+	'arccosh': ('arccosh({a})', '1/(sqrt({a} - 1)*sqrt({a} + 1))', '-{a}*{d1}**3'),
+	'arctanh': ('arctanh({a})', '1/(1 - {a}*{a})', '2*{a}*{d1}*{d1}'),
+	# 1.1283791670955126 is 2/sqrt(pi).
+	'erf': ('erf({a})', '1.1283791670955126*exp(-{a}*{a})', '-2*{a}*{d1}'),
+	'logistic': ('0.5 + 0.5*tanh(0.5*{a})', '{v}*(1 - {v})', '{d1}*(1 - 2*{v})'),
+	'abs': ('abs({a})', 'sign({a})', None),
+}
+
+BINARY = {
+	'add': ('{a} + {b}', '1.0', '1.0', None, None, None),
+	'subtract': ('{a} - {b}', '1.0', '(-1.0)', None, None, None),
+	'multiply': ('{a}*{b}', '{b}', '{a}', None, '1.0', None),
+	'divide': ('{a}/{b}', '1/{b}', '-{v}/{b}', None, '-1/({b}*{b})', '2*{v}/({b}*{b})'),
+	'power': ('power({a}, {b})', '{b}*power({a}, {b} - 1)', '{v}*log({a})', '{b}*({b} - 1)*power({a}, {b} - 2)',
+			  'power({a}, {b} - 1)*(1 + {b}*log({a}))', '{v}*log({a})**2'),
+	# At a tie the partial goes to the first operand, like the value of NumPy.
+	'maximum': ('maximum({a}, {b})', '1.0*({a} >= {b})', '1.0*({a} < {b})', None, None, None),
+	'minimum': ('minimum({a}, {b})', '1.0*({a} <= {b})', '1.0*({a} > {b})', None, None, None),
+}
+
+# The NumPy ufuncs whose name differs from the rule: np.true_divide is 'divide' (NumPy 2) or 'true_divide'
+# (NumPy 1), np.abs is 'absolute'.
+UFUNCS = {'true_divide': 'divide', 'absolute': 'abs'}
+
+def _erf(a):
+	"""Return the error function of a number or an array, with SciPy if it is installed."""
+	try:
+		from scipy.special import erf
+	except ImportError:
+		return np.vectorize(math.erf, otypes=[float])(a)[()]
+	return erf(a)
+
+def _sign(a):
+	"""Return the sign of a real number or array, the derivative of abs. Since abs is not holomorphic, it has no
+	complex derivative, and complex values raise a TypeError."""
+	if np.iscomplexobj(a):
+		raise TypeError('abs has no complex derivative, differentiate the real and imaginary parts instead')
+	return np.sign(a) if isinstance(a, (np.ndarray, np.generic)) else 1.0*((a > 0) - (a < 0))
+
+def _pow(a, b):
+	"""Return a**b for numbers or arrays. A negative real base with a non integer real exponent gives nan and a
+	RuntimeWarning, like NumPy, instead of the complex number of Python."""
+	if isinstance(a, (int, float)) and isinstance(b, (int, float)) and a < 0 and not float(b).is_integer():
+		return float(np.float64(a) ** b)
+	return a ** b
+
+# The functions called by the rules, for Python numbers and for NumPy arrays.
+SCALAR_FUNCTIONS = {'sin': math.sin, 'cos': math.cos, 'tan': math.tan, 'exp': math.exp, 'expm1': math.expm1,
+					'log': math.log, 'log1p': math.log1p, 'sqrt': math.sqrt, 'arcsin': math.asin,
+					'arccos': math.acos, 'arctan': math.atan, 'sinh': math.sinh, 'cosh': math.cosh,
+					'tanh': math.tanh, 'arcsinh': math.asinh, 'arccosh': math.acosh, 'arctanh': math.atanh,
+					'erf': math.erf, 'abs': abs, 'sign': lambda a: 1.0*((a > 0) - (a < 0)),
+					'maximum': lambda a, b: a if a >= b else b, 'minimum': lambda a, b: a if a <= b else b,
+					'power': _pow}
+ARRAY_FUNCTIONS = dict({name: getattr(np, name) for name in SCALAR_FUNCTIONS if name not in ('erf', 'sign', 'power')},
+					   erf=_erf, sign=_sign, power=_pow)
+
+def _compile(rule, args):
+	"""Return the function of args computing the expression rule in the NumPy namespace, None for None."""
+	if rule is None:
+		return None
+	names = dict(a='a', b='b', v='v', d1='d1')
+	return eval('lambda {}: {}'.format(', '.join(args), rule.format(**names)), dict(ARRAY_FUNCTIONS))
+
+# The rules as functions: (value(a), d1(a, v), d2(a, v, d1)) and (value(a, b), gx(a, b, v), ..., gyy(a, b, v)).
+KERNELS = {name: (_compile(rule[0], 'a'), _compile(rule[1], 'av'), _compile(rule[2], ('a', 'v', 'd1')))
+		   for name, rule in UNARY.items()}
+BINARY_KERNELS = {name: (_compile(rule[0], 'ab'),) + tuple(_compile(r, 'abv') for r in rule[1:])
+				  for name, rule in BINARY.items()}
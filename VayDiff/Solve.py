@@ -0,0 +1,140 @@
+import numpy as np
+from VayDiff.VayDiff import Diff, Variable
+
+REFRESH = {'newton': 1, 'chord': None}
+
+class SolveResult:
+	"""
+	This class holds the outcome of solve: the solution x, the residuals fun at x, the number of iterations nit,
+	of evaluations of the residuals alone nfev, of evaluations of the Jacobian (with the residuals) njev and of LU
+	factorizations nfactor, whether the tolerance was reached (success) and why it stopped (message).
+	"""
+	def __init__(self, x, fun, nit, nfev, njev, nfactor, success, message):
+		"""The constructor for SolveResult Class."""
+		self.x = x
+		self.fun = fun
+		self.nit = nit
+		self.nfev = nfev
+		self.njev = njev
+		self.nfactor = nfactor
+		self.success = success
+		self.message = message
+
+	def __repr__(self):
+		return 'SolveResult(nit={}, nfev={}, njev={}, nfactor={}, success={}, message={!r})'.format(
+			self.nit, self.nfev, self.njev, self.nfactor, self.success, self.message)
+
+def _residuals(functions, x):
+	"""Return the values of functions at x without derivatives, the variables being plain numbers."""
+	values = np.array(functions(*x) if callable(functions) else [func(*x) for func in functions]).ravel()
+	return values if values.dtype.kind in 'fc' else values.astype(float)
+
+def solve(functions, initial_point, method='newton', refresh=None, damping=1.0, tol=1e-10, maxiter=100):
+	"""Solve the nonlinear system F(x) = 0 with Newton's method, where the Jacobian comes from Diff.jacobian.
+	The Jacobian is LU factorized, and the chord and Shamanskii variants reuse the factorization over several
+	iterations, trading a few more (cheap) iterations for fewer evaluations and factorizations of the Jacobian.
+	When a step does not decrease the norm of the residuals, an outdated factorization is refreshed first;
+	with an up-to-date one the step is halved, up to 20 times.
+
+	INPUTS
+		functions: a list of n functions defined by user, or a single function returning a list (or array) of
+			n outputs, like in Diff.jacobian. They may use every function in BasicMath.
+		initial_point (list of real numbers or Variable objects): the starting point, one value per variable.
+			With complex values, the system is solved in complex arithmetic (the functions must be holomorphic).
+		method (string): 'newton' factorizes the Jacobian at every iteration, 'chord' only at the initial point
+			(and when a step fails), 'shamanskii' every refresh iterations.
+		refresh (integer): the number of iterations a factorization is reused by 'shamanskii', 3 by default.
+		damping (real number in (0, 1]): the fraction of the Newton step taken at each iteration. Default is 1.
+		tol (real number): the iterations stop when every residual is at most tol in absolute value.
+		maxiter (integer): the maximum number of iterations.
+
+	RETURNS
+		A SolveResult.
+
+	EXAMPLES
+	>>> r = solve([lambda x,y: x**2 + y**2 - 4, lambda x,y: x*y - 1], [2.0, 0.5])
+	>>> r.success, np.round(r.x, 6)
+	(True, array([1.931852, 0.517638]))
+	>>> r = solve(lambda x,y: [x**2 + y**2 - 4, x*y - 1], [2.0, 0.5], method='chord')
+	>>> r.success, r.njev < r.nit
+	(True, True)
+	"""
+	from scipy.linalg import lu_factor, lu_solve
+	if method == 'shamanskii':
+		refresh = refresh or 3
+	elif method in REFRESH:
+		refresh = REFRESH[method]
+	else:
+		raise ValueError('Unknown method {!r}, expected one of chord, newton, shamanskii'.format(method))
+	if not 0 < damping <= 1:
+		raise ValueError('damping must be in (0, 1]')
+	diff = Diff()
+	x = np.array([getattr(v, 'val', v) for v in initial_point])
+	if x.dtype.kind not in 'fc':
+		x = x.astype(float)
+	n = len(x)
+	counts = {'nfev': 0, 'njev': 0, 'nfactor': 0}
+
+	def jacobian(x):
+		counts['njev'] += 1
+		with np.errstate(all='ignore'):
+			F, J = diff._values_jacobian(functions, [Variable(v, name='x{}'.format(j))
+														 for j, v in enumerate(x.tolist())])
+		if J.shape != (n, n):
+			raise ValueError('solve needs as many functions as variables, got {} for {}'.format(*J.shape))
+		return F, J
+
+	def factorize(J):
+		counts['nfactor'] += 1
+		return lu_factor(J)
+
+	def residuals(x):
+		counts['nfev'] += 1
+		with np.errstate(all='ignore'):
+			return _residuals(functions, x.tolist())
+
+	F, J = jacobian(x)
+	lu = factorize(J)
+	age = 0
+	nit = 0
+	message = 'Maximum number of iterations reached'
+	while True:
+		norm = np.max(np.abs(F), initial=0.0)
+		if norm <= tol:
+			message = 'Tolerance reached'
+			break
+		if nit >= maxiter:
+			break
+		step = damping * lu_solve(lu, -F)
+		for attempt in range(21):
+			x_new = x + step
+			# When the factorization is refreshed after a full step, the residuals come with the Jacobian (the
+			# halved steps, which are seldom accepted, evaluate the residuals alone).
+			due = refresh is not None and age + 1 >= refresh
+			J_new = None
+			if due and not attempt:
+				F_new, J_new = jacobian(x_new)
+			else:
+				F_new = residuals(x_new)
+			if np.max(np.abs(F_new), initial=0.0) < norm:
+				break
+			if age:
+				F, J = jacobian(x)
+				lu = factorize(J)
+				age = 0
+				step = damping * lu_solve(lu, -F)
+			else:
+				step = 0.5 * step
+		else:
+			message = 'The steps failed to decrease the residuals'
+			break
+		x, F = x_new, F_new
+		nit += 1
+		age += 1
+		if due:
+			if J_new is None:
+				F, J_new = jacobian(x)
+			lu = factorize(J_new)
+			age = 0
+	return SolveResult(x, F, nit, counts['nfev'], counts['njev'], counts['nfactor'],
+					   bool(np.max(np.abs(F), initial=0.0) <= tol), message)
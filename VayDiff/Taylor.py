@@ -0,0 +1,310 @@
+import math
+import operator
+import numpy as np
+from VayDiff.Rules import UFUNCS, ARRAY_FUNCTIONS
+
+def _weights(values, like):
+	"""Return values as a column which broadcasts against the batch axes of the coefficients like."""
+	return np.asarray(values, dtype=float).reshape((-1,) + (1,) * (like.ndim - 1))
+
+def _align(a, b):
+	"""Return the coefficients a and b with the same number of axes. The first axis stays the coefficient axis,
+	the batch axes broadcast like those of NumPy arrays."""
+	n = max(a.ndim, b.ndim)
+	pad = lambda c: c.reshape(c.shape[:1] + (1,) * (n - c.ndim) + c.shape[1:])
+	return pad(a), pad(b)
+
+def _column(value):
+	"""Return a constant value or array with a first axis of length 1, which broadcasts against the coefficient
+	axis of a series instead of the last batch axis."""
+	return np.reshape(value, (1,) + np.shape(value))
+
+def _mul(a, b):
+	"""Return the coefficients of the product of the series a and b (Cauchy product)."""
+	c = np.zeros(np.broadcast_shapes(a.shape, b.shape), dtype=np.result_type(a, b))
+	for k in range(len(c)):
+		c[k] = (a[:k + 1] * b[k::-1]).sum(axis=0)
+	return c
+
+def _div(a, b):
+	"""Return the coefficients of the quotient of the series a and b."""
+	c = np.zeros(np.broadcast_shapes(a.shape, b.shape), dtype=np.result_type(a, b))
+	c[0] = a[0] / b[0]
+	for k in range(1, len(c)):
+		c[k] = (a[k] - (b[1:k + 1] * c[k - 1::-1]).sum(axis=0)) / b[0]
+	return c
+
+def _exp(a):
+	e = np.zeros_like(a)
+	e[0] = np.exp(a[0])
+	for k in range(1, len(a)):
+		e[k] = (_weights(range(1, k + 1), a) * a[1:k + 1] * e[k - 1::-1]).sum(axis=0) / k
+	return e
+
+def _log(a):
+	c = np.zeros_like(a)
+	c[0] = np.log(a[0])
+	for k in range(1, len(a)):
+		c[k] = (a[k] - (_weights(range(1, k), a) * c[1:k] * a[k - 1:0:-1]).sum(axis=0) / k) / a[0]
+	return c
+
+def _pow(a, r):
+	"""Return the coefficients of the series a to the constant power r."""
+	if float(r).is_integer() and r >= 0:
+		result, base, n = None, a, int(r)
+		while n:
+			if n & 1:
+				result = base if result is None else _mul(result, base)
+			base, n = _mul(base, base), n >> 1
+		if result is None:
+			result = np.zeros_like(a)
+			result[0] = 1.0
+		return result
+	if float(r).is_integer():
+		one = np.zeros_like(a)
+		one[0] = 1.0
+		return _div(one, _pow(a, -r))
+	p = np.zeros_like(a)
+	p[0] = a[0] ** r
+	for k in range(1, len(a)):
+		j = _weights(range(1, k + 1), a)
+		p[k] = (((r + 1) * j - k) * a[1:k + 1] * p[k - 1::-1]).sum(axis=0) / (k * a[0])
+	return p
+
+def _sincos(a, sign=-1):
+	"""Return the coefficients of sin(a) and cos(a), or with sign=1 of sinh(a) and cosh(a)."""
+	s, c = np.zeros_like(a), np.zeros_like(a)
+	s[0], c[0] = (np.sin(a[0]), np.cos(a[0])) if sign < 0 else (np.sinh(a[0]), np.cosh(a[0]))
+	for k in range(1, len(a)):
+		j = _weights(range(1, k + 1), a) * a[1:k + 1]
+		s[k] = (j * c[k - 1::-1]).sum(axis=0) / k
+		c[k] = sign * (j * s[k - 1::-1]).sum(axis=0) / k
+	return s, c
+
+def _integrate(f0, a, g):
+	"""Return the coefficients of f(a) given f0 = f(a[0]) and the first len(a) - 1 coefficients of g = f'(a) a'."""
+	c = np.zeros_like(a)
+	c[0] = f0
+	c[1:] = g / _weights(range(1, len(a)), a)
+	return c
+
+def _derivative(a):
+	"""Return the first len(a) - 1 coefficients of the derivative of the series a."""
+	return a[1:] * _weights(range(1, len(a)), a)
+
+def _one_plus(c, a):
+	"""Return the coefficients of 1 + c a."""
+	b = c * a
+	b[0] = b[0] + 1
+	return b
+
+def _arcsin(a, sign=1):
+	"""Return the coefficients of arcsin(a), or with sign=-1 of arccos(a)."""
+	if len(a) == 1:
+		return (np.arcsin if sign > 0 else np.arccos)(a)
+	n = len(a) - 1
+	g = sign * _div(_derivative(a), _pow(_one_plus(-1, _mul(a, a))[:n], 0.5))
+	return _integrate(np.arcsin(a[0]) if sign > 0 else np.arccos(a[0]), a, g)
+
+def _arctan(a):
+	if len(a) == 1:
+		return np.arctan(a)
+	n = len(a) - 1
+	return _integrate(np.arctan(a[0]), a, _div(_derivative(a), _one_plus(1, _mul(a, a))[:n]))
+
+def _arctanh(a):
+	if len(a) == 1:
+		return np.arctanh(a)
+	n = len(a) - 1
+	return _integrate(np.arctanh(a[0]), a, _div(_derivative(a), _one_plus(-1, _mul(a, a))[:n]))
+
+def _arcsinh(a):
+	if len(a) == 1:
+		return np.arcsinh(a)
+	n = len(a) - 1
+	return _integrate(np.arcsinh(a[0]), a, _div(_derivative(a), _pow(_one_plus(1, _mul(a, a))[:n], 0.5)))
+
+def _arccosh(a):
+	"""Return the coefficients of arccosh(a), whose derivative is 1/(sqrt(a - 1) sqrt(a + 1)) on the principal branch."""
+	if len(a) == 1:
+		return np.arccosh(a)
+	n = len(a) - 1
+	root = _mul(_pow(-_one_plus(-1, a)[:n], 0.5), _pow(_one_plus(1, a)[:n], 0.5))
+	return _integrate(np.arccosh(a[0]), a, _div(_derivative(a), root))
+
+def _erf(a):
+	if len(a) == 1:
+		return ARRAY_FUNCTIONS['erf'](a)
+	n = len(a) - 1
+	g = _mul(1.1283791670955126 * _exp(-_mul(a, a))[:n], _derivative(a))
+	return _integrate(ARRAY_FUNCTIONS['erf'](a[0]), a, g)
+
+def _logistic(a):
+	c = 0.5 * _div(*_sincos(0.5 * a, 1))
+	c[0] = c[0] + 0.5
+	return c
+
+def _shift(c, f0):
+	"""Return the coefficients c with the constant term replaced by f0, e.g. to compute log(1 + a) accurately."""
+	c[0] = f0
+	return c
+
+def _select(x, y, first):
+	"""Return the series x where first (a boolean of the batch shape) holds and y elsewhere."""
+	x, y = np.broadcast_arrays(*_align(x.coef, y.coef))
+	return Taylor(np.where(first, x, y))
+
+UNARY = {
+	'negative': lambda a: -a,
+	'exp': _exp,
+	'log': _log,
+	'sqrt': lambda a: _pow(a, 0.5),
+	'sin': lambda a: _sincos(a)[0],
+	'cos': lambda a: _sincos(a)[1],
+	'tan': lambda a: _div(*_sincos(a)),
+	'sinh': lambda a: _sincos(a, 1)[0],
+	'cosh': lambda a: _sincos(a, 1)[1],
+	'tanh': lambda a: _div(*_sincos(a, 1)),
+	'arcsin': _arcsin,
+	'arccos': lambda a: _arcsin(a, -1),
+	'arctan': _arctan,
+	'arcsinh': _arcsinh,
+	'arccosh': _arccosh,
+	'arctanh': _arctanh,
+	'expm1': lambda a: _shift(_exp(a), np.expm1(a[0])),
+	'log1p': lambda a: _shift(_log(_one_plus(1, a)), np.log1p(a[0])),
+	'erf': _erf,
+	'logistic': _logistic,
+	'abs': lambda a: ARRAY_FUNCTIONS['sign'](a[0]) * a,
+}
+
+BINARY = {'add': operator.add, 'subtract': operator.sub, 'multiply': operator.mul, 'divide': operator.truediv,
+		  'power': operator.pow, 'maximum': lambda x, y: _select(x, y, x.coef[0] >= y.coef[0]),
+		  'minimum': lambda x, y: _select(x, y, x.coef[0] <= y.coef[0])}
+
+class Taylor:
+	"""
+	This class defines a truncated Taylor series c[0] + c[1] t + ... + c[K] t**K of a function of one variable,
+	where c[k] is its k-th derivative divided by k!. Every operator and elementary function maps the coefficients
+	of its arguments to those of its result with the usual recurrences in O(K**2) operations, so derivatives of any
+	order are propagated in one evaluation (Taylor mode). It works with every function in BasicMath.
+	"""
+	__slots__ = ('coef',)
+	# Make NumPy arrays and scalars defer to the reflected operators of Taylor.
+	__array_priority__ = 100
+
+	def __init__(self, coef):
+		"""The constructor for Taylor Class.
+
+		Args:
+			coef (array): The K+1 coefficients. Trailing axes evaluate a batch of series at once.
+		"""
+		coef = np.asarray(coef)
+		self.coef = coef if coef.dtype.kind in 'fc' else coef.astype(float)
+
+	@classmethod
+	def variable(cls, val, order):
+		"""Return the series of the independent variable at val, i.e. val + t, truncated after t**order."""
+		coef = np.zeros((order + 1,) + np.shape(val), dtype=np.result_type(val, float))
+		coef[0] = val
+		if order:
+			coef[1] = 1.0
+		return cls(coef)
+
+	def _constant(self, value):
+		"""Return the series of a constant with the order of self."""
+		coef = np.zeros(self.coef.shape[:1] + np.shape(value), dtype=np.result_type(self.coef, value))
+		coef[0] = value
+		return Taylor(coef)
+
+	@property
+	def order(self):
+		return len(self.coef) - 1
+
+	@property
+	def val(self):
+		"""Return the series itself, so that NumPy ufuncs of x.val (e.g. np.sin(x.val)) apply the series rules."""
+		return self
+
+	def chain(self, val, der, sec_der=None):
+		"""Return val, the series of f(self), already computed by the ufunc. Used by the BasicMath functions."""
+		return val
+
+	def derivatives(self):
+		"""Return the derivatives of order 0 to K, i.e. c[k] * k!."""
+		return self.coef * _weights([math.factorial(k) for k in range(len(self.coef))], self.coef)
+
+	def __repr__(self):
+		return 'Taylor({})'.format(self.coef)
+
+	def apply(self, name, other=None):
+		"""Return the series of the elementary function name of Rules applied to self, or to (self, other)
+		for a binary one. Used by the BasicMath functions."""
+		if other is None and name in UNARY:
+			return Taylor(UNARY[name](self.coef))
+		if other is not None and name in BINARY:
+			return BINARY[name](self, other if isinstance(other, Taylor) else self._constant(other))
+		raise NotImplementedError('{} is not supported in Taylor mode'.format(name))
+
+	def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+		"""Apply the NumPy ufuncs to the series."""
+		name = UFUNCS.get(ufunc.__name__, ufunc.__name__)
+		if method != '__call__' or kwargs or (name not in UNARY and name not in BINARY):
+			raise NotImplementedError('{} is not supported in Taylor mode'.format(name))
+		if name in UNARY:
+			return inputs[0].apply(name)
+		x, y = [v if isinstance(v, Taylor) else self._constant(v) for v in inputs]
+		return x.apply(name, y)
+
+	def __add__(self, other):
+		try:
+			a, b = _align(self.coef, other.coef)
+		except AttributeError:
+			a, b = _align(self.coef, _column(other))
+			coef = a + np.zeros_like(b, dtype=np.result_type(a, b))
+			coef[0] = coef[0] + b[0]
+			return Taylor(coef)
+		return Taylor(a + b)
+
+	def __radd__(self, other):
+		return self + other
+
+	def __sub__(self, other):
+		return self + (-other)
+
+	def __rsub__(self, other):
+		return (-self) + other
+
+	def __mul__(self, other):
+		try:
+			return Taylor(_mul(*_align(self.coef, other.coef)))
+		except AttributeError:
+			return Taylor(operator.mul(*_align(self.coef, _column(other))))
+
+	def __rmul__(self, other):
+		return self * other
+
+	def __truediv__(self, other):
+		try:
+			return Taylor(_div(*_align(self.coef, other.coef)))
+		except AttributeError:
+			return Taylor(operator.truediv(*_align(self.coef, _column(other))))
+
+	def __rtruediv__(self, other):
+		return self._constant(other) / self
+
+	def __pow__(self, other):
+		if isinstance(other, Taylor):
+			return Taylor(_exp(_mul(*_align(other.coef, _log(self.coef)))))
+		if np.ndim(other) == 0:
+			return Taylor(_pow(self.coef, other))
+		return Taylor(_exp(operator.mul(*_align(_log(self.coef), _column(other)))))
+
+	def __rpow__(self, other):
+		return Taylor(_exp(operator.mul(*_align(self.coef, _column(np.log(other))))))
+
+	def __neg__(self):
+		return Taylor(-self.coef)
+
+	def __pos__(self):
+		return self
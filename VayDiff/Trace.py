@@ -0,0 +1,385 @@
+import re
+import math
+import numpy as np
+from VayDiff.Rules import UNARY, BINARY, UFUNCS, SCALAR_FUNCTIONS, ARRAY_FUNCTIONS, KERNELS, BINARY_KERNELS
+
+# The operations evaluated when all the operands are constant, and those whose operands commute.
+FOLD = {name: kernel[0] for kernels in (KERNELS, BINARY_KERNELS) for name, kernel in kernels.items()}
+COMMUTATIVE = ('add', 'multiply')
+
+class Graph:
+	"""
+	This class records the operations applied to the inputs of a function, in evaluation order.
+	Each entry of ops is a tuple (name, *operands) where the operands are positions of earlier entries,
+	except for ('input', position in the argument list) and ('const', value).
+	"""
+	def __init__(self):
+		"""The constructor for Graph Class."""
+		self.ops = []
+
+	def __len__(self):
+		"""Return the number of recorded operations."""
+		return len(self.ops)
+
+	def input(self, position):
+		"""Return the Symbol standing for the argument at position."""
+		self.ops.append(('input', position))
+		return Symbol(self, len(self.ops) - 1)
+
+	def constant(self, value):
+		"""Return the Symbol standing for the constant value."""
+		self.ops.append(('const', value))
+		return Symbol(self, len(self.ops) - 1)
+
+	def record(self, name, *operands):
+		"""Append the operation name applied to operands and return its result as a Symbol.
+		Operands which are not Symbols are recorded as constants."""
+		self.ops.append((name,) + tuple(x.index if isinstance(x, Symbol) else self.constant(x).index
+										for x in operands))
+		return Symbol(self, len(self.ops) - 1)
+
+class Symbol:
+	"""
+	This class defines a traced value: it records every operation applied to it on a Graph instead of computing it.
+	It is passed to the user function by Diff.compile, and works with every function in BasicMath.
+	"""
+	__slots__ = ('graph', 'index')
+
+	def __init__(self, graph, index):
+		"""The constructor for Symbol Class.
+
+		Args:
+			graph (Graph object): The graph on which the operations are recorded.
+			index (int): The position of the operation giving this value.
+		"""
+		self.graph = graph
+		self.index = index
+
+	@property
+	def val(self):
+		"""Return the value, which is the Symbol itself, so that NumPy ufuncs of x.val (e.g. np.sin(x.val)) are traced."""
+		return self
+
+	def chain(self, val, der, sec_der=None):
+		"""Return val, the traced f(self). The derivatives der and sec_der are not recorded since
+		they are generated from the rule of the operation by Plan. Used by the BasicMath functions."""
+		return val
+
+	def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+		"""Record the NumPy ufuncs which have a rule in Rules."""
+		name = UFUNCS.get(ufunc.__name__, ufunc.__name__)
+		if method != '__call__' or kwargs or (name not in UNARY and name not in BINARY):
+			raise NotImplementedError('{} cannot be traced'.format(ufunc.__name__))
+		return self.graph.record(name, *inputs)
+
+	def __add__(self, other):
+		return self.graph.record('add', self, other)
+
+	def __radd__(self, other):
+		return self.graph.record('add', other, self)
+
+	def __sub__(self, other):
+		return self.graph.record('subtract', self, other)
+
+	def __rsub__(self, other):
+		return self.graph.record('subtract', other, self)
+
+	def __mul__(self, other):
+		return self.graph.record('multiply', self, other)
+
+	def __rmul__(self, other):
+		return self.graph.record('multiply', other, self)
+
+	def __truediv__(self, other):
+		return self.graph.record('divide', self, other)
+
+	def __rtruediv__(self, other):
+		return self.graph.record('divide', other, self)
+
+	def __pow__(self, other):
+		return self.graph.record('power', self, other)
+
+	def __rpow__(self, other):
+		return self.graph.record('power', other, self)
+
+	def __neg__(self):
+		return self.graph.record('negative', self)
+
+	def __pos__(self):
+		return self
+
+def simplify(graph, output):
+	"""Return an equivalent graph which does less work, together with its output.
+	The graph is rebuilt in one forward pass which
+		- folds the operations whose operands are all constant,
+		- applies the identities x + 0 = x, x - x = x + (-x) = 0, x * 1 = x, x / 1 = x, x**1 = x and -(-x) = x,
+		  and turns x + (-y) into x - y,
+		- reduces x**2 and x * x to the square of x,
+		- gives identical subexpressions (e.g. two calls of sin(x)) a single operation.
+	The operations which the output does not depend on are dropped later, by Plan.
+
+	INPUTS
+		graph (Graph object): the traced operations.
+		output (Symbol object): the traced result, recorded on graph.
+
+	RETURNS
+		The tuple (simplified Graph, its output Symbol).
+
+	EXAMPLES
+	>>> graph = Graph()
+	>>> x, y = graph.input(0), graph.input(1)
+	>>> new, output = simplify(graph, x + -x + x**2 * y)
+	>>> new.ops[output.index], new.ops[5]
+	(('multiply', 1, 5), ('square', 0))
+	"""
+	new = Graph()
+	ops = new.ops
+	memo = {}
+
+	def emit(op):
+		key = op
+		if op[0] == 'const' and _literal(op[1]) is None:
+			key = ('const', id(op[1]))
+		if key not in memo:
+			ops.append(op)
+			memo[key] = len(ops) - 1
+		return memo[key]
+
+	def number(i):
+		if ops[i][0] == 'const' and _literal(ops[i][1]) is not None:
+			return ops[i][1]
+		return None
+
+	def rewrite(name, *args):
+		values = [number(i) for i in args]
+		if None not in values:
+			try:
+				with np.errstate(all='ignore'):
+					return emit(('const', FOLD[name](*values)))
+			except (ValueError, ArithmeticError):
+				pass
+		a = args[0]
+		if name == 'negative' and ops[a][0] == 'negative':
+			return ops[a][1]
+		if len(args) == 2:
+			b = args[1]
+			va, vb = values
+			if name == 'add':
+				if va == 0:
+					return b
+				if vb == 0:
+					return a
+				if ops[a][0] == 'negative':
+					a, b = b, a
+				if ops[b][0] == 'negative':
+					return rewrite('subtract', a, ops[b][1])
+			elif name == 'subtract':
+				if a == b:
+					return emit(('const', 0.0))
+				if vb == 0:
+					return a
+				if va == 0:
+					return rewrite('negative', b)
+				if ops[b][0] == 'negative':
+					return rewrite('add', a, ops[b][1])
+			elif name == 'multiply':
+				if va == 1:
+					return b
+				if vb == 1:
+					return a
+				if a == b:
+					return rewrite('square', a)
+			elif name == 'divide' and vb == 1:
+				return a
+			elif name == 'power' and vb in (1, 2):
+				return a if vb == 1 else rewrite('square', a)
+			if name in COMMUTATIVE:
+				args = tuple(sorted(args))
+		return emit((name,) + tuple(args))
+
+	mapping = []
+	for op in graph.ops:
+		if op[0] in ('input', 'const'):
+			mapping.append(emit(op))
+		else:
+			mapping.append(rewrite(op[0], *[mapping[i] for i in op[1:]]))
+	return new, Symbol(new, mapping[output.index])
+
+def _literal(value):
+	"""Return the source of a constant if it can be written inline, otherwise None."""
+	if isinstance(value, np.generic):
+		value = value.item()
+	if type(value) in (int, float) and math.isfinite(value):
+		return repr(value) if value >= 0 else '({!r})'.format(value)
+	return None
+
+def _is_simple(expr):
+	"""Return True if expr is a name or a literal, which can be used without being assigned."""
+	return expr.isidentifier() or re.fullmatch(r'\d+(\.\d*)?|\(-\d+(\.\d*)?\)', expr) is not None
+
+def _product(*factors):
+	"""Return the source of the product of factors, leaving out the factors 1.0 and (-1.0), which flips the sign."""
+	sign = 1
+	kept = []
+	for f in factors:
+		if f == '1.0':
+			continue
+		if f == '(-1.0)':
+			sign = -sign
+			continue
+		kept.append(f)
+	if not kept:
+		return '1.0' if sign > 0 else '(-1.0)'
+	expr = '*'.join(kept)
+	return expr if sign > 0 else '-' + expr
+
+def _sum(terms):
+	"""Return the source of the sum of terms, leaving out the zero terms (None). Return None if all are zero."""
+	terms = [t for t in terms if t is not None]
+	return ' + '.join(terms) if terms else None
+
+class Plan:
+	"""
+	This class compiles a traced function into straight-line Python code computing its value, gradient and the
+	diagonal of its Hessian. The chain rule is unrolled once per variable, and the partials which are zero by
+	construction (with respect to a variable that a subexpression does not depend on) are left out, so calling
+	a Plan creates no intermediate Variable and no dictionary.
+	"""
+	def __init__(self, graph, output, names, optimize=True):
+		"""The constructor for Plan Class.
+
+		Args:
+			graph (Graph object): The traced operations.
+			output (Symbol object or real number): The traced result of the function.
+			names (list of strings): The names of the arguments, in order.
+			optimize (boolean): If True (the default), the graph is simplified before it is compiled.
+		"""
+		if not isinstance(output, Symbol):
+			output = graph.constant(output)
+		if optimize:
+			graph, output = simplify(graph, output)
+		self.graph = graph
+		self.output = output.index
+		self.names = list(names)
+		self.source, constants = self._generate()
+		code = compile(self.source, '<VayDiff plan>', 'exec')
+		scalar, array = dict(SCALAR_FUNCTIONS, **constants), dict(ARRAY_FUNCTIONS, **constants)
+		exec(code, scalar)
+		exec(code, array)
+		self._scalar, self._array = scalar['plan'], array['plan']
+
+	def _live(self):
+		"""Return the positions of the operations which the output depends on, in evaluation order."""
+		ops = self.graph.ops
+		live = {self.output}
+		for i in range(self.output, -1, -1):
+			if i in live and ops[i][0] not in ('input', 'const'):
+				live.update(ops[i][1:])
+		return sorted(live)
+
+	def _generate(self):
+		"""Return the source of the function plan(x0, ..., der, sec) and the constants it refers to."""
+		ops, p = self.graph.ops, len(self.names)
+		lines, constants = [], {}
+		value, der, sec = {}, {}, {}
+
+		def assign(name, expr):
+			if _is_simple(expr):
+				return expr
+			lines.append('{} = {}'.format(name, expr))
+			return name
+
+		for i in self._live():
+			op = ops[i]
+			name = op[0]
+			if name == 'input':
+				value[i], der[i], sec[i] = 'x{}'.format(op[1]), {op[1]: '1.0'}, {op[1]: None}
+				continue
+			if name == 'const':
+				value[i], der[i], sec[i] = _literal(op[1]), {}, {}
+				if value[i] is None:
+					value[i] = 'k{}'.format(i)
+					constants[value[i]] = op[1]
+				continue
+			v = 'v{}'.format(i)
+			der[i], sec[i] = {}, {}
+			if name in UNARY:
+				a = op[1]
+				rule_val, rule_d1, rule_d2 = UNARY[name]
+				value[i] = assign(v, rule_val.format(a=value[a]))
+				if not der[a]:
+					continue
+				d1 = assign('c{}'.format(i), rule_d1.format(a=value[a], v=value[i]))
+				d2 = rule_d2 and assign('e{}'.format(i), rule_d2.format(a=value[a], v=value[i], d1=d1))
+				for k in der[a]:
+					da = der[a][k]
+					der[i][k] = assign('d{}_{}'.format(i, k), _product(d1, da))
+					s = _sum([sec[a][k] and _product(d1, sec[a][k]), d2 and _product(d2, da, da)])
+					sec[i][k] = s and assign('s{}_{}'.format(i, k), s)
+				continue
+			if name not in BINARY:
+				raise NotImplementedError('{} cannot be compiled'.format(name))
+			a, b = op[1], op[2]
+			rule = BINARY[name]
+			value[i] = assign(v, rule[0].format(a=value[a], b=value[b]))
+			if not (der[a] or der[b]):
+				continue
+			needed = [der[a], der[b], der[a], der[a].keys() & der[b].keys(), der[b]]
+			gx, gy, gxx, gxy, gyy = [
+				assign('{}{}'.format(key, i), r.format(a=value[a], b=value[b], v=value[i])) if r and need else None
+				for key, r, need in zip(['gx', 'gy', 'gxx', 'gxy', 'gyy'], rule[1:], needed)]
+			for k in sorted(set(der[a]) | set(der[b])):
+				da, db = der[a].get(k), der[b].get(k)
+				sa, sb = sec[a].get(k), sec[b].get(k)
+				der[i][k] = assign('d{}_{}'.format(i, k), _sum([da and _product(gx, da), db and _product(gy, db)]))
+				s = _sum([sa and _product(gx, sa), sb and _product(gy, sb),
+						  gxx and da and _product(gxx, da, da), gxy and da and db and _product('2', gxy, da, db),
+						  gyy and db and _product(gyy, db, db)])
+				sec[i][k] = s and assign('s{}_{}'.format(i, k), s)
+
+		o = self.output
+		for k in range(p):
+			lines.append('der[{}] = {}'.format(k, der[o].get(k, '0.0')))
+			lines.append('sec[{}] = {}'.format(k, sec[o].get(k) or '0.0'))
+		lines.append('return {}'.format(value[o]))
+		args = ['x{}'.format(j) for j in range(p)] + ['der', 'sec']
+		source = 'def plan({}):\n'.format(', '.join(args)) + ''.join('\t' + line + '\n' for line in lines)
+		return source, constants
+
+	def __call__(self, *values):
+		"""Evaluate the compiled function and its partials at values.
+
+		INPUTS
+			self (Plan object)
+			values (real numbers or NumPy arrays): the value of each argument, in the order of names.
+				Arrays evaluate a whole batch of points at once, following the NumPy broadcasting rules.
+
+		RETURNS
+			The tuple (value, gradient, diagonal of the Hessian). The partials are NumPy arrays of length p
+			ordered like names (with the batch axes after the first one for array values).
+
+		EXAMPLES
+		>>> graph = Graph()
+		>>> x, y = graph.input(0), graph.input(1)
+		>>> f = Plan(graph, x**2 * y, ['x', 'y'])
+		>>> f(3.0, 5.0)
+		(45.0, array([30.,  9.]), array([10.,  0.]))
+		"""
+		if len(values) != len(self.names):
+			raise ValueError('Expected {} values, got {}'.format(len(self.names), len(values)))
+		p = len(self.names)
+		dtype = complex if any(np.iscomplexobj(v) for v in values) else float
+		if any(isinstance(v, np.ndarray) for v in values):
+			shape = (p,) + np.broadcast_shapes(*[np.shape(v) for v in values])
+			der, sec = np.empty(shape, dtype=dtype), np.empty(shape, dtype=dtype)
+			return self._array(*values, der, sec), der, sec
+		der, sec = np.empty(p, dtype=dtype), np.empty(p, dtype=dtype)
+		if dtype is complex:
+			# The math module is real only, NumPy evaluates complex scalars on its principal branches.
+			return self._array(*[np.complex128(v) for v in values], der, sec), der, sec
+		try:
+			val = self._scalar(*values, der, sec)
+		except (ValueError, ArithmeticError):
+			# Out of the domain of the math module (e.g. log(0)): follow NumPy like the Variable operators do.
+			val = self._array(*[np.float64(v) for v in values], der, sec)
+		return val, der, sec
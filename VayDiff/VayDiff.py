@@ -1,5 +1,433 @@
+import sys
 import numpy as np
 from collections import defaultdict
+from collections.abc import Mapping
+from VayDiff.Dense import Index, DenseDer, DenseHessian, SparseDer
+from VayDiff.Reverse import Tape, Node
+from VayDiff.Trace import Graph, Symbol, Plan
+from VayDiff.Taylor import Taylor
+from VayDiff.Cache import LRUCache, freeze
+from VayDiff.Rules import UFUNCS, KERNELS, BINARY_KERNELS, _pow
+
+def _dense_operands(x, y, ndim):
+	"""Return the first and second order partials of the result as empty views (whose new method wraps an array)
+	and the first and second order partials of x and y as arrays laid out alike, with (at least) ndim batch axes
+	after the variable axes. At least one of x and y carries DenseDer partials, the other one is converted if needed.
+	If all the array partials are SparseDer, the arrays are laid out on the union of their rows."""
+	if SparseDer in (type(x.der), type(y.der)) and DenseDer not in (type(x.der), type(y.der)):
+		return _sparse_operands(x, y, ndim)
+	index = x.der.index if isinstance(x.der, DenseDer) else y.der.index
+	sec_cls = DenseHessian if DenseHessian in (type(x.sec_der), type(y.sec_der)) else DenseDer
+	parts = [DenseDer.from_mapping(index, x.der), sec_cls.from_mapping(index, x.sec_der),
+			 DenseDer.from_mapping(index, y.der), sec_cls.from_mapping(index, y.sec_der)]
+	ndim = max([ndim] + [d.batch_ndim for d in parts])
+	return (DenseDer(index, None), sec_cls(index, None)) + tuple(d.aligned(ndim) for d in parts)
+
+def _sparse_operands(x, y, ndim):
+	"""Like _dense_operands for SparseDer partials. The rows of x and y are merged (reusing them when one
+	contains the other, so that results keep sharing their rows) and every array is scattered onto them."""
+	index = x.der.index if isinstance(x.der, SparseDer) else y.der.index
+	parts = [SparseDer.from_mapping(index, d) for d in (x.der, x.sec_der, y.der, y.sec_der)]
+	rows, other = parts[0].rows, parts[2].rows
+	if other is not rows and not (len(other) == len(rows) and (other == rows).all()):
+		union = np.union1d(rows, other)
+		rows = rows if len(union) == len(rows) else other if len(union) == len(other) else union
+	ndim = max([ndim] + [d.batch_ndim for d in parts])
+	result = SparseDer(index, rows, None)
+	return (result, result) + tuple(d.scatter(rows, ndim) for d in parts)
+
+def _color_columns(indptr, indices, p):
+	"""Greedily color the p columns of a sparsity pattern given in CSR form (indptr, indices) so that
+	two columns sharing a row never share a color. Return the array of colors."""
+	rows_of = [[] for _ in range(p)]
+	for i in range(len(indptr) - 1):
+		for j in indices[indptr[i]:indptr[i + 1]]:
+			rows_of[j].append(i)
+	colors = np.full(p, -1)
+	for j in range(p):
+		forbidden = {colors[k] for i in rows_of[j] for k in indices[indptr[i]:indptr[i + 1]]}
+		color = 0
+		while color in forbidden:
+			color += 1
+		colors[j] = color
+	return colors
+
+def _equal(a, b):
+	"""Return True if a and b are equal, elementwise for NumPy arrays."""
+	return bool(np.all(a == b))
+
+def _dtype(values):
+	"""Return complex if any of values (numbers or arrays) is complex, float otherwise."""
+	return complex if any(np.iscomplexobj(v) for v in values) else float
+
+def _partials(der):
+	"""Return the partials held by der, ordered by variable name."""
+	return [der[key] for key in sorted(der, key=str)]
+
+def _item(c):
+	"""Return a NumPy scalar as the equivalent Python number, whose arithmetic is several times faster."""
+	return c.item() if isinstance(c, np.generic) else c
+
+def _scale(x, val, c):
+	"""Return a Variable with value val whose partials are c times the partials of x."""
+	der, sec_der = x.der, x.sec_der
+	if isinstance(der, DenseDer):
+		ndim = max(np.ndim(c), der.batch_ndim, sec_der.batch_ndim)
+		return Variable(val, der.new(der.aligned(ndim) * c), sec_der.new(sec_der.aligned(ndim) * c))
+	c = _item(c)
+	ders = defaultdict(float)
+	sec_ders = defaultdict(float)
+	for key, dk in der.items():
+		ders[key] += dk * c
+		sec_ders[key] += sec_der[key] * c
+	return Variable(val, ders, sec_ders)
+
+def _integer(n):
+	"""Return n as an int if it is a real number with an integer value (e.g. 2 or 2.0), otherwise None."""
+	if isinstance(n, (int, float, np.integer, np.floating)) and float(n).is_integer():
+		return int(n)
+	return None
+
+def _is_constant(x):
+	"""Return True if all the partials of the Variable x are zero."""
+	der, sec_der = x.der, x.sec_der
+	if isinstance(der, DenseDer):
+		return not (np.any(der.array) or np.any(sec_der.array))
+	if not isinstance(der, Mapping):
+		return not (np.any(der) or np.any(sec_der))
+	return not any(np.any(d) for d in der.values()) and not any(np.any(d) for d in sec_der.values())
+
+def _power(x, n):
+	"""Return the Variable x**n for a constant exponent n.
+	Integer exponents are computed without log: 0, 1 and 2 directly, the other ones from a single power of x
+	(or of 1/x when n is negative) which also gives both derivatives."""
+	a = x.val
+	k = _integer(n)
+	if k is None:
+		return _chain(x, _pow(a, n), n * _pow(a, n - 1), n * (n - 1) * _pow(a, n - 2))
+	if k == 0:
+		return _chain(x, a ** 0, 0.0)
+	if k == 1:
+		return _chain(x, a, 1.0)
+	if k == 2:
+		return _chain(x, a * a, 2 * a, 2.0)
+	if k > 0:
+		p = a ** (k - 2)
+		return _chain(x, p * a * a, k * p * a, k * (k - 1) * p)
+	r = 1 / a
+	p = r ** -k
+	return _chain(x, p, k * p * r, k * (k - 1) * p * r * r)
+
+def _chain(x, val, d1, d2=None):
+	"""Apply the chain rule for a unary function f at x.
+	f' and f'' are computed once by the caller, so each partial costs a scale (by f') and, for the second order,
+	a scale plus a square (by f'' and x' x'), whatever the number of partials.
+
+	INPUTS
+		x (Variable object): the argument of f.
+		val (real number): f(x.val).
+		d1 (real number): f'(x.val).
+		d2 (real number or None): f''(x.val), None stands for zero.
+
+	RETURNS
+		The Variable f(x), whose partials are d1*x' and d1*x'' + d2*x'x' (the outer product of x' with itself,
+		or only its diagonal when the second order partials are not a DenseHessian).
+		If x is a reverse mode Node or a traced Symbol, f(x) is recorded on its tape or graph instead.
+		If x is a Taylor series, val is already the series of f(x) and is returned as is.
+	"""
+	if isinstance(x, (Node, Symbol, Taylor)):
+		return x.chain(val, d1, d2)
+	der, sec_der = x.der, x.sec_der
+	if isinstance(der, DenseDer):
+		ndim = max(np.ndim(d1), np.ndim(d2), der.batch_ndim, sec_der.batch_ndim)
+		a = der.aligned(ndim)
+		sec_ders = d1 * sec_der.aligned(ndim)
+		if d2 is not None:
+			sec_ders = sec_ders + d2 * sec_der.outer(a, a)
+		return Variable(val, der.new(d1 * a), sec_der.new(sec_ders))
+	d1, d2 = _item(d1), _item(d2)
+	ders = defaultdict(float)
+	sec_ders = defaultdict(float)
+	# Adding to 0.0 turns the negative zeros into zeros, like accumulating into the defaultdicts.
+	if d2 is None:
+		for key, dk in der.items():
+			ders[key] = 0.0 + d1 * dk
+			sec_ders[key] = 0.0 + d1 * sec_der[key]
+	else:
+		for key, dk in der.items():
+			ders[key] = 0.0 + d1 * dk
+			sec_ders[key] = 0.0 + d1 * sec_der[key] + d2 * dk * dk
+	return Variable(val, ders, sec_ders)
+
+def _chain2(x, y, val, gx, gy, gxx=None, gxy=None, gyy=None):
+	"""Apply the chain rule for a binary function g at (x, y).
+
+	INPUTS
+		x, y (Variable objects): the arguments of g.
+		val (real number): g(x.val, y.val).
+		gx, gy (real numbers): the first order partials of g.
+		gxx, gxy, gyy (real numbers or None): the second order partials of g, None stands for zero.
+
+	RETURNS
+		The Variable g(x, y), whose partials are gx*x' + gy*y' and
+		gx*x'' + gy*y'' + gxx*x'x' + gxy*(x'y' + y'x') + gyy*y'y' (outer products, or only their diagonal
+		when the second order partials are not a DenseHessian).
+	"""
+	if isinstance(x.der, DenseDer) or isinstance(y.der, DenseDer):
+		der, sec_der, xd, xs, yd, ys = _dense_operands(x, y, np.ndim(val))
+		outer = sec_der.outer
+		ders = gx * xd + gy * yd
+		sec_ders = gx * xs + gy * ys
+		if gxx is not None:
+			sec_ders = sec_ders + gxx * outer(xd, xd)
+		if gxy is not None:
+			sec_ders = sec_ders + gxy * (outer(xd, yd) + outer(yd, xd))
+		if gyy is not None:
+			sec_ders = sec_ders + gyy * outer(yd, yd)
+		return Variable(val, der.new(ders), sec_der.new(sec_ders))
+	xd, xs, yd, ys = x.der, x.sec_der, y.der, y.sec_der
+	gx, gy, gxx, gxy, gyy = _item(gx), _item(gy), _item(gxx), _item(gxy), _item(gyy)
+	ders = defaultdict(float)
+	sec_ders = defaultdict(float)
+	for key in xd:
+		ders[key] += gx * xd[key]
+		sec_ders[key] += gx * xs[key]
+		if gxx is not None:
+			sec_ders[key] += gxx * xd[key]**2
+		if gxy is not None:
+			sec_ders[key] += 2 * gxy * xd[key] * yd.get(key, 0.0)
+	for key in yd:
+		ders[key] += gy * yd[key]
+		sec_ders[key] += gy * ys[key]
+		if gyy is not None:
+			sec_ders[key] += gyy * yd[key]**2
+	return Variable(val, ders, sec_ders)
+
+def _apply(name, x):
+	"""Return the elementary function name of Rules at x: a Variable or a reverse mode Node through the chain rule,
+	a traced Symbol or a Taylor series by name, and the value alone for a plain number or array."""
+	value, d1, d2 = KERNELS[name]
+	try:
+		a = x.val
+	except AttributeError:
+		return value(x)
+	if isinstance(x, Symbol):
+		return x.graph.record(name, x)
+	if isinstance(x, Taylor):
+		return x.apply(name)
+	val = value(a)
+	der = d1(a, val)
+	return _chain(x, val, der, d2 and d2(a, val, der))
+
+def _apply2(name, x, y):
+	"""Return the elementary function name of Rules at (x, y), where either may be a plain number, like _apply."""
+	value, gx, gy, gxx, gxy, gyy = BINARY_KERNELS[name]
+	a, b = getattr(x, 'val', x), getattr(y, 'val', y)
+	if isinstance(a, Symbol) or isinstance(b, Symbol):
+		return (a if isinstance(a, Symbol) else b).graph.record(name, x, y)
+	if isinstance(a, Taylor):
+		return x.apply(name, y)
+	if isinstance(b, Taylor):
+		return y._constant(x).apply(name, y)
+	val = value(a, b)
+	if a is x and b is y:
+		return val
+	dx, dy = gx(a, b, val), gy(a, b, val)
+	dxx, dxy, dyy = [None if g is None else g(a, b, val) for g in (gxx, gxy, gyy)]
+	if b is y:
+		return _chain(x, val, dx, dxx)
+	if a is x:
+		return _chain(y, val, dy, dyy)
+	if isinstance(x, Node):
+		curvature = None
+		if not (dxx is None and dxy is None and dyy is None):
+			dxx, dxy, dyy = [0.0 if g is None else g for g in (dxx, dxy, dyy)]
+			curvature = ((dxx, dxy), (dxy, dyy))
+		return x.tape.record(val, (x, y), (dx, dy), curvature)
+	return _chain2(x, y, val, dx, dy, dxx, dxy, dyy)
+
+# The NumPy ufuncs computed by the operators of Variable, as (operator, reflected operator).
+OPERATORS = {'add': ('__add__', '__radd__'), 'subtract': ('__sub__', '__rsub__'), 'multiply': ('__mul__', '__rmul__'),
+			 'divide': ('__truediv__', '__rtruediv__'), 'power': ('__pow__', '__rpow__'),
+			 'equal': ('__eq__', '__eq__'), 'not_equal': ('__ne__', '__ne__')}
+
+def _linear(x, op):
+	"""Return the Variable op(x) for a linear map op of the batch axes of x.val (e.g. a sum or a dot product).
+	Its partials are the same map applied to the partials of x, so each one costs a single NumPy call.
+
+	INPUTS
+		x (Variable object): the argument, whose value is a batch (array).
+		op (function): op(array, lead) applies the map to an array with lead variable axes before the batch axes,
+			which it must keep in front (lead is 0 for the value and the partials stored in dictionaries).
+
+	RETURNS
+		The Variable op(x).
+	"""
+	shape = np.shape(x.val)
+
+	def apply(d, lead):
+		return _item(op(np.broadcast_to(d, np.shape(d)[:lead] + shape), lead))
+
+	der, sec_der = x.der, x.sec_der
+	val = apply(x.val, 0)
+	if isinstance(der, DenseDer):
+		return Variable(val, der.new(apply(der.aligned(len(shape)), der.leading)),
+						sec_der.new(apply(sec_der.aligned(len(shape)), sec_der.leading)))
+	if not isinstance(der, Mapping):
+		return Variable(val, apply(der, 0), apply(sec_der, 0))
+	ders = defaultdict(float)
+	sec_ders = defaultdict(float)
+	for key, dk in der.items():
+		ders[key] = apply(dk, 0)
+		sec_ders[key] = apply(sec_der[key], 0)
+	return Variable(val, ders, sec_ders)
+
+def _sum(x, axis=None, keepdims=False):
+	"""Return the Variable np.sum(x.val, axis, keepdims=keepdims) with its partials, like np.sum of an array."""
+	ndim = np.ndim(x.val)
+	axes = range(ndim) if axis is None else [axis] if np.ndim(axis) == 0 else axis
+	# Count the negative axes from the end of the batch axes (an axis out of range still raises on the value).
+	axes = [k + ndim if k < 0 else k for k in axes]
+	return _linear(x, lambda a, lead: np.sum(a, axis=tuple(lead + k for k in axes), keepdims=keepdims))
+
+def _dot(a, b):
+	"""Return the Variable np.dot(a, b) with its partials, where a or b is a Variable (both only for vectors)."""
+	if np.ndim(getattr(a, 'val', a)) == 0 or np.ndim(getattr(b, 'val', b)) == 0:
+		return a * b
+	if isinstance(a, Variable) and isinstance(b, Variable):
+		if np.ndim(a.val) == 1 and np.ndim(b.val) == 1:
+			return _sum(a * b)
+		return NotImplemented
+	if isinstance(a, Variable):
+		return _linear(a, lambda d, lead: np.dot(d, b))
+	# Contract the last axis of a with the second to last axis of b (its only one for a vector), then move the
+	# variable axes, which np.tensordot puts after the axes of a, back to the front.
+	m = np.ndim(a) - 1
+	k = 0 if np.ndim(b.val) == 1 else np.ndim(b.val) - 2
+	return _linear(b, lambda d, lead: np.moveaxis(np.tensordot(a, d, axes=(m, lead + k)), range(m, m + lead), range(lead)))
+
+def _matmul(a, b):
+	"""Return the Variable a @ b with its partials, which is np.dot(a, b) for vectors and matrices (stacks of
+	matrices are not supported)."""
+	ndims = np.ndim(getattr(a, 'val', a)), np.ndim(getattr(b, 'val', b))
+	if 0 in ndims:
+		raise ValueError('matmul: a scalar operand is not supported, use * instead')
+	if max(ndims) > 2:
+		return NotImplemented
+	return _dot(a, b)
+
+# The NumPy functions computed for Variables by __array_function__.
+FUNCTIONS = {np.sum: _sum, np.dot: _dot}
+
+# The number of variables from which Diff.jacobian stores the partials as dense vectors (see _values_jacobian).
+DENSE_JACOBIAN = 64
+
+def _copy(x):
+	"""Return a copy of the Variable x with new partials, which may then be updated in place."""
+	der, sec_der = x.der, x.sec_der
+	if isinstance(der, DenseDer):
+		der, sec_der = der.new(der.array.copy()), sec_der.new(sec_der.array.copy())
+	else:
+		der, sec_der = defaultdict(float, der), defaultdict(float, sec_der)
+	return Variable(x.val, der, sec_der)
+
+def _references(x):
+	"""Return the number of references to the Variable x and the largest number of references to one of the
+	containers of its partials, or None if they cannot be updated in place: the partials are views of other arrays,
+	or the interpreter does not count references (e.g. PyPy)."""
+	try:
+		count = sys.getrefcount
+	except AttributeError:
+		return None
+	buffers = [x.der, x.sec_der]
+	if isinstance(x.der, DenseDer):
+		if x.der.array.base is not None or x.sec_der.array.base is not None:
+			return None
+		buffers += [x.der.array, x.sec_der.array]
+	return count(x), max(count(b) for b in buffers)
+
+def _unshared(references):
+	"""Return True if references, the _references of a Variable seen from its __iadd__ or __isub__, show that
+	nothing else refers to the Variable or to its partials: neither another name (out = acc before acc += x),
+	nor another Variable (acc + 1 shares the partials of acc), nor a cache."""
+	return references is not None and all(r <= u for r, u in zip(references, _UNSHARED))
+
+def _accumulate(acc, terms, weights=None):
+	"""Add the sum of weights[i]*terms[i] to the Variable acc, updating its partials in place, and return it.
+	acc must be a buffer which no other Variable shares (a fresh copy from _copy, or a Variable which owns its
+	partials for __iadd__ and __isub__). Each partial of each term is read once, so the cost is linear in the total
+	number of partials, where adding the terms one by one with + merges the partials accumulated so far at each step.
+
+	INPUTS
+		acc (Variable object): the buffer to add to.
+		terms (iterable of Variable objects or numbers): the terms to add.
+		weights (iterable of numbers or None): the weight of each term, None stands for 1.
+
+	RETURNS
+		acc, holding the sum.
+	"""
+	terms = list(terms)
+	weights = [1] * len(terms) if weights is None else [_item(w) for w in weights]
+	if len(weights) != len(terms):
+		raise ValueError('Expected one weight per term, got {} for {}'.format(len(weights), len(terms)))
+	val = acc.val
+	variables = []
+	for w, t in zip(weights, terms):
+		try:
+			v = t.val
+		except AttributeError:
+			val = val + w * t
+			continue
+		val = val + w * v
+		variables.append((w, t))
+	acc.val = val
+	if isinstance(acc.der, DenseDer) or any(isinstance(t.der, DenseDer) for w, t in variables):
+		_accumulate_arrays(acc, variables)
+		return acc
+	ders, sec_ders = acc.der, acc.sec_der
+	for w, t in variables:
+		for key, d in t.der.items():
+			ders[key] += w * d
+		for key, d in t.sec_der.items():
+			sec_ders[key] += w * d
+	return acc
+
+def _accumulate_arrays(acc, variables):
+	"""The part of _accumulate for the partials stored as arrays over an Index (DenseDer, DenseHessian or SparseDer).
+	Every partial is added into one buffer per order, the SparseDer ones at their rows only, and the buffers of acc
+	are reused when they already have the final layout."""
+	parts = [(1, acc.der, acc.sec_der)] + [(w, t.der, t.sec_der) for w, t in variables]
+	arrays = [d for w, d, s in parts if isinstance(d, DenseDer)]
+	index = arrays[0].index
+	sparse = all(type(d) is SparseDer for d in arrays)
+	cls = SparseDer if sparse else DenseDer
+	sec_cls = SparseDer if sparse else DenseHessian if any(type(s) is DenseHessian for w, d, s in parts) else DenseDer
+	parts = [(w, cls.from_mapping(index, d), sec_cls.from_mapping(index, s)) for w, d, s in parts]
+	shape = np.broadcast_shapes(*[np.shape(w) for w, d, s in parts],
+								*[a.array.shape[a.leading:] for w, d, s in parts for a in (d, s)])
+	dtype = _dtype([w for w, d, s in parts] + [a.array for w, d, s in parts for a in (d, s)])
+	if sparse:
+		rows = np.unique(np.concatenate([a.rows for w, d, s in parts for a in (d, s)]))
+		der_shape = sec_shape = (len(rows),) + shape
+	else:
+		rows = None
+		der_shape, sec_shape = (len(index),) + shape, (len(index),) * sec_cls.leading + shape
+	der, sec_der = parts[0][1:]
+	if (der.array.shape == der_shape and sec_der.array.shape == sec_shape and der.array.dtype == dtype
+			and sec_der.array.dtype == dtype and (rows is None or np.array_equal(der.rows, rows))):
+		der_array, sec_array = der.array, sec_der.array
+		parts = parts[1:]
+	else:
+		der_array, sec_array = np.zeros(der_shape, dtype=dtype), np.zeros(sec_shape, dtype=dtype)
+	ndim = len(shape)
+	for w, d, s in parts:
+		for array, a in ((der_array, d), (sec_array, s)):
+			at = slice(None) if rows is None else np.searchsorted(rows, a.rows)
+			array[at] += w * a.aligned(ndim)
+	if sparse:
+		acc.der, acc.sec_der = SparseDer(index, rows, der_array), SparseDer(index, rows, sec_array)
+	else:
+		acc.der, acc.sec_der = DenseDer(index, der_array), sec_cls(index, sec_array)
 
 class Variable:
 	"""
@@ -7,17 +435,36 @@ class Variable:
 	A series of arithmetic functions and unary operations implemented on this variable are defined here.
 	This is the elementary way by which a user can input a variable to be differentiated over in our VayDiff class.
 	"""
-	def __init__(self, val=0.0, der=1.0, sec_der=0.0, name=None):
+	# _owned is set (to True) on the results of VayDiff.sum, VayDiff.dot, += and -=, whose partials were
+	# allocated for them alone, so that += and -= may update them in place.
+	__slots__ = ('val', 'der', 'sec_der', 'name', '_owned')
+
+	def __init__(self, val=0.0, der=1.0, sec_der=0.0, name=None, index=None):
 		"""The constructor for Variable Class.
 
 		Args:
-			val (real number): The value of the variable. The function will be differentiated at this value.
+			val (real or complex number, or array): The value of the variable. The function will be differentiated
+				at this value. With complex values the derivatives are complex derivatives (see BasicMath).
+				An array (or list) evaluates the function at a whole batch of points at once, following the
+				NumPy broadcasting rules.
 			der (real number): The value of the derivative. Default is 1.
 			name (string): The name of the variable. The default is None.
+			index (Index object): If given, the partials are stored as dense vectors laid out by this Index,
+				in which name must be registered. The default is None, which stores them in dictionaries.
 		"""
+		if isinstance(val, (list, tuple)):
+			val = np.asarray(val)
+		if isinstance(val, np.ndarray) and val.dtype.kind in 'biu':
+			val = val.astype(float)
+		if name and isinstance(val, np.ndarray):
+			der = np.full(val.shape, der, dtype=_dtype([der]))
+			sec_der = np.full(val.shape, sec_der, dtype=_dtype([sec_der]))
 		self.val = val
 		self.name = name
-		if name:
+		if name and index is not None:
+			self.der = index.seed(name, der)
+			self.sec_der = index.seed(name, sec_der)
+		elif name:
 			self.der = defaultdict(float)
 			self.sec_der = defaultdict(float)
 			self.der[name] = der
@@ -26,6 +473,69 @@ class Variable:
 			self.der = der
 			self.sec_der = sec_der
 
+	def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+		"""Apply a NumPy ufunc to Variables, so that NumPy code such as np.sin(x) or np.maximum(x, 0) is
+		differentiated as is. The ufuncs with a rule in Rules go through the chain rule, those of the arithmetic
+		and equality operators through the operators of Variable (so array + x is x.__radd__(array), never an
+		object array of Variables), np.matmul (array @ x) like np.dot for vectors and matrices, and np.add.reduce
+		is a sum over the batch axes like np.sum. The other ufuncs and methods are not supported (NumPy raises a
+		TypeError).
+		An object array of Variables does not reach this method: NumPy applies the ufunc to each element, with its
+		operators, and for the unary ufuncs with a rule (e.g. np.sin) with the method of the same name defined
+		below the class. The other ufuncs (e.g. np.maximum or np.abs) do not support object arrays of Variables,
+		use a Variable whose value is an array instead.
+
+		EXAMPLES
+		>>> x = Variable(val=[0.0, 1.0], name='x')
+		>>> t = np.sum(np.exp(x) * np.array([2.0, 3.0]))
+		>>> print(t.val, t.der['x'])
+		10.154845485377136 10.154845485377136
+		"""
+		name = UFUNCS.get(ufunc.__name__, ufunc.__name__)
+		if kwargs:
+			out = kwargs.pop('out', None)
+			if method == 'reduce' and name == 'add' and out is None and not set(kwargs) - {'axis', 'keepdims'}:
+				return _sum(inputs[0], kwargs.get('axis', 0), keepdims=kwargs.get('keepdims', False))
+			# array += x cannot store a Variable in the array: return the result, which the array name is bound to.
+			if kwargs or out is None or len(out) != 1 or out[0] is not inputs[0] or isinstance(out[0], Variable):
+				return NotImplemented
+		if method == 'reduce' and name == 'add':
+			return _sum(inputs[0], 0)
+		if method != '__call__':
+			return NotImplemented
+		if name == 'matmul':
+			return _matmul(*inputs)
+		if name in OPERATORS:
+			x, y = inputs
+			if x.__class__ is Variable:
+				return getattr(x, OPERATORS[name][0])(y)
+			return getattr(y, OPERATORS[name][1])(x)
+		if name == 'negative':
+			return -inputs[0]
+		if name == 'positive':
+			return +inputs[0]
+		if name in KERNELS and len(inputs) == 1:
+			return _apply(name, inputs[0])
+		if name in BINARY_KERNELS:
+			return _apply2(name, *inputs)
+		return NotImplemented
+
+	def __array_function__(self, func, types, args, kwargs):
+		"""Compute np.sum and np.dot of Variables (over the batch axes of the values) with their partials, with
+		one NumPy call per partial. The other NumPy functions run their NumPy implementation, which sees Variables
+		as opaque objects (e.g. np.shape(x) is ()), as if this method did not exist.
+
+		EXAMPLES
+		>>> x = Variable(val=[1.0, 2.0], name='x')
+		>>> t = np.dot(np.array([[1.0, 1.0], [3.0, 4.0]]), x * x)
+		>>> print(t.val, t.der['x'])
+		[ 5. 19.] [ 6. 22.]
+		"""
+		if func in FUNCTIONS:
+			return FUNCTIONS[func](*args, **kwargs)
+		# ndarray.__array_function__ runs the NumPy implementation of func when all the types are arrays.
+		return np.ndarray.__array_function__(_ARRAY, func, (np.ndarray,), args, kwargs)
+
 	def __add__(self, other):
 		"""Return the result of self + other as a variable.
 
@@ -44,17 +554,9 @@ class Variable:
  		"""
 		try:
 			val = self.val + other.val
-			ders = defaultdict(float)
-			sec_ders = defaultdict(float)
-			for key in self.der:
-				ders[key] += self.der[key]
-				sec_ders[key] += self.sec_der[key]
-			for key in other.der:
-				ders[key] += other.der[key]
-				sec_ders[key] += other.sec_der[key]
-			return Variable(val, ders, sec_ders)
 		except AttributeError:
 			return Variable(self.val + other, self.der, self.sec_der)
+		return _chain2(self, other, val, 1, 1)
 
 	def __radd__(self, other):
 		"""Return the result of other + self as a variable using the __add__ above.
@@ -74,6 +576,31 @@ class Variable:
 		"""
 		return self + other
 
+	def __iadd__(self, other):
+		"""Add other to self (self += other), so that a sum built in a loop updates one set of partials instead of
+		creating a Variable and merging all the partials so far at each step. The partials are updated in place
+		only if self owns them (it was made by +=, -=, VayDiff.sum or VayDiff.dot) and nothing else refers to self
+		or to its partials, so no other name or Variable sees the change. Otherwise they are copied first, and the
+		copy is owned by the result.
+
+		INPUTS
+			self (Variable object): the recent Variable, the operand before '+='.
+			other (Variable object or real number): the operand after '+='.
+
+		RETURNS
+			The result of self + other (Variable)
+
+		EXAMPLES
+		>>> x = Variable(3, name='x')
+		>>> t = 2 * x
+		>>> for k in range(3):
+		...     t += x
+		>>> print(t.val, t.der['x'], x.der['x'])
+		15 5.0 1.0
+		"""
+		acc = self if getattr(self, '_owned', False) and _unshared(_references(self)) else _own(self)
+		return _accumulate(acc, [other])
+
 	def __mul__(self, other):
 		"""Return the result of self * other as a variable.
 
@@ -92,22 +619,9 @@ class Variable:
 		"""
 		try:
 			val = self.val * other.val
-			ders = defaultdict(float)
-			sec_ders = defaultdict(float)
-			for key in self.der:
-				ders[key] += self.der[key]*other.val
-				sec_ders[key] += other.val*self.sec_der[key]+self.der[key]*other.der[key]
-			for key in other.der:
-				ders[key] += other.der[key]*self.val
-				sec_ders[key] += self.val*other.sec_der[key]+other.der[key]*self.der[key]
-			return Variable(val, ders, sec_ders)
 		except AttributeError:
-			ders = defaultdict(float)
-			sec_ders = defaultdict(float)
-			for key in self.der:
-				ders[key] += self.der[key]*other
-				sec_ders[key] += self.sec_der[key]*other
-			return Variable(self.val * other, ders, sec_ders)
+			return _scale(self, self.val * other, other)
+		return _chain2(self, other, val, other.val, self.val, gxy=1)
 
 	def __rmul__(self, other):
 		"""Return the result of other * self as a variable using the __mul__ above.
@@ -144,7 +658,31 @@ class Variable:
 		>>> print(t.val, t.der['x'])
 		-1 1.0
 		"""
-		return self + (-1)*other
+		try:
+			val = self.val - other.val
+		except AttributeError:
+			return Variable(self.val - other, self.der, self.sec_der)
+		return _chain2(self, other, val, 1, -1)
+
+	def __isub__(self, other):
+		"""Subtract other from self (self -= other), updating the partials in place like __iadd__.
+
+		INPUTS
+			self (Variable object): the recent Variable, the operand before '-='.
+			other (Variable object or real number): the operand after '-='.
+
+		RETURNS
+			The result of self - other (Variable)
+
+		EXAMPLES
+		>>> x = Variable(3, name='x')
+		>>> t = 2 * x
+		>>> t -= x
+		>>> print(t.val, t.der['x'])
+		3 1.0
+		"""
+		acc = self if getattr(self, '_owned', False) and _unshared(_references(self)) else _own(self)
+		return _accumulate(acc, [other], [-1])
 
 	def __rsub__(self, other):
 		"""Return the result of other - self as a variable using the functions above.
@@ -162,7 +700,7 @@ class Variable:
 		>>> print(t.val, t.der['x'])
 		1 -1.0
 		"""
-		return other + (-1)*self
+		return _scale(self, other - self.val, -1)
 
 	def __pow__(self, other):
 		"""Return the result of self**(other) as a variable using the functions above.
@@ -181,24 +719,16 @@ class Variable:
 		1 2.0
 		"""
 		try:
-			val = self.val ** other.val
-			ders = defaultdict(float)
-			sec_ders = defaultdict(float)
-			for key in self.der:
-				ders[key] += other.val * self.val ** (other.val - 1) * self.der[key]
-				sec_ders[key] += other.val * (other.val -1) * self.val ** (other.val - 2) * self.der[key]
-			for key in other.der:
-				ders[key] += (val) * np.log(self.val) * other.der[key]
-				sec_ders[key] += (val) * (np.log(self.val)**2) * other.der[key]
-			return Variable(val, ders, sec_ders)
+			x, y = self.val, other.val
 		except AttributeError:
-			val = self.val ** other
-			ders = defaultdict(float)
-			sec_ders = defaultdict(float)
-			for key in self.der:
-				ders[key] += other * (self.val ** (other-1)) * self.der[key]
-				sec_ders[key] += other * (other -1) * (self.val ** (other-2)) * self.der[key]
-			return Variable(val, ders, sec_ders)
+			return _power(self, other)
+		if _is_constant(other):
+			# The partials with respect to the exponent vanish, skip the log of the base (nan if it is negative).
+			return _power(self, y)
+		val = _pow(x, y)
+		log_x = np.log(x)
+		return _chain2(self, other, val, y * _pow(x, y - 1), val * log_x,
+					   gxx=y * (y - 1) * _pow(x, y - 2), gxy=_pow(x, y - 1) * (1 + y * log_x), gyy=val * log_x**2)
 
 	def __rpow__(self, other):
 		"""Return the result of other**(self) as a variable using the functions above.
@@ -216,13 +746,9 @@ class Variable:
 		>>> print(t.val, t.der['x'])
 		2 1.3862943611198906
 		"""
-		val = other ** self.val
-		ders = defaultdict(float)
-		sec_ders = defaultdict(float)
-		for key in self.der:
-			ders[key] = val * np.log(other) * self.der[key]
-			sec_ders[key] = (val) * (np.log(other)**2) * self.der[key]
-		return Variable(val, ders, sec_ders)
+		val = _pow(other, self.val)
+		log_other = np.log(other)
+		return _chain(self, val, val * log_other, val * log_other**2)
 
 	def __truediv__(self, other):
 		"""Return the result of self/other as a variable using other functions. (Python 3)
@@ -240,7 +766,13 @@ class Variable:
 		>>> print(t.val, t.der['x'])
 		1.0 0.5
 		"""
-		return self * (other ** (-1))
+		try:
+			y = other.val
+		except AttributeError:
+			return _scale(self, self.val / other, 1 / other)
+		val = self.val / y
+		r = 1 / y
+		return _chain2(self, other, val, r, -val * r, gxy=-r * r, gyy=2 * val * r * r)
 
 	def __rtruediv__(self, other):
 		"""Return the result of other/self as a variable using other functions. (Python 3)
@@ -258,7 +790,39 @@ class Variable:
 		>>> print(t.val, t.der['x'])
 		1.0 -0.5
 		"""
-		return other * (self ** (-1))
+		r = 1 / self.val
+		val = other * r
+		return _chain(self, val, -val * r, 2 * val * r * r)
+
+	def __matmul__(self, other):
+		"""Return the result of self @ other as a variable, like np.matmul for vectors and matrices.
+
+		INPUTS
+			self (Variable object): the recent Variable, the operand before '@'.
+			other (Variable object or array): the operand after '@'.
+
+		RETURNS
+			A Variable with the updated value and derivatives
+
+		EXAMPLES
+		>>> x = Variable(val=[1.0, 2.0], name='x')
+		>>> t = x @ np.array([[1.0, 0.0], [3.0, 4.0]])
+		>>> print(t.val, t.der['x'])
+		[7. 8.] [4. 4.]
+		"""
+		return _matmul(self, other)
+
+	def __rmatmul__(self, other):
+		"""Return the result of other @ self as a variable, like np.matmul for vectors and matrices.
+
+		INPUTS
+			self (Variable object): the recent Variable, the operand after '@'.
+			other (array): the operand before '@'.
+
+		RETURNS
+			A Variable with the updated value and derivatives
+		"""
+		return _matmul(other, self)
 
 	def __neg__(self):
 		"""Return the result of negative unary operation (-self).
@@ -275,12 +839,7 @@ class Variable:
 		>>> print(t.val, t.der['x'])
 		1 -1.0
 		"""
-		ders = defaultdict(float)
-		sec_ders = defaultdict(float)
-		for key in self.der:
-			ders[key] = -self.der[key]
-			sec_ders[key] = -self.sec_der[key]
-		return Variable(-self.val, ders, sec_ders)
+		return _scale(self, -self.val, -1)
 
 	def __pos__(self):
 		"""Return the result of positive unary operation (+self).
@@ -317,9 +876,11 @@ class Variable:
 		"""
 
 		try:
-			return (self.val == other.val) and (list(self.der.values()) == list(other.der.values()))
+			val, ders, other_ders = other.val, _partials(self.der), _partials(other.der)
 		except AttributeError:
 			return False
+		return _equal(self.val, val) and len(ders) == len(other_ders) and \
+			all(_equal(a, b) for a, b in zip(ders, other_ders))
 
 	def __ne__(self,other):
 		"""Return the result of (not equal to) comparison.
@@ -337,18 +898,77 @@ class Variable:
 		>>> x != y
 		False
 		"""
-		try:
-			return (self.val != other.val) or (list(self.der.values()) != list(other.der.values()))
-		except AttributeError:
-			return True
+		return not self == other
+
+def _method(name):
+	"""Return the method name of Variable, which applies the rule name of Rules."""
+	def method(self):
+		return _apply(name, self)
+	method.__name__ = name
+	method.__doc__ = 'Return np.{}(self), called by NumPy for each Variable of an object array.'.format(name)
+	return method
+
+# NumPy applies a unary ufunc to an object array by calling the method named after the ufunc on each element.
+for _name in KERNELS:
+	if _name not in ('negative', 'square', 'abs') and isinstance(getattr(np, _name, None), np.ufunc):
+		setattr(Variable, _name, _method(_name))
+
+# The array on which Variable.__array_function__ calls the NumPy implementation of a function.
+_ARRAY = np.empty(0)
+
+def _own(x):
+	"""Return a copy of the Variable x which owns its partials (see Variable.__iadd__)."""
+	x = _copy(x)
+	x._owned = True
+	return x
+
+def _calibrate():
+	"""Return the _references of a Variable seen from its __iadd__ in x += y when only the name x refers to it and
+	only it refers to its partials. They depend on the interpreter, None if it does not count references."""
+	seen = []
+
+	class Probe(Variable):
+		__slots__ = ()
+
+		def __iadd__(self, other):
+			seen.append(_references(self))
+			return self
+
+	x = Probe(0.0, defaultdict(float), defaultdict(float))
+	x += 0
+	return seen[0]
+
+_UNSHARED = _calibrate()
 
 class Diff:
 	"""This class defines the object that the user will interact with and acts as a wrapper of the underlying Variable class"""
-	def __init__(self):
-		"""The constructor for Diff Class."""
-		pass
+	def __init__(self, cache_size=None):
+		"""The constructor for Diff Class.
+
+		Args:
+			cache_size (positive integer or None): If given, auto_diff keeps the results of the last cache_size
+				distinct calls, and returns the stored Variable when it is called again with the same function,
+				the same variable names, values and seed partials, and the same storage (dense or sparse).
+				The default is None, which disables the cache. The function is identified by the object itself,
+				so a lambda created anew at each call never hits, and it must not depend on outside state that changes.
+		"""
+		self.cache = None if cache_size is None else LRUCache(cache_size)
 
-	def auto_diff(self, function, eval_point):
+	def cache_info(self):
+		"""Return the hits, misses, maxsize and current size of the auto_diff cache, or None if it is disabled.
+
+		EXAMPLES
+		>>> ad = Diff(cache_size=16)
+		>>> f = lambda x: x**2
+		>>> t = ad.auto_diff(f, [Variable(3, name='x')])
+		>>> t is ad.auto_diff(f, [Variable(3, name='x')])
+		True
+		>>> ad.cache_info()
+		CacheInfo(hits=1, misses=1, maxsize=16, currsize=1)
+		"""
+		return None if self.cache is None else self.cache.info()
+
+	def auto_diff(self, function, eval_point, dense=False, sparse=False):
 		"""Return the value and derivative of the given founction at given point as a variable.
 		For now, it only stands for 1st order derivative.
 
@@ -356,6 +976,14 @@ class Diff:
 			self (Diff object)
 			function (function): the function defined by user
 			eval_points (a list of Variable objects): the point(s) which the derivative will be computed at.
+			dense (boolean): if True, the variables are registered into one Index and the partials are
+				propagated as dense NumPy vectors. Default is False.
+			sparse (boolean): if True, the variables are registered into one Index and each result only stores
+				the partials with respect to the variables it depends on, as a SparseDer. Each result holds two
+				small NumPy arrays, so this only pays off when the results depend on many variables (e.g. sums over
+				hundreds of variables take a fraction of the memory and time of the dictionaries); when they depend
+				on a few variables, it takes about as much memory as the dictionaries and twice the time.
+				Default is False.
 
 		RETURNS
 			The value and derivative (Variable)
@@ -374,19 +1002,68 @@ class Diff:
 		5 1.0
 		>>> print(t.val, t.der['y'])
 		5 2.0
+		>>> t = ad.auto_diff(function = user_def_xy, eval_point = [x,y], dense = True)
+		>>> t.der.array
+		array([1., 2.])
+		>>> t = ad.auto_diff(function = lambda x,y: 2*y, eval_point = [x,y], sparse = True)
+		>>> print(t.der['y'], t.der['x'], list(t.der))
+		2.0 0.0 ['y']
  		"""
+		if self.cache is not None:
+			try:
+				key = (function, dense, sparse, tuple((v.name, freeze(v.val), freeze(v.der), freeze(v.sec_der))
+													  for v in eval_point))
+				hash(key)
+			except TypeError:
+				return self._auto_diff(function, eval_point, dense, sparse)
+			return self.cache.get(key, lambda: self._auto_diff(function, eval_point, dense, sparse))
+		return self._auto_diff(function, eval_point, dense, sparse)
+
+	def _auto_diff(self, function, eval_point, dense, sparse):
+		"""Evaluate function at eval_point, bypassing the cache."""
+		if dense:
+			eval_point = self._dense_point(eval_point)
+		elif sparse:
+			eval_point = self._sparse_point(eval_point)
 		return function(*eval_point)
 
+	def _sparse_point(self, eval_point):
+		"""Return copies of the Variables in eval_point whose partials are SparseDer views over one Index."""
+		index = Index([v.name for v in eval_point])
+		points = []
+		for v in eval_point:
+			der = SparseDer.from_mapping(index, v.der)
+			points.append(Variable(v.val, der, der.new(SparseDer.from_mapping(index, v.sec_der).scatter(der.rows, 0))))
+		return points
+
+	def _dense_point(self, eval_point, hessian=False):
+		"""Return copies of the Variables in eval_point whose partials are dense vectors over one Index.
+		If hessian is True, the second order partials are full DenseHessian matrices."""
+		index = Index([v.name for v in eval_point])
+		sec_cls = DenseHessian if hessian else DenseDer
+		return [Variable(v.val, DenseDer.from_mapping(index, v.der), sec_cls.from_mapping(index, v.sec_der))
+				for v in eval_point]
+
+	def _outputs(self, functions, eval_points):
+		"""Return the list of the outputs of functions at eval_points. functions is either a list of functions,
+		evaluated one after the other, or a single function returning a list (or array) of outputs, evaluated once."""
+		if callable(functions):
+			outputs = self.auto_diff(functions, eval_points)
+			return [outputs] if isinstance(outputs, Variable) else list(outputs)
+		return [self.auto_diff(func, eval_points) for func in functions]
+
 	def jacobian(self, functions, eval_points):
 		"""Return the Jacobian of a list of functions.
 
 		INPUTS
 			self (Diff object)
-			functions: a list of functions defined by user
+			functions: a list of functions defined by user, or a single function returning a list (or array) of
+				outputs. A single function is evaluated only once, so the subexpressions shared by its outputs
+				are computed once.
 			eval_points (a list of Variable objects): the variables which the derivative will be computed at.
 
 		RETURNS
-			A Jacobian Matrix, a n by p Numpy array where n is the number of functions input by the user and p is the
+			A Jacobian Matrix, a n by p Numpy array where n is the number of functions (or outputs) and p is the
 			number of variables to differentiate over.
 
 		EXAMPLES
@@ -401,19 +1078,302 @@ class Diff:
 		array([30.,  9.])
 		>>> t1[1]
 		array([1., 5.])
+		>>> Diff().jacobian(lambda x,y: [x**2*y, 5*y+x], [x,y])
+		array([[30.,  9.],
+		       [ 1.,  5.]])
  		"""
-		key_order = [k.name for k in eval_points]
-		output = np.ones(shape=(len(functions), len(eval_points)))
-		for i, func in enumerate(functions):
-			eval = self.auto_diff(func, eval_points)
-			ders = eval.der
-			for j, k in enumerate(key_order):
-				output[i][j] = ders[k]
+		return self._values_jacobian(functions, eval_points)[1]
+
+	def _values_jacobian(self, functions, eval_points):
+		"""Return the values of functions at eval_points and their Jacobian, computed in the same evaluation.
+		The partials are dense vectors from DENSE_JACOBIAN variables on, whose rows are copied at once, and
+		stay in dictionaries below, where building the vectors costs more than it saves."""
+		dense = len(eval_points) >= DENSE_JACOBIAN
+		if dense:
+			eval_points = self._dense_point(eval_points)
+		names = [v.name for v in eval_points]
+		rows = [(t.val, t.der.array if dense else [t.der.get(name, 0.0) for name in names])
+				if isinstance(t, Variable) else (t, 0.0) for t in self._outputs(functions, eval_points)]
+		dtype = _dtype([a for row in rows for a in row])
+		values = np.zeros(len(rows), dtype=dtype)
+		output = np.zeros(shape=(len(rows), len(eval_points)), dtype=dtype)
+		for i, (val, der) in enumerate(rows):
+			values[i] = val
+			output[i] = der
+		return values, output
+
+	def batch_jacobian(self, functions, points):
+		"""Return the Jacobian of a list of functions at many points at once.
+		Each function is evaluated once on Variables whose values are the columns of points, so the partials
+		are propagated for all the points together as arrays of shape (p, m) instead of m separate calls.
+
+		INPUTS
+			self (Diff object)
+			functions: a list of functions defined by user, taking p arguments, or a single function returning
+				a list of outputs (see jacobian)
+			points (array of real numbers): a m by p array, one evaluation point per row.
+
+		RETURNS
+			A m by n by p Numpy array, the Jacobian at each point (as returned by jacobian).
+
+		EXAMPLES
+		>>> f1 = lambda x,y: x**2*y
+		>>> f2 = lambda x,y: 5*y+x
+		>>> t = Diff().batch_jacobian([f1,f2], [[3, 5], [1, 2]])
+		>>> t.shape
+		(2, 2, 2)
+		>>> t[0]
+		array([[30.,  9.],
+		       [ 1.,  5.]])
+		"""
+		points = np.asarray(points)
+		if points.dtype.kind in 'biu':
+			points = points.astype(float)
+		if points.ndim != 2:
+			raise ValueError('points must be a two dimensional array with one point per row')
+		m, p = points.shape
+		index = Index(range(p))
+		eval_points = [Variable(points[:, j], index.seed(j), index.seed(j, 0.0)) for j in range(p)]
+		outputs = self._outputs(functions, eval_points)
+		dtype = _dtype([t.der.array for t in outputs if isinstance(t, Variable)])
+		output = np.zeros(shape=(m, len(outputs), p), dtype=dtype)
+		for i, t in enumerate(outputs):
+			if isinstance(t, Variable):
+				output[:, i, :] = np.broadcast_to(t.der.aligned(1), (p, m)).T
 		return output
 
+	def sparsity(self, functions, eval_points):
+		"""Return the sparsity pattern of the Jacobian of a list of functions and a coloring of its columns.
+		The pattern is read from the keys of the dictionary partials of one evaluation, so it is structural:
+		a variable which appears in a function counts even if its partial happens to be zero at eval_points.
+		Columns which never share a row (structurally orthogonal variables) get the same color.
+
+		INPUTS
+			self (Diff object)
+			functions: a list of functions defined by user
+			eval_points (a list of Variable objects): the variables which the derivative will be computed at.
+
+		RETURNS
+			A tuple (pattern, colors): pattern is a n by p scipy.sparse CSR matrix of booleans, colors is a
+			NumPy array of length p. It can be passed to sparse_jacobian at other points.
+
+		EXAMPLES
+		>>> f1 = lambda x,y,z: x*y
+		>>> f2 = lambda x,y,z: 2*z
+		>>> x, y, z = Variable(1, name='x'), Variable(2, name='y'), Variable(3, name='z')
+		>>> pattern, colors = Diff().sparsity([f1,f2], [x,y,z])
+		>>> pattern.toarray()
+		array([[ True,  True, False],
+		       [False, False,  True]])
+		>>> colors
+		array([0, 1, 0])
+		"""
+		from scipy.sparse import csr_matrix
+		positions = {v.name: j for j, v in enumerate(eval_points)}
+		eval_points = [Variable(v.val, name=v.name) for v in eval_points]
+		indptr, indices = [0], []
+		for func in functions:
+			t = self.auto_diff(func, eval_points)
+			indices.extend(sorted(positions[key] for key in getattr(t, 'der', ()) if key in positions))
+			indptr.append(len(indices))
+		indptr, indices = np.array(indptr), np.array(indices, dtype=int)
+		pattern = csr_matrix((np.ones(len(indices), dtype=bool), indices, indptr),
+							 shape=(len(functions), len(eval_points)))
+		return pattern, _color_columns(indptr, indices, len(eval_points))
+
+	def sparse_jacobian(self, functions, eval_points, sparsity=None):
+		"""Return the Jacobian of a list of functions as a sparse matrix, using compressed forward mode.
+		Variables with the same color in the sparsity pattern share one seed direction, so each function is
+		evaluated once with partials of length equal to the number of colors instead of p, and the entries
+		are then recovered from the pattern.
+
+		INPUTS
+			self (Diff object)
+			functions: a list of functions defined by user
+			eval_points (a list of Variable objects): the variables which the derivative will be computed at.
+			sparsity (tuple): the (pattern, colors) returned by sparsity. If None (the default), it is
+				computed at eval_points; pass it explicitly to reuse it across points.
+
+		RETURNS
+			A n by p scipy.sparse CSR matrix.
+
+		EXAMPLES
+		>>> f1 = lambda x,y,z: x**2*y
+		>>> f2 = lambda x,y,z: 5*z
+		>>> x, y, z = Variable(3, name='x'), Variable(5, name='y'), Variable(1, name='z')
+		>>> t = Diff().sparse_jacobian([f1,f2], [x,y,z])
+		>>> t.toarray()
+		array([[30.,  9.,  0.],
+		       [ 0.,  0.,  5.]])
+		"""
+		from scipy.sparse import csr_matrix
+		pattern, colors = self.sparsity(functions, eval_points) if sparsity is None else sparsity
+		index = Index(range(colors.max(initial=-1) + 1))
+		eval_points = [Variable(v.val, index.seed(color), DenseDer(index, np.zeros(len(index))))
+					   for v, color in zip(eval_points, colors)]
+		outputs = [self.auto_diff(func, eval_points) for func in functions]
+		compressed = np.zeros((len(functions), len(index)),
+							  dtype=_dtype([t.der.array for t in outputs if isinstance(t, Variable)]))
+		for i, t in enumerate(outputs):
+			if isinstance(t, Variable):
+				compressed[i] = t.der.array
+		rows = np.repeat(np.arange(len(functions)), np.diff(pattern.indptr))
+		data = compressed[rows, colors[pattern.indices]]
+		return csr_matrix((data, pattern.indices, pattern.indptr), shape=pattern.shape)
+
+	def compile(self, function, variable_names, optimize=True):
+		"""Trace a function once and return a Plan which evaluates it together with its partials at new values.
+		The operations are recorded on a Graph and compiled into straight-line code, so the Plan does not
+		repeat the operator dispatch and the allocation of intermediate Variables of auto_diff. This pays off
+		when the same function is evaluated at many points. The function must not branch on the values
+		of its arguments, since it is only traced once.
+
+		INPUTS
+			self (Diff object)
+			function: a scalar function defined by user, which may use every function in BasicMath
+			variable_names (list of strings): the names of the arguments of function, in order.
+			optimize (boolean): if True (the default), the traced operations are simplified before they are
+				compiled: constants are folded, identical subexpressions are computed once and x**2 becomes x*x.
+
+		RETURNS
+			A Plan, called with one value (real number or NumPy array) per variable. It returns the tuple
+			(value, gradient, diagonal of the Hessian), the partials being NumPy arrays ordered like variable_names.
+
+		EXAMPLES
+		>>> f = Diff().compile(lambda x,y: x**2*y, ['x', 'y'])
+		>>> f(3, 5)
+		(45, array([30.,  9.]), array([10.,  0.]))
+		>>> val, der, sec_der = f(np.array([1., 2.]), 5)
+		>>> der
+		array([[10., 20.],
+		       [ 1.,  4.]])
+		"""
+		graph = Graph()
+		output = function(*[graph.input(j) for j in range(len(variable_names))])
+		return Plan(graph, output, variable_names, optimize)
+
+	def taylor(self, function, point, order):
+		"""Return the derivatives of order 0 to order of a scalar function of one variable.
+		The function is evaluated once on a truncated Taylor series, each operator and BasicMath function
+		mapping the series of its arguments to the series of its result in O(order**2) operations.
+
+		INPUTS
+			self (Diff object)
+			function: a scalar function of one variable defined by user, which may use every function in BasicMath
+			point (real number, NumPy array or Variable object): the value which the derivatives will be computed at.
+				An array evaluates the derivatives at each of its values.
+			order (non-negative integer): the highest order of the derivatives.
+
+		RETURNS
+			A NumPy array of length order+1 whose k-th entry is the k-th derivative at point
+			(with the shape of point appended when point is an array).
+
+		EXAMPLES
+		>>> from VayDiff import BasicMath as bm
+		>>> Diff().taylor(lambda x: bm.exp(2*x), 0, 4)
+		array([ 1.,  2.,  4.,  8., 16.])
+		>>> Diff().taylor(lambda x: x**3 - x, 2, 4)
+		array([ 6., 11., 12.,  6.,  0.])
+		"""
+		x = Taylor.variable(getattr(point, 'val', point), order)
+		t = function(x)
+		if not isinstance(t, Taylor):
+			t = x._constant(t)
+		return t.derivatives()
+
+	def gradient(self, function, eval_points):
+		"""Return the gradient of a scalar function computed in reverse mode.
+		The function is evaluated once on a Tape and the adjoints are back-propagated in a single sweep,
+		so the cost does not grow with the number of variables as it does in forward mode.
+
+		INPUTS
+			self (Diff object)
+			function: a scalar function defined by user, which may use every function in BasicMath
+			eval_points (a list of Variable objects): the variables which the derivative will be computed at.
+
+		RETURNS
+			The gradient, a NumPy array of length p ordered like eval_points, i.e. like a row of jacobian.
+
+		EXAMPLES
+		>>> f = lambda x,y: x**2*y
+		>>> x = Variable(val=3, name='x')
+		>>> y = Variable(val=5, name='y')
+		>>> Diff().gradient(f, [x,y])
+		array([30.,  9.])
+		"""
+		tape = Tape()
+		inputs = [tape.variable(v.val) for v in eval_points]
+		output = function(*inputs)
+		if not isinstance(output, Node):
+			return np.zeros(len(inputs))
+		return tape.gradient(output, inputs)
+
+	def hvp(self, function, eval_points, v):
+		"""Return the product of the Hessian of a scalar function with a vector, without forming the Hessian.
+		The function is recorded once on a Tape together with the local second order partials used for sec_der,
+		then the directional derivatives along v are propagated forward and the adjoints backward
+		(forward-over-reverse mode). The cost is a small multiple of the cost of evaluating the function and
+		the memory does not depend on the number of variables.
+
+		INPUTS
+			self (Diff object)
+			function: a scalar function defined by user, which may use every function in BasicMath
+			eval_points (a list of Variable objects): the variables which the derivative will be computed at.
+			v (list or array of real numbers): the vector, ordered like eval_points.
+
+		RETURNS
+			The Hessian-vector product, a NumPy array of length p ordered like eval_points.
+
+		EXAMPLES
+		>>> f = lambda x,y: x**2*y
+		>>> x = Variable(val=3, name='x')
+		>>> y = Variable(val=5, name='y')
+		>>> Diff().hvp(f, [x,y], [1,0])
+		array([10.,  6.])
+		"""
+		if len(v) != len(eval_points):
+			raise ValueError('v must have one entry per variable')
+		tape = Tape()
+		inputs = [tape.variable(p.val) for p in eval_points]
+		output = function(*inputs)
+		if not isinstance(output, Node):
+			return np.zeros(len(inputs))
+		return tape.hvp(output, inputs, v)[1]
+
 	def hessian(self, functions, eval_points):
-		"""Return the Hessian of a list of functions."""
-		raise NotImplementedError
+		"""Return the Hessian of a list of functions, including the cross partials.
+		Each function is evaluated once in forward-over-forward mode: every intermediate Variable carries
+		its gradient and its full Hessian as dense arrays, so no separate evaluation per variable is needed.
+
+		INPUTS
+			self (Diff object)
+			functions: a list of functions defined by user
+			eval_points (a list of Variable objects): the variables which the derivative will be computed at.
+
+		RETURNS
+			A n by p by p Numpy array where n is the number of functions input by the user and p is the
+			number of variables to differentiate over. The variables are ordered like in jacobian.
+
+		EXAMPLES
+		>>> f1 = lambda x,y: x**2*y
+		>>> f2 = lambda x,y: 5*y+x
+		>>> x = Variable(val=3, name='x')
+		>>> y = Variable(val=5, name='y')
+		>>> t1 = Diff().hessian([f1,f2], [x,y])
+		>>> t1.shape
+		(2, 2, 2)
+		>>> t1[0]
+		array([[10.,  6.],
+		       [ 6.,  0.]])
+		"""
+		eval_points = self._dense_point(eval_points, hessian=True)
+		outputs = [self.auto_diff(func, eval_points) for func in functions]
+		# A function which does not depend on the variables (e.g. returns a number) has a zero Hessian.
+		hessians = [t.sec_der.array if isinstance(t, Variable) else 0.0 for t in outputs]
+		output = np.zeros(shape=(len(functions), len(eval_points), len(eval_points)), dtype=_dtype(hessians))
+		for i, hessian in enumerate(hessians):
+			output[i] = hessian
+		return output
 
 if __name__ == '__main__':
 	"""This part runs the doctest"""
@@ -1 +1,6 @@
 name = "VayDiff"
+
+from VayDiff.Profile import profile
+from VayDiff.Optimize import minimize
+from VayDiff.Solve import solve
+from VayDiff.Reduce import sum, dot
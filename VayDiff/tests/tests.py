@@ -112,6 +112,26 @@ def test_more_operators():
     assert(t4.der['a'] == 256*(bm.log(4)+1))
     assert(t4.der['a'] == 256*(np.log(4)+1))
 
+def test_power_division():
+    x = Variable(val=-2.0, name='x')
+    y = Variable(val=3.0, name='y')
+    for n in [0, 1, 2, 3, -1, -3, 2.0]:
+        t = x**n
+        assert(t.val == (-2.0)**n)
+        assert(np.isclose(t.der['x'], n * (-2.0)**(n - 1)))
+        assert(np.isclose(t.sec_der['x'], n * (n - 1) * (-2.0)**(n - 2)))
+    # An exponent without partials does not take the log of the negative base.
+    t = x**Variable(val=3.0, der=0.0, name='n')
+    assert(t.val == -8 and t.der['x'] == 12 and t.sec_der['x'] == -12 and t.der['n'] == 0)
+    assert((Variable(val=0.0, name='x')**1).sec_der['x'] == 0)
+    t = x / y
+    assert(t.val == -2/3 and t.der['x'] == 1/3 and np.isclose(t.der['y'], 2/9))
+    assert(t.sec_der['x'] == 0 and np.isclose(t.sec_der['y'], -4/27))
+    t = 3 / x
+    assert(t.val == -1.5 and t.der['x'] == -0.75 and t.sec_der['x'] == -0.75)
+    with pytest.raises(ZeroDivisionError):
+        x / 0
+
 # Trig Functions
 def sin_cos(x):
     return bm.sin(x) + bm.cos(x)
@@ -174,14 +194,8 @@ def test_problematic():
     a = Variable(val=2, name='a')
     with pytest.raises(ZeroDivisionError):
         t1 = Diff().auto_diff(function = div_zero, eval_point = [a])
-    with pytest.raises(NotImplementedError):
-        t1 = Diff().hessian(functions = [add_function], eval_points = [a])
-    with pytest.raises(NotImplementedError):
-        print(bm.arcsinh(1))
-    with pytest.raises(NotImplementedError):
-        print(bm.arccosh(1))
-    with pytest.raises(NotImplementedError):
-        print(bm.arctanh(1))
+    t1 = Diff().hessian(functions = [add_function], eval_points = [a])
+    assert(t1.shape == (1, 1, 1) and t1[0][0][0] == 0)
 
 def test_sanity_checks():
     assert(bm.log(4.1) == np.log(4.1))
@@ -197,10 +211,16 @@ def test_sanity_checks():
     assert(bm.cosh(2) == np.cosh(2))
     assert(bm.tanh(2) == np.tanh(2))
     assert(bm.logk(2, np.exp(1)) == np.log(2))
+    assert(bm.arcsinh(1) == np.arcsinh(1))
+    assert(bm.arccosh(2) == np.arccosh(2))
+    assert(bm.arctanh(0.5) == np.arctanh(0.5))
+    assert(bm.log1p(1e-20) == 1e-20 and bm.expm1(1e-20) == 1e-20)
+    assert(bm.abs(-3) == 3 and bm.maximum(2, 3) == 3 and bm.minimum(2, 3) == 2)
 
 test_init()
 test_simple_operators()
 test_more_operators()
+test_power_division()
 test_trig()
 test_other_functions()
 test_problematic()
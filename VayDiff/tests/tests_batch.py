@@ -0,0 +1,84 @@
+import pytest
+import numpy as np
+from VayDiff import BasicMath as bm
+from VayDiff.VayDiff import Diff
+from VayDiff.VayDiff import Variable
+
+def operators(x,y):
+    return 4 + x*y - y/x + 2/y - (-x) + x**2 + 2**y + x**y - 3*(+y) + x*3 - 1
+
+def elementary(x,y):
+    return (bm.log(x) + bm.logk(y, 10) + bm.exp(y) + bm.sqrt(x*y) + bm.sin(x) + bm.cos(y)
+            + bm.tan(y) + bm.arcsin(y) + bm.arccos(x/4) + bm.arctan(y) + bm.sinh(x)
+            + bm.cosh(y) + bm.tanh(x*y))
+
+def check_batch(f, xs, ys, dense):
+    x = Variable(val=xs, name='x')
+    y = Variable(val=ys, name='y')
+    t = Diff().auto_diff(function = f, eval_point = [x,y], dense = dense)
+    assert(t.val.shape == (len(xs),))
+    for i in range(len(xs)):
+        a = Variable(val=xs[i], name='x')
+        b = Variable(val=ys[i], name='y')
+        s = Diff().auto_diff(function = f, eval_point = [a,b])
+        np.testing.assert_allclose(t.val[i], s.val)
+        for k in ['x', 'y']:
+            np.testing.assert_allclose(t.der[k][i], s.der[k])
+            np.testing.assert_allclose(t.sec_der[k][i], s.sec_der[k])
+
+def test_batch_matches_scalar():
+    xs = np.linspace(1, 2, 7)
+    ys = np.linspace(0.1, 0.6, 7)
+    for f in [operators, elementary]:
+        check_batch(f, xs, ys, False)
+        check_batch(f, xs, ys, True)
+
+def test_partials_are_arrays():
+    x = Variable(val=[1, 2, 3], name='x')
+    assert(x.val.dtype == float)
+    t = x + 1
+    np.testing.assert_array_equal(t.der['x'], [1, 1, 1])
+    t = np.array([1., 2., 3.]) * x
+    assert(isinstance(t, Variable))
+    np.testing.assert_array_equal(t.val, [1, 4, 9])
+    np.testing.assert_array_equal(t.der['x'], [1, 2, 3])
+
+def test_broadcasting():
+    xs = np.array([1., 2., 3.])
+    ys = np.array([4., 5.])
+    for dense in [False, True]:
+        x = Variable(val=xs[:, None], name='x')
+        y = Variable(val=ys, name='y')
+        t = Diff().auto_diff(function = lambda x,y: x*y + bm.sin(y) + 2, eval_point = [x,y], dense = dense)
+        assert(t.val.shape == (3, 2))
+        np.testing.assert_allclose(t.val, xs[:, None]*ys + np.sin(ys) + 2)
+        np.testing.assert_allclose(t.der['x'], np.broadcast_to(ys, (3, 2)))
+        np.testing.assert_allclose(t.der['y'], xs[:, None] + np.cos(ys))
+        np.testing.assert_allclose(t.sec_der['y'], np.broadcast_to(-np.sin(ys), (3, 2)))
+
+def test_batch_eq():
+    x = Variable(val=[1, 2], name='x')
+    y = Variable(val=[1, 2], name='y')
+    z = Variable(val=[1, 3], name='z')
+    assert(x == y)
+    assert(x != z)
+    assert(x != [1, 2])
+
+def test_batch_jacobian():
+    functions = [lambda x,y: operators(x,y), lambda x,y: elementary(x,y), lambda x,y: 2*y, lambda x,y: 3]
+    points = np.column_stack([np.linspace(1, 2, 7), np.linspace(0.1, 0.6, 7)])
+    J = Diff().batch_jacobian(functions, points)
+    assert(J.shape == (7, 4, 2))
+    for k in range(7):
+        x = Variable(val=points[k, 0], name='x')
+        y = Variable(val=points[k, 1], name='y')
+        np.testing.assert_allclose(J[k, :3], Diff().jacobian(functions[:3], [x,y]))
+        np.testing.assert_array_equal(J[k, 3], [0, 0])
+    with pytest.raises(ValueError):
+        Diff().batch_jacobian(functions, [1, 2])
+
+test_batch_matches_scalar()
+test_partials_are_arrays()
+test_broadcasting()
+test_batch_eq()
+test_batch_jacobian()
@@ -0,0 +1,76 @@
+import pytest
+import numpy as np
+import VayDiff
+from VayDiff import BasicMath as bm
+from VayDiff.VayDiff import Diff
+from VayDiff.VayDiff import Variable
+from VayDiff.Cache import LRUCache, freeze
+
+def f(x,y):
+    return bm.sin(x)*y + x**2
+
+def test_hits():
+    ad = Diff(cache_size=4)
+    x = Variable(val=0.5, name='x')
+    y = Variable(val=2.0, name='y')
+    with VayDiff.profile() as p:
+        t1 = ad.auto_diff(f, [x,y])
+        t2 = ad.auto_diff(f, [Variable(val=0.5, name='x'), Variable(val=2.0, name='y')])
+    assert(t1 is t2)
+    assert(p.stats['sin'].calls == 1)
+    assert(ad.cache_info() == (1, 1, 4, 1))
+    assert(ad.auto_diff(f, [Variable(val=0.6, name='x'), y]) is not t1)
+    assert(ad.auto_diff(f, [Variable(val=0.5, name='z'), y]) is not t1)
+    assert(ad.auto_diff(f, [Variable(val=0.5, der=2.0, name='x'), y]).der['x'] == 2 * t1.der['x'])
+    t3 = ad.auto_diff(f, [x,y], dense=True)
+    np.testing.assert_allclose(t3.der.array, [t1.der['x'], t1.der['y']])
+    assert(ad.cache_info() == (1, 5, 4, 4))
+    assert(Diff().cache_info() is None)
+
+def test_arrays_and_jacobian():
+    ad = Diff(cache_size=2)
+    x = Variable(val=[0.1, 0.2], name='x')
+    y = Variable(val=[1.0, 2.0], name='y')
+    t1 = ad.auto_diff(f, [x,y])
+    assert(ad.auto_diff(f, [Variable(val=[0.1, 0.2], name='x'), y]) is t1)
+    assert(ad.auto_diff(f, [Variable(val=[0.1, 0.3], name='x'), y]) is not t1)
+    model = lambda x,y: [f(x,y), x*y]
+    J = ad.jacobian(model, [Variable(val=0.5, name='x'), Variable(val=2.0, name='y')])
+    np.testing.assert_array_equal(J, ad.jacobian(model, [Variable(val=0.5, name='x'), Variable(val=2.0, name='y')]))
+    assert(ad.cache_info().hits == 2)
+
+def test_keys():
+    ad = Diff(cache_size=8)
+    point = [Variable(val=0.5, name='x'), Variable(val=-0.3, name='y')]
+    g = lambda x,y: bm.sin(x)*y + bm.exp(x*y)
+    ad.jacobian([g], point)
+    np.testing.assert_allclose(ad.hessian([g], point), Diff().hessian([g], point))
+    with np.errstate(invalid='ignore'):
+        assert(np.isnan(ad.auto_diff(bm.log, [Variable(val=-1.0, name='x')]).val))
+    assert(np.isclose(ad.auto_diff(bm.log, [Variable(val=-1 + 0j, name='x')]).val, np.pi * 1j))
+    square = lambda x: x*x
+    assert(type(ad.auto_diff(square, [Variable(val=2.0, name='x')]).val) is float)
+    assert(type(ad.auto_diff(square, [Variable(val=2, name='x')]).val) is int)
+    mixed = Variable(val=2.0, der={'x': 1.0, 0: 2.0}, sec_der={'x': 0.0, 0: 0.0})
+    assert(freeze(mixed.der) == freeze({0: 2.0, 'x': 1.0}))
+    t = ad.auto_diff(square, [mixed])
+    assert(t.val == 4.0 and t.der[0] == 8.0 and ad.auto_diff(square, [mixed]) is t)
+
+def test_lru():
+    cache = LRUCache(2)
+    cache.get('a', lambda: 1)
+    cache.get('b', lambda: 2)
+    cache.get('a', lambda: 0)
+    cache.get('c', lambda: 3)
+    assert(cache.get('a', lambda: 0) == 1)
+    assert(cache.get('b', lambda: 4) == 4)
+    assert(len(cache) == 2 and cache.info().misses == 4)
+    cache.clear()
+    assert(cache.info() == (0, 0, 2, 0))
+    with pytest.raises(ValueError):
+        LRUCache(0)
+
+test_hits()
+test_arrays_and_jacobian()
+test_keys()
+test_lru()
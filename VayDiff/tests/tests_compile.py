@@ -0,0 +1,108 @@
+import pytest
+import numpy as np
+from VayDiff import BasicMath as bm
+from VayDiff.VayDiff import Diff
+from VayDiff.VayDiff import Variable
+from VayDiff.Trace import Graph, simplify
+
+def operators(x,y,z):
+    return 4 + x*y - z/x + 2/y - (-z) + x**2 + 2**y + x**y - 3*(+z) + x*3 - 1
+
+def elementary(x,y,z):
+    return (bm.log(x) + bm.logk(y, 10) + bm.exp(z) + bm.sqrt(x*y) + bm.sin(x) + bm.cos(y)
+            + bm.tan(z) + bm.arcsin(z) + bm.arccos(x/4) + bm.arctan(y) + bm.sinh(x)
+            + bm.cosh(y) + bm.tanh(z))
+
+def check(f, values):
+    names = ['x', 'y', 'z']
+    point = [Variable(val=v, name=n) for v, n in zip(values, names)]
+    t = Diff().auto_diff(f, point)
+    val, der, sec_der = Diff().compile(f, names)(*values)
+    np.testing.assert_allclose(val, t.val)
+    np.testing.assert_allclose(der, [t.der[n] for n in names])
+    np.testing.assert_allclose(sec_der, [t.sec_der[n] for n in names])
+
+def test_compile_matches_auto_diff():
+    for f in [operators, elementary, lambda x,y,z: z + -z + x**2*y + z, lambda x,y,z: x**y**z / (x - y*z)]:
+        check(f, [1.5, 0.5, 0.25])
+        check(f, [0.7, 0.2, 0.1])
+
+def test_repeated_calls():
+    plan = Diff().compile(operators, ['x', 'y', 'z'])
+    for values in np.random.RandomState(0).uniform(0.5, 2, size=(20, 3)):
+        point = [Variable(val=v, name=n) for v, n in zip(values, 'xyz')]
+        t = Diff().auto_diff(operators, point)
+        val, der, sec_der = plan(*values)
+        np.testing.assert_allclose(der, [t.der[n] for n in 'xyz'])
+
+def test_batch_values():
+    plan = Diff().compile(elementary, ['x', 'y', 'z'])
+    xs = np.linspace(1, 2, 5)
+    val, der, sec_der = plan(xs, 0.5, 0.25)
+    assert(der.shape == (3, 5) and sec_der.shape == (3, 5))
+    for i, x in enumerate(xs):
+        v, d, s = plan(x, 0.5, 0.25)
+        np.testing.assert_allclose(val[i], v)
+        np.testing.assert_allclose(der[:, i], d)
+        np.testing.assert_allclose(sec_der[:, i], s)
+
+def test_unused_and_constant():
+    val, der, sec_der = Diff().compile(lambda x,y: 3*x, ['x', 'y'])(2, 7)
+    assert(val == 6)
+    np.testing.assert_array_equal(der, [3, 0])
+    np.testing.assert_array_equal(sec_der, [0, 0])
+    val, der, sec_der = Diff().compile(lambda x,y: 3, ['x', 'y'])(2, 7)
+    assert(val == 3)
+    np.testing.assert_array_equal(der, [0, 0])
+
+def test_domain():
+    plan = Diff().compile(lambda x: bm.log(x), ['x'])
+    with np.errstate(divide='ignore'):
+        val, der, sec_der = plan(0.0)
+    assert(val == -np.inf)
+    with pytest.raises(ValueError):
+        plan(1, 2)
+    plan = Diff().compile(lambda x: x**0.5, ['x'])
+    with np.errstate(invalid='ignore'):
+        scalar, array = plan(-4.0), plan(np.array([-4.0]))
+    for a, b in zip(scalar, array):
+        assert(np.isnan(a).all() and np.isnan(b).all())
+
+def test_not_traceable():
+    with pytest.raises(NotImplementedError):
+        Diff().compile(lambda x: np.floor(x), ['x'])
+
+def simplified(f):
+    graph = Graph()
+    new, output = simplify(graph, f(graph.input(0), graph.input(1), graph.input(2)))
+    return new.ops, new.ops[output.index]
+
+def test_simplify():
+    ops, out = simplified(lambda x,y,z: z + -z + x**2*y + z)
+    assert(out[0] == 'add' and out[1] == 2)
+    assert(ops[out[2]][:2] == ('multiply', 1) and ops[ops[out[2]][2]] == ('square', 0))
+    ops, out = simplified(lambda x,y,z: bm.sin(x)*y + bm.sin(x) + (2*3 - 5)*z)
+    assert([op[0] for op in ops].count('sin') == 1)
+    assert(out[0] == 'add' and 2 in out[1:])
+    ops, out = simplified(lambda x,y,z: -(-x) - y/1 + 0)
+    assert(out == ('subtract', 0, 1))
+    ops, out = simplified(lambda x,y,z: x*x*(3 - 2) + (y - y))
+    assert(out == ('square', 0))
+
+def test_optimize_less_work():
+    f = lambda x,y,z: z + -z + x**2*y + z + bm.sin(x) * bm.sin(x)
+    plan = Diff().compile(f, ['x', 'y', 'z'])
+    plain = Diff().compile(f, ['x', 'y', 'z'], optimize=False)
+    assert(plan.source.count('\n') < plain.source.count('\n'))
+    assert('**' not in plan.source and plan.source.count('sin(') == 1)
+    for a, b in zip(plan(1.5, 0.5, 0.25), plain(1.5, 0.5, 0.25)):
+        np.testing.assert_allclose(a, b)
+
+test_compile_matches_auto_diff()
+test_repeated_calls()
+test_batch_values()
+test_unused_and_constant()
+test_domain()
+test_not_traceable()
+test_simplify()
+test_optimize_less_work()
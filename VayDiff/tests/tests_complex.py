@@ -0,0 +1,72 @@
+import pytest
+import numpy as np
+import VayDiff
+from VayDiff import BasicMath as bm
+from VayDiff.VayDiff import Diff
+from VayDiff.VayDiff import Variable
+
+functions = [bm.log, bm.sqrt, bm.exp, bm.sin, bm.cos, bm.tan, bm.arcsin, bm.arccos, bm.arctan, bm.sinh, bm.cosh,
+             bm.tanh, lambda x: bm.logk(x, 2), lambda x: x**2.5, lambda x: 3**x, lambda x: x**x, lambda x: 1/x]
+
+def test_holomorphic():
+    z = 0.7 + 0.4j
+    h = 1e-6
+    for f in functions:
+        t = f(Variable(val=z, name='z'))
+        assert(np.iscomplexobj(t.val))
+        np.testing.assert_allclose(t.der['z'], (f(z + h) - f(z - h)) / (2 * h), rtol=1e-6)
+        np.testing.assert_allclose(t.der['z'], (f(z + 1j * h) - f(z - 1j * h)) / (2j * h), rtol=1e-6)
+        np.testing.assert_allclose(t.sec_der['z'], (f(z + h) - 2 * f(z) + f(z - h)) / h**2, rtol=1e-3)
+
+def test_branches():
+    t = bm.log(Variable(val=-1 + 0j, name='z'))
+    assert(t.val == np.pi * 1j and t.der['z'] == -1)
+    assert(bm.sqrt(Variable(val=-4 + 0j, name='z')).val == 2j)
+    np.testing.assert_allclose(bm.arcsin(Variable(val=2 + 0j, name='z')).val, np.arcsin(2 + 0j))
+    with np.errstate(invalid='ignore'):
+        assert(np.isnan(bm.log(Variable(val=-1.0, name='x')).val))
+    np.testing.assert_allclose((Variable(val=-4 + 0j, name='z') ** 0.5).val, 2j)
+    with pytest.warns(RuntimeWarning):
+        t = Variable(val=-4.0, name='x') ** 0.5
+    assert(np.isnan(t.val) and np.isnan(t.der['x']) and not np.iscomplexobj(t.val))
+    with np.errstate(invalid='ignore'):
+        assert(np.isnan((Variable(val=-4.0, name='x') ** Variable(val=0.5, name='y')).val))
+        assert(np.isnan(((-4.0) ** Variable(val=0.5, name='y')).val))
+
+def test_storages():
+    f = lambda x,y: bm.sin(x) * y + x**2 / y
+    z = [Variable(val=[0.5 + 1j, 2.0], name='x'), Variable(val=1.5 - 0.5j, name='y')]
+    t = Diff().auto_diff(f, z)
+    assert(z[0].val.dtype == complex)
+    for dense, sparse in [(True, False), (False, True)]:
+        s = Diff().auto_diff(f, z, dense=dense, sparse=sparse)
+        np.testing.assert_allclose(s.val, t.val)
+        np.testing.assert_allclose(s.der['x'], t.der['x'])
+        np.testing.assert_allclose(s.sec_der['y'], t.sec_der['y'])
+    point = [Variable(val=0.5 + 1j, name='x'), Variable(val=1.5 - 0.5j, name='y')]
+    J = Diff().jacobian([f], point)
+    t = f(*point)
+    np.testing.assert_allclose(J, [[t.der['x'], t.der['y']]])
+    np.testing.assert_allclose(Diff().gradient(f, point), J[0])
+    np.testing.assert_allclose(np.diag(Diff().hessian([f], point)[0]), [t.sec_der['x'], t.sec_der['y']])
+    np.testing.assert_allclose(Diff().batch_jacobian(f, [[0.5 + 1j, 1.5 - 0.5j]])[0], J)
+    val, der, sec = Diff().compile(f, ['x', 'y'])(0.5 + 1j, 1.5 - 0.5j)
+    np.testing.assert_allclose(der, J[0])
+    np.testing.assert_allclose(Diff().taylor(lambda x: f(x, 1.5 - 0.5j), 0.5 + 1j, 2), [t.val, t.der['x'], t.sec_der['x']])
+
+def test_eq_order():
+    x = Variable(val=1.0, name='x')
+    y = Variable(val=2.0, name='y')
+    assert(x * y + 0j == y * x + 0j)
+    assert(x * y != x * y + 1j)
+
+def test_newton():
+    r = VayDiff.solve([lambda z: z**3 - 1], [-1 + 1j])
+    assert(r.success)
+    np.testing.assert_allclose(r.x, [np.exp(2j * np.pi / 3)])
+
+test_holomorphic()
+test_branches()
+test_storages()
+test_eq_order()
+test_newton()
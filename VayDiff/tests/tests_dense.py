@@ -0,0 +1,118 @@
+import pytest
+import numpy as np
+from VayDiff import BasicMath as bm
+from VayDiff.VayDiff import Diff
+from VayDiff.VayDiff import Variable
+from VayDiff.Dense import Index, DenseDer, SparseDer
+
+def mixed_function(x,y,z):
+    return x*y + bm.sin(x)/z - 2**y + z**2 - x**y + 3/x - bm.exp(-z)
+
+def elementary_function(x,y):
+    return (bm.log(x) + bm.logk(y, 10) + bm.sqrt(x*y) + bm.cos(y) + bm.tan(x/4)
+            + bm.arcsin(x/4) + bm.arccos(y/4) + bm.arctan(x*y)
+            + bm.sinh(x) + bm.cosh(y) + bm.tanh(x-y))
+
+def test_index():
+    idx = Index(['x', 'y', 'z'])
+    assert(len(idx) == 3)
+    assert(idx.positions['z'] == 2)
+    with pytest.raises(ValueError):
+        Index(['x', 'x'])
+
+def test_seed():
+    idx = Index(['x', 'y'])
+    x = Variable(3, name='x', index=idx)
+    assert(isinstance(x.der, DenseDer))
+    np.testing.assert_array_equal(x.der.array, [1, 0])
+    np.testing.assert_array_equal(x.sec_der.array, [0, 0])
+    assert(x.der['x'] == 1 and x.der['y'] == 0)
+    assert(x.der['w'] == 0)
+    assert('y' in x.der and 'w' not in x.der)
+    assert(list(x.der.keys()) == ['x', 'y'])
+
+def test_dense_matches_dict():
+    x = Variable(val=1.5, name='x')
+    y = Variable(val=0.5, name='y')
+    z = Variable(val=2.0, name='z')
+    for f, point in [(mixed_function, [x,y,z]), (elementary_function, [x,y])]:
+        t1 = Diff().auto_diff(function = f, eval_point = point)
+        t2 = Diff().auto_diff(function = f, eval_point = point, dense = True)
+        assert(isinstance(t2.der, DenseDer))
+        np.testing.assert_allclose(t1.val, t2.val)
+        for v in point:
+            np.testing.assert_allclose(t1.der[v.name], t2.der[v.name])
+            np.testing.assert_allclose(t1.sec_der[v.name], t2.sec_der[v.name])
+
+def test_dense_operators():
+    idx = Index(['x', 'y'])
+    x = Variable(2, name='x', index=idx)
+    y = Variable(3, name='y', index=idx)
+    t = (x*y - x/y + y**2 - (-x) + 4 - x)**2
+    val = 2*3 - 2/3 + 9 + 2 + 4 - 2
+    assert(np.isclose(t.val, val**2))
+    np.testing.assert_allclose(t.der.array, [2*val*(3 - 1/3), 2*val*(2 + 2/9 + 6)])
+    np.testing.assert_allclose(t.sec_der.array, [2*(3 - 1/3)**2, 2*(2 + 2/9 + 6)**2 + 2*val*(-4/27 + 2)])
+
+def test_mixed_storage():
+    idx = Index(['x', 'y'])
+    x = Variable(2, name='x', index=idx)
+    y = Variable(3, name='y')
+    t = x*y
+    assert(isinstance(t.der, DenseDer))
+    np.testing.assert_array_equal(t.der.array, [3, 2])
+    with pytest.raises(ValueError):
+        x + Variable(1, name='w')
+
+def test_sparse_matches_dict():
+    x = Variable(val=1.5, name='x')
+    y = Variable(val=0.5, name='y')
+    z = Variable(val=2.0, name='z')
+    for f, point in [(mixed_function, [x,y,z]), (elementary_function, [x,y]), (lambda x,y,z: x*2 + bm.sin(z), [x,y,z])]:
+        t1 = Diff().auto_diff(function = f, eval_point = point)
+        t2 = Diff().auto_diff(function = f, eval_point = point, sparse = True)
+        assert(isinstance(t2.der, SparseDer))
+        assert(sorted(t2.der) == sorted(t1.der))
+        np.testing.assert_allclose(t1.val, t2.val)
+        for v in point:
+            np.testing.assert_allclose(t1.der[v.name], t2.der[v.name])
+            np.testing.assert_allclose(t1.sec_der[v.name], t2.sec_der[v.name])
+
+def test_sparse_rows():
+    point = Diff()._sparse_point([Variable(val=1.0 + i, name='x{}'.format(i)) for i in range(6)])
+    x0, x1, x5 = point[0], point[1], point[5]
+    assert(x0.der.rows is x0.sec_der.rows)
+    t = x0*x5 + bm.exp(x0)
+    np.testing.assert_array_equal(t.der.rows, [0, 5])
+    assert(t.der.rows is t.sec_der.rows)
+    u = t*x0 - 3*t
+    assert(u.der.rows is t.der.rows)
+    assert('x5' in u.der and 'x1' not in u.der and len(u.der) == 2)
+    assert(u.der['x1'] == 0 and u.der['w'] == 0)
+    v = u + x1
+    np.testing.assert_array_equal(v.der.rows, [0, 1, 5])
+    assert(v.der['x1'] == 1)
+
+def test_sparse_batch():
+    x = Variable(val=[1., 2., 3.], name='x')
+    y = Variable(val=0.5, name='y')
+    t1 = Diff().auto_diff(function = elementary_function, eval_point = [x,y])
+    t2 = Diff().auto_diff(function = elementary_function, eval_point = [x,y], sparse = True)
+    for name in ['x', 'y']:
+        np.testing.assert_allclose(t1.der[name], t2.der[name])
+        np.testing.assert_allclose(t1.sec_der[name], t2.sec_der[name])
+
+def test_slots():
+    x = Variable(val=1.5, name='x')
+    with pytest.raises(AttributeError):
+        x.label = 'x'
+
+test_index()
+test_seed()
+test_dense_matches_dict()
+test_dense_operators()
+test_mixed_storage()
+test_sparse_matches_dict()
+test_sparse_rows()
+test_sparse_batch()
+test_slots()
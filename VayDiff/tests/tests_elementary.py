@@ -0,0 +1,95 @@
+import math
+import pytest
+import numpy as np
+from VayDiff import BasicMath as bm
+from VayDiff.VayDiff import Diff
+from VayDiff.VayDiff import Variable
+
+# (function, point, first derivative, second derivative)
+cases = [
+    (bm.arcsinh, 0.7, 1/np.sqrt(1.49), -0.7/1.49**1.5),
+    (bm.arccosh, 1.5, 1/np.sqrt(1.25), -1.5/1.25**1.5),
+    (bm.arctanh, 0.3, 1/0.91, 0.6/0.91**2),
+    (bm.log1p, 0.4, 1/1.4, -1/1.4**2),
+    (bm.expm1, 0.4, np.exp(0.4), np.exp(0.4)),
+    (bm.erf, 0.6, 2/np.sqrt(np.pi)*np.exp(-0.36), -2.4/np.sqrt(np.pi)*np.exp(-0.36)),
+    (bm.logistic, 0.8, np.exp(-0.8)/(1 + np.exp(-0.8))**2,
+     np.exp(-0.8)*(np.exp(-0.8) - 1)/(1 + np.exp(-0.8))**3),
+    (bm.abs, -1.2, -1.0, 0.0),
+]
+
+def test_values():
+    for f, a, d1, d2 in cases:
+        t = f(Variable(val=a, name='x'))
+        np.testing.assert_allclose(t.val, f(a))
+        np.testing.assert_allclose(t.der['x'], d1)
+        np.testing.assert_allclose(t.sec_der['x'], d2, atol=1e-15)
+    assert(math.isclose(bm.erf(0.6), math.erf(0.6)))
+    np.testing.assert_allclose(bm.logistic(np.array([-800.0, 0.0, 800.0])), [0.0, 0.5, 1.0])
+
+def test_paths():
+    for f, a, d1, d2 in cases:
+        g = lambda x,y: f(x * y) + y
+        point = [Variable(val=a, name='x'), Variable(val=1.0, name='y')]
+        t = Diff().auto_diff(g, point)
+        dense = Diff().auto_diff(g, point, dense=True)
+        sparse = Diff().auto_diff(g, point, sparse=True)
+        np.testing.assert_allclose(dense.der.array, [t.der['x'], t.der['y']])
+        np.testing.assert_allclose(sparse.der['x'], t.der['x'])
+        np.testing.assert_allclose(Diff().gradient(g, point), [t.der['x'], t.der['y']])
+        np.testing.assert_allclose(Diff().hessian([g], point)[0], Diff().hessian([g], point)[0].T)
+        val, der, sec = Diff().compile(g, ['x', 'y'])(a, 1.0)
+        np.testing.assert_allclose(der, [t.der['x'], t.der['y']])
+        np.testing.assert_allclose(sec, [t.sec_der['x'], t.sec_der['y']], atol=1e-15)
+        derivatives = Diff().taylor(f, a, 2)
+        np.testing.assert_allclose(derivatives, [f(a), d1, d2], atol=1e-15)
+
+def test_taylor_orders():
+    h = 1e-3
+    for f, a, d1, d2 in cases:
+        third = Diff().taylor(f, a, 3)[3]
+        np.testing.assert_allclose(third, (f(a + 2*h) - 2*f(a + h) + 2*f(a - h) - f(a - 2*h)) / (2 * h**3),
+                                   rtol=1e-4, atol=1e-6)
+
+def test_maximum_minimum():
+    x = Variable(val=2.0, name='x')
+    y = Variable(val=3.0, name='y')
+    t = bm.maximum(x * x, y)
+    assert(t.val == 4 and t.der['x'] == 4 and t.der['y'] == 0 and t.sec_der['x'] == 2)
+    t = bm.minimum(x, 1.5)
+    assert(t.val == 1.5 and t.der['x'] == 0)
+    assert(bm.maximum(1.0, x).der['x'] == 1)
+    f = lambda x,y: bm.maximum(x, y) * bm.minimum(x, y)
+    np.testing.assert_allclose(Diff().gradient(f, [x, y]), [3.0, 2.0])
+    np.testing.assert_allclose(Diff().compile(f, ['x', 'y'])(2.0, 3.0)[1], [3.0, 2.0])
+    np.testing.assert_allclose(Diff().compile(f, ['x', 'y'])(np.array([2.0, 4.0]), 3.0)[1], [[3.0, 3.0], [2.0, 4.0]])
+    np.testing.assert_allclose(Diff().taylor(lambda x: bm.maximum(x**2, 1.0), 2.0, 2), [4.0, 4.0, 2.0])
+    v = Variable(val=[1.0, 4.0], name='v')
+    np.testing.assert_array_equal(bm.maximum(v, 2.0).der['v'], [0.0, 1.0])
+
+def test_complex():
+    z = 0.3 + 0.4j
+    h = 1e-6
+    for f in [bm.arcsinh, bm.arccosh, bm.arctanh, bm.log1p, bm.expm1, bm.logistic]:
+        t = f(Variable(val=z, name='z'))
+        np.testing.assert_allclose(t.der['z'], (f(z + h) - f(z - h)) / (2 * h), rtol=1e-6)
+        np.testing.assert_allclose(Diff().taylor(f, z, 2), [t.val, t.der['z'], t.sec_der['z']])
+    assert(bm.abs(z) == 0.5)
+    with pytest.raises(TypeError):
+        bm.abs(Variable(val=z, name='z'))
+    with pytest.raises(TypeError):
+        Diff().taylor(bm.abs, z, 2)
+    with pytest.raises(TypeError):
+        bm.abs(Variable(val=[z, 1.0], name='z'))
+
+def test_star_import():
+    namespace = {}
+    exec('from VayDiff.BasicMath import *', namespace)
+    assert('abs' not in namespace and namespace['maximum'] is bm.maximum and 'Variable' not in namespace)
+
+test_values()
+test_paths()
+test_taylor_orders()
+test_maximum_minimum()
+test_complex()
+test_star_import()
@@ -0,0 +1,83 @@
+import pytest
+import numpy as np
+from VayDiff import BasicMath as bm
+from VayDiff.VayDiff import Diff
+from VayDiff.VayDiff import Variable
+from VayDiff.Dense import DenseHessian
+
+def operators(x,y,z):
+    return 4 + x*y*z - z/x + 2/y - (-z)*x + x**2*y + 2**(y*z) + x**y - 3*(+z) + (x*z)**3 - 1
+
+def elementary(x,y,z):
+    return (bm.log(x*y) + bm.logk(y*z, 10) + bm.exp(z*x) + bm.sqrt(x*y) + bm.sin(x*z) + bm.cos(y*x)
+            + bm.tan(z*y) + bm.arcsin(z*x) + bm.arccos(x*y/4) + bm.arctan(y*z) + bm.sinh(x*y)
+            + bm.cosh(y*z) + bm.tanh(z*x))
+
+def numerical_hessian(f, point, h=1e-4):
+    grad = lambda p: Diff().jacobian([f], [Variable(val=v, name=str(i)) for i, v in enumerate(p)])[0]
+    p = len(point)
+    H = np.zeros((p, p))
+    for j in range(p):
+        e = np.zeros(p)
+        e[j] = h
+        H[:, j] = (grad(np.array(point) + e) - grad(np.array(point) - e)) / (2*h)
+    return H
+
+def test_hessian_cross_terms():
+    x = Variable(val=3, name='x')
+    y = Variable(val=5, name='y')
+    t = Diff().hessian([lambda x,y: x**2*y, lambda x,y: x*y + y**3], [x,y])
+    assert(t.shape == (2,2,2))
+    np.testing.assert_array_equal(t[0], [[10, 6], [6, 0]])
+    np.testing.assert_array_equal(t[1], [[0, 1], [1, 30]])
+    t = Diff().hessian([lambda x,y: 3.0, lambda x,y: x*y], [x,y])
+    np.testing.assert_array_equal(t, [[[0, 0], [0, 0]], [[0, 1], [1, 0]]])
+
+def test_hessian_matches_numerical():
+    point = [1.2, 0.5, 0.3]
+    x, y, z = [Variable(val=v, name=n) for v, n in zip(point, 'xyz')]
+    for f in [operators, elementary]:
+        H = Diff().hessian([f], [x,y,z])[0]
+        np.testing.assert_allclose(H, H.T)
+        np.testing.assert_allclose(H, numerical_hessian(f, point), rtol=1e-5, atol=1e-6)
+
+def test_hessian_diagonal_matches_sec_der():
+    x, y, z = [Variable(val=v, name=n) for v, n in zip([1.2, 0.5, 0.3], 'xyz')]
+    for f in [operators, elementary]:
+        H = Diff().hessian([f], [x,y,z])[0]
+        t = Diff().auto_diff(f, [x,y,z])
+        np.testing.assert_allclose(np.diag(H), [t.sec_der['x'], t.sec_der['y'], t.sec_der['z']])
+
+def test_sec_der_view():
+    x = Variable(val=2, name='x')
+    y = Variable(val=3, name='y')
+    points = Diff()._dense_point([x,y], hessian=True)
+    t = Diff().auto_diff(lambda x,y: x**2*y + bm.sin(y), points)
+    assert(isinstance(t.sec_der, DenseHessian))
+    assert(t.sec_der['x'] == 6)
+    assert(t.sec_der['x', 'y'] == 4 and t.sec_der['y', 'x'] == 4)
+    assert(t.sec_der['y'] == -np.sin(3))
+    assert(t.sec_der['w'] == 0)
+
+def test_many_parameters():
+    p = 120
+    point = [Variable(val=0.1*(i+1), name='x{}'.format(i)) for i in range(p)]
+    def f(*xs):
+        s = 0
+        for i in range(p-1):
+            s = s + xs[i]*xs[i+1]**2
+        return s
+    H = Diff().hessian([f], point)[0]
+    vals = 0.1*(np.arange(p)+1)
+    expected = np.zeros((p, p))
+    for i in range(p-1):
+        expected[i, i+1] += 2*vals[i+1]
+        expected[i+1, i] += 2*vals[i+1]
+        expected[i+1, i+1] += 2*vals[i]
+    np.testing.assert_allclose(H, expected)
+
+test_hessian_cross_terms()
+test_hessian_matches_numerical()
+test_hessian_diagonal_matches_sec_der()
+test_sec_der_view()
+test_many_parameters()
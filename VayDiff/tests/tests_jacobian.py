@@ -1,5 +1,6 @@
 import pytest
 import numpy as np
+import VayDiff
 from VayDiff import BasicMath as bm
 from VayDiff.VayDiff import Diff
 from VayDiff.VayDiff import Variable
@@ -59,7 +60,50 @@ def test_jacobian_32():
     assert(t1[2][0] == 5)
     assert(t1[2][1] == 4)
 
+def model(x,y,z):
+    shared = bm.sin(x*y) * bm.exp(z)
+    return [shared + x, shared * y, 2.0, z]
+
+def test_vector_function():
+    x = Variable(val=0.5, name='x')
+    y = Variable(val=1.5, name='y')
+    z = Variable(val=0.2, name='z')
+    rows = [lambda x,y,z, i=i: model(x,y,z)[i] for i in range(4)]
+    with VayDiff.profile() as p:
+        t1 = Diff().jacobian(model, [x,y,z])
+    assert(p.stats['sin'].calls == 1)
+    assert(t1.shape == (4,3))
+    np.testing.assert_allclose(t1[[0, 1, 3]], Diff().jacobian([rows[0], rows[1], rows[3]], [x,y,z]))
+    np.testing.assert_array_equal(t1[2], [0, 0, 0])
+    t2 = Diff().jacobian(lambda x,y,z: np.array([f1(x,y,z), f3(x,y,z)]), [x,y,z])
+    np.testing.assert_allclose(t2, Diff().jacobian([f1, f3], [x,y,z]))
+    t3 = Diff().jacobian(f3, [x,y,z])
+    np.testing.assert_allclose(t3, [[1.5, 1.5, 1]])
+
+def test_dense_storage():
+    p = VayDiff.VayDiff.DENSE_JACOBIAN
+    point = [Variable(val=0.5 + i, name='x{}'.format(i)) for i in range(p + 1)]
+    rows = [lambda *xs: bm.sin(xs[0]) * xs[-1], lambda *xs: sum(xs) + 3, lambda *xs: 2.0]
+    J = Diff().jacobian(rows, point)
+    assert(J.shape == (3, p + 1))
+    expected = np.zeros(p + 1)
+    expected[[0, -1]] = np.cos(0.5) * (p + 0.5), np.sin(0.5)
+    np.testing.assert_allclose(J[0], expected)
+    np.testing.assert_array_equal(J[1:], [np.ones(p + 1), np.zeros(p + 1)])
+    np.testing.assert_allclose(J[0, [0, -1]], Diff().jacobian(rows[:1], [point[0], point[-1]])[0])
+
+def test_vector_function_batch():
+    points = np.array([[0.5, 1.5, 0.2], [1.0, 2.0, 0.3]])
+    J = Diff().batch_jacobian(model, points)
+    assert(J.shape == (2, 4, 3))
+    for k in range(2):
+        point = [Variable(val=v, name=n) for v, n in zip(points[k], 'xyz')]
+        np.testing.assert_allclose(J[k], Diff().jacobian(model, point))
+
 test_jacobian_22()
 test_jacobian_23()
 test_non_alphabetical_22()
 test_jacobian_32()
+test_vector_function()
+test_dense_storage()
+test_vector_function_batch()
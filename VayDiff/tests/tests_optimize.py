@@ -0,0 +1,44 @@
+import pytest
+import numpy as np
+import VayDiff
+from VayDiff import BasicMath as bm
+from VayDiff.VayDiff import Variable
+from VayDiff.Optimize import newton, bfgs, lbfgs
+
+def rosenbrock(*x):
+    return sum(100*(x[i+1]-x[i]**2)**2 + (1-x[i])**2 for i in range(len(x)-1))
+
+def test_rosenbrock():
+    for method in ['newton', 'bfgs', 'lbfgs']:
+        r = VayDiff.minimize(rosenbrock, [-1.2, 1.0], method=method, maxiter=500)
+        assert(r.success)
+        np.testing.assert_allclose(r.x, np.ones(2), atol=1e-5)
+        assert(r.fun < 1e-10 and np.abs(r.grad).max() <= 1e-6)
+        assert(r.nfev >= r.nit and r.ngev >= r.nit + 1)
+        assert((r.nhev > 0) == (method == 'newton'))
+
+def test_variables_and_options():
+    f = lambda x,y: bm.exp(x) - x + bm.log(y)**2 + x*y*0.1
+    point = [Variable(val=1.0, name='x'), Variable(val=2.0, name='y')]
+    r1 = newton(f, point)
+    r2 = lbfgs(f, point, memory=3)
+    np.testing.assert_allclose(r1.x, r2.x, atol=1e-6)
+    r3 = bfgs(f, [1.0, 2.0], maxiter=1)
+    assert(r3.nit == 1 and not r3.success)
+    assert('Maximum' in r3.message)
+    r4 = lbfgs(lambda x,y: 3.0, [1.0, 2.0])
+    assert(r4.success and r4.nit == 0)
+    with pytest.raises(ValueError):
+        VayDiff.minimize(f, point, method='nelder-mead')
+
+def test_many_variables():
+    n = 200
+    f = lambda *x: sum((x[i] - i)**2 * (1 + i % 3) for i in range(n)) + 0.1 * sum(x[i]*x[i+1] for i in range(n-1))
+    r = lbfgs(f, np.zeros(n), tol=1e-5)
+    assert(r.success)
+    r2 = newton(f, np.zeros(n), tol=1e-5)
+    np.testing.assert_allclose(r.x, r2.x, atol=1e-5)
+
+test_rosenbrock()
+test_variables_and_options()
+test_many_variables()
@@ -0,0 +1,66 @@
+import pytest
+import VayDiff
+from VayDiff import BasicMath as bm
+from VayDiff.BasicMath import *
+from VayDiff.VayDiff import Diff
+from VayDiff.VayDiff import Variable
+from VayDiff.Profile import Profiler
+
+def test_counts():
+    x = Variable(val=1.5, name='x')
+    y = Variable(val=0.5, name='y')
+    z = Variable(val=2.0, name='z')
+    with VayDiff.profile() as p:
+        t = Diff().auto_diff(lambda x,y,z: x*y*z + bm.sin(x) + bm.sin(y) - x/z, [x,y,z])
+    assert(p.stats['sin'].calls == 2)
+    assert(p.stats['__mul__'].calls == 2)
+    assert(p.stats['__pow__'].calls == 0)
+    assert(p.stats['__truediv__'].calls == 1 and p.stats['__truediv__'].merges == 2)
+    assert(p.stats['__add__'].calls == 2 and p.stats['__sub__'].calls == 1)
+    assert(p.stats['__mul__'].merges == 2 + 3)
+    assert(p.stats['__mul__'].max_keys == 3)
+    assert(p.max_keys() == 3)
+    assert(p.stats['cos'].calls == 0)
+    assert(all(s.seconds >= 0 for s in p.stats.values()))
+    report = p.report()
+    assert('sin' in report and 'cos' not in report)
+
+def test_restored():
+    add, sin_ = Variable.__dict__['__add__'], bm.sin
+    with VayDiff.profile():
+        assert(Variable.__dict__['__add__'] is not add)
+        assert(bm.sin is not sin_)
+    assert(Variable.__dict__['__add__'] is add)
+    assert(bm.sin is sin_ and sin is sin_)
+    with pytest.raises(ZeroDivisionError):
+        with VayDiff.profile():
+            1 / 0
+    assert(Variable.__dict__['__add__'] is add)
+
+def test_imported_names():
+    x = Variable(val=0.5, name='x')
+    with VayDiff.profile() as p:
+        t = exp(x) + cos(x)
+    assert(p.stats['exp'].calls == 1 and p.stats['cos'].calls == 1)
+
+def test_dense_keys():
+    x = Variable(val=0.5, name='x')
+    y = Variable(val=1.5, name='y')
+    with VayDiff.profile() as p:
+        t = Diff().auto_diff(lambda x,y: x*y, [x,y], dense=True)
+    assert(p.stats['__mul__'].merges == 4 and p.stats['__mul__'].max_keys == 2)
+
+def test_started_twice():
+    p = Profiler()
+    p.start()
+    try:
+        with pytest.raises(RuntimeError):
+            p.start()
+    finally:
+        p.stop()
+
+test_counts()
+test_restored()
+test_imported_names()
+test_dense_keys()
+test_started_twice()
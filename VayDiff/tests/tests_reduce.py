@@ -0,0 +1,99 @@
+import pytest
+import numpy as np
+import VayDiff
+from VayDiff import BasicMath as bm
+from VayDiff.VayDiff import Diff
+from VayDiff.VayDiff import Variable
+from VayDiff.Dense import Index
+
+def f(*xs):
+    return VayDiff.sum((bm.sin(x) * xs[0] for x in xs), start=1.0)
+
+def g(*xs):
+    t = 1.0
+    for x in xs:
+        t = t + bm.sin(x) * xs[0]
+    return t
+
+def test_storages():
+    point = [Variable(val=0.1 * k, name='x{}'.format(k)) for k in range(1, 6)]
+    t, expected = Diff().auto_diff(f, point), Diff().auto_diff(g, point)
+    assert(np.isclose(t.val, expected.val))
+    for k in range(1, 6):
+        name = 'x{}'.format(k)
+        assert(np.isclose(t.der[name], expected.der[name]) and np.isclose(t.sec_der[name], expected.sec_der[name]))
+    for dense, sparse in [(True, False), (False, True)]:
+        t = Diff().auto_diff(f, point, dense=dense, sparse=sparse)
+        np.testing.assert_allclose([t.der['x{}'.format(k)] for k in range(1, 6)],
+                                   [expected.der['x{}'.format(k)] for k in range(1, 6)])
+    np.testing.assert_allclose(Diff().hessian([f], point), Diff().hessian([g], point))
+    np.testing.assert_allclose(Diff().gradient(f, point), [expected.der['x{}'.format(k)] for k in range(1, 6)])
+    plan = Diff().compile(f, ['x{}'.format(k) for k in range(1, 6)])
+    assert(np.isclose(plan(0.1, 0.2, 0.3, 0.4, 0.5)[0], expected.val))
+    np.testing.assert_allclose(Diff().taylor(lambda x: VayDiff.sum([x, x * x, 2.0]), 3.0, 2), [14.0, 7.0, 2.0])
+
+def test_sparse_rows():
+    point = Diff()._sparse_point([Variable(val=1.0, name='x{}'.format(k)) for k in range(100)])
+    t = VayDiff.dot([2.0, 3.0], [point[5] * point[7], point[7] + point[50]])
+    assert(list(t.der) == ['x5', 'x7', 'x50'])
+    np.testing.assert_allclose(t.der.array, [2.0, 5.0, 3.0])
+    np.testing.assert_allclose(t.sec_der.array, [0.0, 0.0, 0.0])
+
+def test_dot_and_batch():
+    x = Variable(val=[1.0, 2.0], name='x')
+    y = Variable(val=3.0, name='y')
+    t = VayDiff.dot([1.0, np.array([2.0, 4.0]), 5], [x * x, y, 7])
+    np.testing.assert_allclose(t.val, [42.0, 51.0])
+    np.testing.assert_allclose(t.der['x'], [2.0, 4.0])
+    np.testing.assert_allclose(t.der['y'], [2.0, 4.0])
+    assert(VayDiff.sum([1, 2, 3]) == 6 and VayDiff.sum([]) == 0)
+    with pytest.raises(ValueError):
+        VayDiff.dot([1.0], [x, y])
+
+def test_inplace():
+    x = Variable(val=2.0, name='x')
+    y = Variable(val=3.0, name='y')
+    t = x + 1
+    t += y
+    assert(t.val == 6 and t.der['y'] == 1 and 'y' not in x.der and x.val == 2 and x.der['x'] == 1)
+    s = t
+    s += y
+    assert(s is not t and t.val == 6 and t.der['y'] == 1 and s.val == 9 and s.der['y'] == 2)
+    der = id(s.der)
+    s += y
+    assert(id(s.der) == der and s.val == 12 and s.der['y'] == 3)
+    acc = VayDiff.sum([x, y])
+    out = acc
+    acc += x
+    assert(out.val == 5 and out.der['x'] == 1 and acc.val == 7 and acc.der['x'] == 2)
+    u = acc + 1
+    acc -= x * x
+    assert(u.val == 8 and u.der['x'] == 2 and u.sec_der['x'] == 0)
+    assert(acc.val == 3 and acc.der['x'] == -2 and acc.sec_der['x'] == -2)
+    total = x * 0
+    for k in range(1, 100):
+        total += x * k
+    assert(total.val == 9900 and total.der['x'] == 4950 and x.der['x'] == 1)
+    index = Index(['x', 'y'])
+    a, b = Variable(val=2.0, name='x', index=index), Variable(val=3.0, name='y', index=index)
+    acc = VayDiff.sum([a, b])
+    out, array = acc, acc.der.array
+    acc += a
+    acc += a
+    np.testing.assert_array_equal(out.der.array, [1, 1])
+    np.testing.assert_array_equal(array, [1, 1])
+    np.testing.assert_array_equal(acc.der.array, [3, 1])
+
+def test_cached():
+    ad = Diff(cache_size=2)
+    h = lambda x,y: VayDiff.sum([x, y])
+    t = ad.auto_diff(h, [Variable(val=1.0, name='x'), Variable(val=2.0, name='y')])
+    t += 10
+    cached = ad.auto_diff(h, [Variable(val=1.0, name='x'), Variable(val=2.0, name='y')])
+    assert(cached.val == 3.0 and t.val == 13.0)
+
+test_storages()
+test_sparse_rows()
+test_dot_and_batch()
+test_inplace()
+test_cached()
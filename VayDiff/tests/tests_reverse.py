@@ -0,0 +1,87 @@
+import pytest
+import numpy as np
+from VayDiff import BasicMath as bm
+from VayDiff.VayDiff import Diff
+from VayDiff.VayDiff import Variable
+from VayDiff.Reverse import Tape, Node
+
+def operators(x,y,z):
+    return 4 + x*y - z/x + 2/y - (-z) + x**2 + 2**y + x**y - 3*(+z) + x*3 - 1
+
+def elementary(x,y,z):
+    return (bm.log(x) + bm.logk(y, 10) + bm.exp(z) + bm.sqrt(x*y) + bm.sin(x) + bm.cos(y)
+            + bm.tan(z) + bm.arcsin(z) + bm.arccos(x/4) + bm.arctan(y) + bm.sinh(x)
+            + bm.cosh(y) + bm.tanh(z))
+
+def test_tape():
+    tape = Tape()
+    x = tape.variable(2.0)
+    y = tape.variable(3.0)
+    t = x*y + x
+    assert(isinstance(t, Node))
+    assert(t.val == 8)
+    assert(len(tape) == 4)
+    np.testing.assert_array_equal(tape.gradient(t, [x, y]), [4, 2])
+    np.testing.assert_array_equal(tape.gradient(x, [x, y]), [1, 0])
+
+def test_gradient_matches_jacobian():
+    x = Variable(val=1.5, name='x')
+    y = Variable(val=0.5, name='y')
+    z = Variable(val=0.25, name='z')
+    for f in [operators, elementary]:
+        g = Diff().gradient(f, [x,y,z])
+        j = Diff().jacobian([f], [x,y,z])
+        assert(g.shape == (3,))
+        np.testing.assert_allclose(g, j[0])
+    np.testing.assert_allclose(Diff().gradient(operators, [z,x,y]), Diff().jacobian([operators], [z,x,y])[0])
+
+def test_constant_function():
+    x = Variable(val=1.5, name='x')
+    np.testing.assert_array_equal(Diff().gradient(lambda x,y: 3, [x, x]), [0, 0])
+
+def test_many_inputs():
+    n = 2000
+    point = [Variable(val=1 + i/n, name='x{}'.format(i)) for i in range(n)]
+    def loss(*xs):
+        s = 0
+        for i, v in enumerate(xs):
+            s = s + (v - i/n)**2 + bm.sin(v)
+        return s
+    g = Diff().gradient(loss, point)
+    vals = np.array([v.val for v in point])
+    np.testing.assert_allclose(g, 2*(vals - np.arange(n)/n) + np.cos(vals))
+
+def test_hvp_matches_hessian():
+    x = Variable(val=1.5, name='x')
+    y = Variable(val=0.5, name='y')
+    z = Variable(val=0.25, name='z')
+    v = np.array([0.3, -1.2, 2.0])
+    for f in [operators, elementary, lambda x,y,z: x*x*y/z + y**z]:
+        H = Diff().hessian([f], [x,y,z])[0]
+        np.testing.assert_allclose(Diff().hvp(f, [x,y,z], v), H @ v)
+        for i in range(3):
+            np.testing.assert_allclose(Diff().hvp(f, [x,y,z], np.eye(3)[i]), H[:, i])
+    with pytest.raises(ValueError):
+        Diff().hvp(operators, [x,y,z], [1, 0])
+
+def test_hvp_many_inputs():
+    n = 3000
+    point = [Variable(val=1 + i/n, name='x{}'.format(i)) for i in range(n)]
+    def f(*xs):
+        s = 0
+        for i in range(n-1):
+            s = s + xs[i]*xs[i+1]**2
+        return s
+    v = np.linspace(-1, 1, n)
+    vals = np.array([p.val for p in point])
+    expected = np.zeros(n)
+    expected[:-1] += 2*vals[1:]*v[1:]
+    expected[1:] += 2*vals[1:]*v[:-1] + 2*vals[:-1]*v[1:]
+    np.testing.assert_allclose(Diff().hvp(f, point, v), expected)
+
+test_tape()
+test_gradient_matches_jacobian()
+test_constant_function()
+test_many_inputs()
+test_hvp_matches_hessian()
+test_hvp_many_inputs()
@@ -0,0 +1,42 @@
+import pytest
+import numpy as np
+import VayDiff
+from VayDiff import BasicMath as bm
+from VayDiff.VayDiff import Variable
+
+n = 20
+
+def broyden(*x):
+    return [(3-2*x[i])*x[i] - (x[i-1] if i > 0 else 0) - 2*(x[i+1] if i < n-1 else 0) + 1 for i in range(n)]
+
+def test_methods():
+    results = [VayDiff.solve(broyden, [-1.0] * n, method=m) for m in ['newton', 'chord', 'shamanskii']]
+    for r in results:
+        assert(r.success)
+        assert(np.abs(broyden(*r.x)).max() <= 1e-10)
+        np.testing.assert_allclose(r.x, results[0].x, atol=1e-9)
+    newton, chord, shamanskii = results
+    assert(newton.njev == newton.nit + 1 and newton.nfev == 0)
+    assert(chord.njev == 1 and chord.nfactor == 1 and chord.nit > newton.nit)
+    assert(shamanskii.njev < newton.njev)
+    r = VayDiff.solve(broyden, [-1.0] * n, method='shamanskii', refresh=2)
+    assert(r.success and r.njev <= r.nit // 2 + 1)
+
+def test_options():
+    functions = [lambda x,y: bm.exp(x) - y, lambda x,y: x + y - 3]
+    point = [Variable(val=0.0, name='x'), Variable(val=0.0, name='y')]
+    r1 = VayDiff.solve(functions, point)
+    r2 = VayDiff.solve(functions, point, damping=0.5, tol=1e-6)
+    assert(r1.success and r2.success and r2.nit > r1.nit)
+    np.testing.assert_allclose(r1.x, r2.x, atol=1e-5)
+    r3 = VayDiff.solve(functions, point, maxiter=1)
+    assert(not r3.success and r3.nit == 1)
+    with pytest.raises(ValueError):
+        VayDiff.solve(functions, point, method='broyden')
+    with pytest.raises(ValueError):
+        VayDiff.solve(functions, point, damping=0)
+    with pytest.raises(ValueError):
+        VayDiff.solve(functions[:1], point)
+
+test_methods()
+test_options()
@@ -0,0 +1,63 @@
+import pytest
+import numpy as np
+from VayDiff import BasicMath as bm
+from VayDiff.VayDiff import Diff
+from VayDiff.VayDiff import Variable
+
+scipy_sparse = pytest.importorskip('scipy.sparse')
+
+def tridiagonal_system(n):
+    # f_i(x) = x_{i-1} - 2 x_i + sin(x_{i+1}) + x_i**2
+    def make(i):
+        def f(*xs):
+            t = -2*xs[i] + xs[i]**2
+            if i > 0:
+                t = t + xs[i-1]
+            if i < n-1:
+                t = t + bm.sin(xs[i+1])
+            return t
+        return f
+    return [make(i) for i in range(n)]
+
+def test_sparsity_pattern():
+    n = 30
+    functions = tridiagonal_system(n)
+    point = [Variable(val=0.1*i, name='x{}'.format(i)) for i in range(n)]
+    pattern, colors = Diff().sparsity(functions, point)
+    assert(pattern.shape == (n, n))
+    assert(pattern.nnz == 3*n - 2)
+    expected = np.eye(n, dtype=bool) | np.eye(n, k=1, dtype=bool) | np.eye(n, k=-1, dtype=bool)
+    np.testing.assert_array_equal(pattern.toarray(), expected)
+    assert(colors.max() + 1 == 3)
+    dense = pattern.toarray()
+    for i in range(n):
+        used = colors[dense[i]]
+        assert(len(used) == len(set(used)))
+
+def test_sparse_jacobian_matches_jacobian():
+    n = 30
+    functions = tridiagonal_system(n)
+    point = [Variable(val=0.1*i, name='x{}'.format(i)) for i in range(n)]
+    J = Diff().sparse_jacobian(functions, point)
+    assert(isinstance(J, scipy_sparse.csr_matrix))
+    np.testing.assert_allclose(J.toarray(), Diff().jacobian(functions, point))
+
+def test_reuse_sparsity():
+    n = 10
+    functions = tridiagonal_system(n)
+    point = [Variable(val=0.1*i, name='x{}'.format(i)) for i in range(n)]
+    sparsity = Diff().sparsity(functions, point)
+    other = [Variable(val=1 - 0.05*i, name='x{}'.format(i)) for i in range(n)]
+    J = Diff().sparse_jacobian(functions, other, sparsity)
+    np.testing.assert_allclose(J.toarray(), Diff().jacobian(functions, other))
+
+def test_constant_rows():
+    x = Variable(val=2, name='x')
+    y = Variable(val=3, name='y')
+    J = Diff().sparse_jacobian([lambda x,y: 4, lambda x,y: x*y], [x,y])
+    np.testing.assert_array_equal(J.toarray(), [[0, 0], [3, 2]])
+
+test_sparsity_pattern()
+test_sparse_jacobian_matches_jacobian()
+test_reuse_sparsity()
+test_constant_rows()
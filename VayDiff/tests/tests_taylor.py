@@ -0,0 +1,52 @@
+import math
+import pytest
+import numpy as np
+from VayDiff import BasicMath as bm
+from VayDiff.VayDiff import Diff
+from VayDiff.VayDiff import Variable
+from VayDiff.Taylor import Taylor
+
+def test_known_series():
+    np.testing.assert_allclose(Diff().taylor(lambda x: bm.exp(bm.sin(x)), 0, 8), [1, 1, 1, 0, -3, -8, -3, 56, 217])
+    np.testing.assert_allclose(Diff().taylor(bm.tan, 0, 7), [0, 1, 0, 2, 0, 16, 0, 272], atol=1e-12)
+    np.testing.assert_allclose(Diff().taylor(bm.tanh, 0, 7), [0, 1, 0, -2, 0, 16, 0, -272], atol=1e-12)
+    np.testing.assert_allclose(Diff().taylor(bm.arcsin, 0, 5), [0, 1, 0, 1, 0, 9], atol=1e-12)
+    np.testing.assert_allclose(Diff().taylor(bm.arctan, 0, 5), [0, 1, 0, -2, 0, 24], atol=1e-12)
+    t = Diff().taylor(bm.log, 2.0, 6)
+    np.testing.assert_allclose(t[1:], [(-1)**(k-1) * math.factorial(k-1) / 2**k for k in range(1, 7)])
+    np.testing.assert_allclose(Diff().taylor(lambda x: x**x, 1.0, 3), [1, 1, 2, 3])
+    np.testing.assert_allclose(Diff().taylor(lambda x: x**3 - 1/x, 1.0, 4), [0, 4, 4, 12, -24])
+    np.testing.assert_array_equal(Diff().taylor(lambda x: x**3, 0.0, 4), [0, 0, 0, 6, 0])
+
+def test_second_order_agrees():
+    functions = [bm.sin, bm.cos, bm.tan, bm.exp, bm.log, bm.sqrt, bm.arcsin, bm.arccos, bm.arctan,
+                 bm.sinh, bm.cosh, bm.tanh, lambda x: bm.logk(x, 3), lambda x: x**2.5 / (1 + x) - 3**x + 2 - x]
+    for f in functions:
+        t = f(Variable(val=0.3, name='x'))
+        np.testing.assert_allclose(Diff().taylor(f, 0.3, 2), [t.val, t.der['x'], t.sec_der['x']])
+
+def test_batch_and_constants():
+    t = Diff().taylor(bm.sin, np.array([0., np.pi / 2]), 3)
+    assert(t.shape == (4, 2))
+    np.testing.assert_allclose(t, [[0, 1], [1, 0], [0, -1], [-1, 0]], atol=1e-12)
+    np.testing.assert_array_equal(Diff().taylor(lambda x: 5.0, 1, 2), [5, 0, 0])
+    np.testing.assert_array_equal(Diff().taylor(bm.exp, Variable(val=0, name='x'), 0), [1])
+    x = Taylor.variable(0.5, 3)
+    assert(x.order == 3)
+    np.testing.assert_allclose((np.float64(2) * x).coef, [1, 2, 0, 0])
+    with pytest.raises(NotImplementedError):
+        np.floor(x)
+
+def test_array_constants():
+    c = np.array([1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(Diff().taylor(lambda x: x * c, 0.5, 2), [[0.5, 1, 1.5], [1, 2, 3], [0, 0, 0]])
+    f = lambda x, c: c*x + c - x/c + (x + 1)*c - c**x + x**c + bm.maximum(x, c)
+    t = Diff().taylor(lambda x: f(x, c), 1.5, 3)
+    assert(t.shape == (4, 3))
+    for i in range(3):
+        np.testing.assert_allclose(t[:, i], Diff().taylor(lambda x: f(x, c[i]), 1.5, 3))
+
+test_known_series()
+test_second_order_agrees()
+test_batch_and_constants()
+test_array_constants()
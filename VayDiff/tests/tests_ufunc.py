@@ -0,0 +1,89 @@
+import pytest
+import numpy as np
+import VayDiff
+from VayDiff import BasicMath as bm
+from VayDiff.VayDiff import Diff
+from VayDiff.VayDiff import Variable
+
+def f(x, y):
+    return np.sin(x) * np.exp(y) + np.maximum(x, y) ** 2 + np.float64(2.0) / y + np.abs(x - 3) - np.negative(x)
+
+def g(x, y):
+    return bm.sin(x) * bm.exp(y) + bm.maximum(x, y) ** 2 + 2.0 / y + bm.abs(x - 3) + x
+
+def test_ufuncs():
+    point = [Variable(val=1.3, name='x'), Variable(val=0.7, name='y')]
+    for dense, sparse in [(False, False), (True, False), (False, True)]:
+        t = Diff().auto_diff(f, point, dense=dense, sparse=sparse)
+        expected = Diff().auto_diff(g, point, dense=dense, sparse=sparse)
+        assert(np.isclose(t.val, expected.val))
+        for name in ['x', 'y']:
+            assert(np.isclose(t.der[name], expected.der[name]) and np.isclose(t.sec_der[name], expected.sec_der[name]))
+    np.testing.assert_allclose(Diff().hessian([f], point), Diff().hessian([g], point))
+    np.testing.assert_allclose(Diff().compile(f, ['x', 'y'])(1.3, 0.7)[1], Diff().gradient(g, point))
+    np.testing.assert_allclose(Diff().taylor(lambda x: np.sin(x) * x, 1.0, 2), Diff().taylor(lambda x: bm.sin(x) * x, 1.0, 2))
+
+def test_arrays():
+    x = Variable(val=[1.0, 2.0, 3.0], name='x')
+    t = np.array([1.0, 2.0, 3.0]) * x
+    assert(isinstance(t, Variable) and t == x * np.array([1.0, 2.0, 3.0]))
+    a = np.ones(3)
+    a += x
+    assert(isinstance(a, Variable))
+    np.testing.assert_allclose(a.val, [2.0, 3.0, 4.0])
+    assert(not (np.float64(1.0) == x) and np.float64(1.0) != x)
+    assert(np.shape(x) == () and np.ndim(x) == 0)
+    with pytest.raises(TypeError):
+        np.floor(x)
+    xs = np.array([Variable(val=0.5, name='x'), Variable(val=1.5, name='y')], dtype=object)
+    t = np.exp(np.sin(xs) * 2)
+    assert(t.dtype == object and t.shape == (2,))
+    for v, name, expected in zip(t, 'xy', [0.5, 1.5]):
+        assert(np.isclose(v.val, np.exp(2 * np.sin(expected))))
+        assert(np.isclose(v.der[name], 2 * np.cos(expected) * v.val) and list(v.der) == [name])
+    with pytest.raises(TypeError):
+        np.maximum(xs, 1.0)
+    assert(np.shape(xs) == (2,) and np.size(x) == 1)
+
+def test_sum_dot():
+    A = np.arange(6.0).reshape(2, 3)
+    h = lambda x,y: np.sum(np.dot(A, x * y) ** 2) + np.dot(x, np.array([1.0, 2.0, 3.0]))
+    val = lambda y: np.sum(np.dot(A, np.array([1.0, 2.0, 3.0]) * y) ** 2) + 14.0
+    for dense, sparse in [(False, False), (True, False), (False, True)]:
+        t = Diff().auto_diff(h, [Variable(val=[1.0, 2.0, 3.0], name='x'), Variable(val=0.5, name='y')],
+                             dense=dense, sparse=sparse)
+        assert(np.isclose(t.val, val(0.5)))
+        assert(np.isclose(t.der['y'], 2 * np.sum(np.dot(A, [1.0, 2.0, 3.0]) ** 2) * 0.5))
+        assert(np.isclose(t.sec_der['y'], 2 * np.sum(np.dot(A, [1.0, 2.0, 3.0]) ** 2)))
+    H = Diff().hessian([lambda x,y: np.sum(np.dot(A, x * y) ** 2)], [Variable(val=0.3, name='x'), Variable(val=0.5, name='y')])
+    np.testing.assert_allclose(H[0], 2 * np.sum(A ** 2) * np.array([[0.25, 0.3], [0.3, 0.09]]))
+    m = Variable(val=np.arange(6.0).reshape(2, 3), name='m')
+    np.testing.assert_allclose(np.dot(m, np.ones(3)).der['m'], [3.0, 3.0])
+    np.testing.assert_allclose(np.dot(np.ones((4, 2)), m).der['m'], np.full((4, 3), 2.0))
+    np.testing.assert_allclose(np.sum(m, axis=-1, keepdims=True).val, [[3.0], [12.0]])
+    np.testing.assert_allclose(np.add.reduce(m).der['m'], [2.0, 2.0, 2.0])
+    x = Variable(val=[1.0, 2.0], name='x')
+    t = np.dot(x, x)
+    assert(t.val == 5.0 and t.der['x'] == 6.0 and t.sec_der['x'] == 4.0)
+    with pytest.raises(TypeError):
+        np.dot(m, m)
+
+def test_profile_and_matmul():
+    x = Variable(val=0.5, name='x')
+    with VayDiff.profile() as p:
+        t = np.sin(x) * np.exp(x) + np.maximum(x, 0.0)
+    assert(p.stats['sin'].calls == 1 and p.stats['exp'].calls == 1 and p.stats['maximum'].calls == 1)
+    assert(p.stats['__mul__'].calls == 1 and p.stats['cos'].calls == 0)
+    assert(np.isclose(t.der['x'], np.exp(0.5) * (np.sin(0.5) + np.cos(0.5)) + 1))
+    A = np.array([[1.0, 0.0], [3.0, 4.0]])
+    v = Variable(val=[1.0, 2.0], name='v')
+    assert((A @ v) == np.dot(A, v) and (v @ A) == np.dot(v, A) and np.matmul(A, v) == np.dot(A, v))
+    t = v @ v
+    assert(t.val == 5.0 and t.der['v'] == 6.0)
+    with pytest.raises(ValueError):
+        v @ 2.0
+
+test_ufuncs()
+test_arrays()
+test_sum_dot()
+test_profile_and_matmul()
@@ -0,0 +1,220 @@
+"""Timing benchmarks of VayDiff.
+
+Covers the cost of the Variable operators and BasicMath functions against the number of input variables,
+of Diff.jacobian against the number of functions and variables, of deep expression chains (forward mode,
+reverse mode and compiled) and of the Newton fractal renderer against the image size. The results are
+written as JSON, one file per run, so that two commits can be compared.
+
+Usage (from the root of the repository):
+    python -m benchmarks.suite [--quick] [--only PREFIX] [--output FILE]
+    python -m benchmarks.suite --compare OLD.json NEW.json
+"""
+import argparse
+import contextlib
+import datetime
+import importlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+
+from VayDiff import BasicMath as bm
+from VayDiff.VayDiff import Diff, Variable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS = os.path.join(ROOT, 'benchmarks', 'results')
+
+BENCHMARKS = []
+
+def benchmark(name, params, quick=None):
+    """Register a benchmark. The decorated function takes the parameters and returns the callable to time.
+    params is a list of dictionaries, quick the subset used with --quick (default: the first one)."""
+    def register(setup):
+        BENCHMARKS.append((name, setup, params, quick or params[:1]))
+        return setup
+    return register
+
+def key(name, param):
+    return '{}[{}]'.format(name, ','.join('{}={}'.format(k, v) for k, v in sorted(param.items())))
+
+def grid(**axes):
+    """Return the list of all the combinations of the values of axes."""
+    params = [{}]
+    for axis, values in axes.items():
+        params = [dict(p, **{axis: v}) for p in params for v in values]
+    return params
+
+def seed(values, storage):
+    point = [Variable(val=v, name='x{}'.format(i)) for i, v in enumerate(values)]
+    if storage == 'dense':
+        return Diff()._dense_point(point)
+    if storage == 'sparse':
+        return Diff()._sparse_point(point)
+    return point
+
+def total(p, storage):
+    """The sum of p variables, a Variable which depends on all of them."""
+    xs = seed(np.linspace(0.5, 1.5, p), storage)
+    a = xs[0]
+    for x in xs[1:]:
+        a = a + x
+    return a
+
+OPERATORS = {
+    'add': lambda a, b: a + b,
+    'mul': lambda a, b: a * b,
+    'truediv': lambda a, b: a / b,
+    'pow': lambda a, b: a ** b,
+    'sin': lambda a, b: bm.sin(a),
+    'exp': lambda a, b: bm.exp(a),
+    'log': lambda a, b: bm.log(a),
+}
+
+@benchmark('operator', grid(op=list(OPERATORS), p=[1, 10, 100], storage=['dict', 'dense', 'sparse']),
+           quick=grid(op=['add', 'mul', 'sin'], p=[1, 100], storage=['dict', 'dense']))
+def operator_cost(op, p, storage):
+    """One operator applied to two Variables which depend on all p variables."""
+    a = total(p, storage) * 0.1
+    b = a * 0.5 + 1
+    f = OPERATORS[op]
+    return lambda: f(a, b)
+
+# Unary functions whose rules call one (exp, tanh) or two (sin, tan, arcsinh, ...) NumPy functions.
+UNARY = ['exp', 'sin', 'cos', 'tan', 'sinh', 'tanh', 'arcsinh', 'logistic']
+
+@benchmark('unary', grid(function=UNARY, p=[1, 100, 1000], storage=['dict', 'dense', 'sparse']),
+           quick=grid(function=['exp', 'tan'], p=[1, 1000], storage=['dict']))
+def unary_cost(function, p, storage):
+    """One BasicMath function of a Variable which depends on all p variables. f, f' and f'' are evaluated once
+    per call, so the extra cost of p=1000 over p=1 (the chain rule over the partials) is the same for every function."""
+    a = total(p, storage) * (0.1 / p)
+    f = getattr(bm, function)
+    return lambda: f(a)
+
+def jacobian_functions(n, p):
+    return [lambda *xs, i=i: bm.sin(xs[i % p]) * xs[(i + 1) % p] + xs[(i + 2) % p] ** 2 for i in range(n)]
+
+@benchmark('jacobian', grid(n=[1, 10, 100], p=[3, 30, 300]), quick=grid(n=[10], p=[3, 30]))
+def jacobian_cost(n, p):
+    """Diff.jacobian of n functions of p variables, each using three of them."""
+    functions = jacobian_functions(n, p)
+    point = [Variable(val=0.5 + i / p, name='x{}'.format(i)) for i in range(p)]
+    return lambda: Diff().jacobian(functions, point)
+
+def chain_function(depth):
+    def f(x, y):
+        t = x
+        for i in range(depth):
+            t = bm.sin(t) * y + x if i % 2 else t * t * 0.5 + y
+        return t
+    return f
+
+@benchmark('chain', grid(depth=[10, 100, 1000], mode=['auto_diff', 'dense', 'gradient', 'compiled']),
+           quick=grid(depth=[100], mode=['auto_diff', 'gradient', 'compiled']))
+def chain_cost(depth, mode):
+    """A deep chain of operators on two variables, differentiated in each mode."""
+    f = chain_function(depth)
+    point = [Variable(val=0.3, name='x'), Variable(val=0.2, name='y')]
+    if mode == 'auto_diff':
+        return lambda: Diff().auto_diff(f, point)
+    if mode == 'dense':
+        return lambda: Diff().auto_diff(f, point, dense=True)
+    if mode == 'gradient':
+        return lambda: Diff().gradient(f, point)
+    plan = Diff().compile(f, ['x', 'y'])
+    return lambda: plan(0.3, 0.2)
+
+def load_fractal():
+    """Import Feature/Newton_fractal.py, or return None if its dependencies (tkinter, PIL, ...) are missing."""
+    sys.path.insert(0, os.path.join(ROOT, 'Feature'))
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return importlib.import_module('Newton_fractal')
+    except ImportError:
+        return None
+    finally:
+        sys.path.pop(0)
+
+@benchmark('fractal', grid(size=[50, 100, 200]), quick=grid(size=[50]))
+def fractal_cost(size):
+    """Newton_fractal.draw of z**3 - 1 on a size by size image."""
+    fractal = load_fractal()
+    if fractal is None:
+        return None
+    name = os.path.join(tempfile.mkdtemp(), 'fractal.png')
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            fractal.draw(lambda x: x**3 - 1, size, name)
+    return run
+
+def measure(fn, repeat):
+    """Return the timings of fn in seconds per call, with the number of calls per repetition chosen by timeit."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {'min': min(times), 'median': statistics.median(times), 'number': number, 'repeat': repeat}
+
+def metadata():
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                         stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = 'unknown'
+    return {'commit': commit, 'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine(),
+            'processor': platform.processor(), 'cpu_count': os.cpu_count()}
+
+def run(quick=False, only=None, repeat=5, log=print):
+    """Run the benchmarks whose name starts with only (all by default) and return the results as a dictionary."""
+    results = {}
+    for name, setup, params, quick_params in BENCHMARKS:
+        if only and not name.startswith(only):
+            continue
+        for param in (quick_params if quick else params):
+            fn = setup(**param)
+            if fn is None:
+                log('{:<60} skipped'.format(key(name, param)))
+                continue
+            results[key(name, param)] = measure(fn, 3 if quick else repeat)
+            log('{:<60} {:12.3f} us'.format(key(name, param), results[key(name, param)]['min'] * 1e6))
+    return {'meta': metadata(), 'results': results}
+
+def compare(old, new, threshold=0.1, log=print):
+    """Print the ratio new / old of the minimum times of the benchmarks present in both runs.
+    Return the keys which are slower than 1 + threshold."""
+    slower = []
+    log('{:<60} {:>12} {:>12} {:>7}'.format('benchmark (us)', old['meta']['commit'], new['meta']['commit'], 'ratio'))
+    for k in sorted(old['results'].keys() & new['results'].keys()):
+        a, b = old['results'][k]['min'], new['results'][k]['min']
+        ratio = b / a
+        flag = ' slower' if ratio > 1 + threshold else ' faster' if ratio < 1 - threshold else ''
+        if ratio > 1 + threshold:
+            slower.append(k)
+        log('{:<60} {:12.3f} {:12.3f} {:7.2f}{}'.format(k, a * 1e6, b * 1e6, ratio, flag))
+    return slower
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='run a small subset of the parameters')
+    parser.add_argument('--only', help='only run the benchmarks whose name starts with ONLY')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='JSON file to write, default benchmarks/results/<commit>.json')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two JSON result files')
+    args = parser.parse_args()
+    if args.compare:
+        with open(args.compare[0]) as f_old, open(args.compare[1]) as f_new:
+            compare(json.load(f_old), json.load(f_new))
+    else:
+        report = run(args.quick, args.only, args.repeat)
+        output = args.output or os.path.join(RESULTS, report['meta']['commit'] + '.json')
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+        print('Results written to', output)
@@ -14,6 +14,8 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type='text/markdown',
     packages=setuptools.find_packages(),
+    python_requires='>=3.7',
+    install_requires=['numpy>=1.20'],
     keywords=['Python','Automatic differentiation'],
     url='https://github.com/cs207-group-11/cs207-FinalProject',
     license='MIT',